@@ -0,0 +1 @@
+"""Benchmarks for Roboto's hot paths."""
@@ -0,0 +1,139 @@
+"""Measure the encode and decode hot paths of `roboto.datautil` in isolation.
+
+Every payload of the corpus is decoded with `from_json_like` (eagerly and
+lazily), `from_dict` (or `from_list`) and `convert_single`, and the decoded
+objects are encoded back with `to_json_like` and `json_serialize`. For each
+of them, this reports:
+
+    - ns/op: the best time per call, out of several runs;
+    - blocks/op: how many memory blocks a call allocates and keeps (the
+      objects making up its result);
+    - peak B/op: the most memory a call had allocated at once, including
+      what it freed before returning.
+
+Run with `python -m benchmarks.datautil`. `--output` also writes the results
+as JSON, to keep as a baseline.
+"""
+import gc
+import json
+import sys
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+from roboto import CallbackQuery, ChatMember, Message, StickerSet
+from roboto.datautil import (
+    convert_single,
+    from_dict,
+    from_json_like,
+    from_list,
+    to_json_like,
+)
+from roboto.request_types import json_serialize
+
+from .payloads import (
+    callback_query,
+    chat_administrators,
+    photo_message,
+    reply_message,
+    sticker_set,
+    text_message,
+)
+
+_CORPUS: List[Tuple[str, Any, Any]] = [
+    ('text Message', Message, text_message()),
+    ('photo Message', Message, photo_message()),
+    ('reply Message', Message, reply_message()),
+    ('CallbackQuery', CallbackQuery, callback_query()),
+    ('50 ChatMembers', List[ChatMember], chat_administrators(50)),
+    ('StickerSet (120)', StickerSet, sticker_set(120)),
+]
+
+
+def _operations(tp: Any, payload: Any) -> Dict[str, Callable[[], Any]]:
+    decoded = from_json_like(tp, payload)
+    from_structure = from_list if isinstance(payload, list) else from_dict
+
+    return {
+        'from_json_like': partial(from_json_like, tp, payload),
+        'from_json_like lazy': partial(from_json_like, tp, payload, lazy=True),
+        from_structure.__name__: partial(from_structure, tp, payload),
+        'convert_single': partial(convert_single, tp, payload),
+        'to_json_like': partial(to_json_like, decoded),
+        'json_serialize': partial(json_serialize, decoded),
+    }
+
+
+def _ns_per_op(operation: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def _blocks_per_op(operation: Callable[[], Any], ops: int) -> float:
+    results: List[Any] = [None] * ops
+    gc.collect()
+    before = sys.getallocatedblocks()
+
+    for i in range(ops):
+        results[i] = operation()
+
+    blocks = sys.getallocatedblocks() - before
+    del results
+
+    return blocks / ops
+
+
+def _peak_bytes_per_op(operation: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    current, _ = tracemalloc.get_traced_memory()
+    result = operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return peak - current
+
+
+def main(args):
+    """Parse arguments and run the benchmark."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--repeat', type=int, default=5)
+    argparser.add_argument('--ops', type=int, default=1000)
+    argparser.add_argument('--output', help='Where to write the results, as JSON.')
+    ns = argparser.parse_args(args)
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    print(
+        f'{"payload":>16} {"operation":>19} {"ns/op":>12} {"blocks/op":>10} '
+        f'{"peak B/op":>10}'
+    )
+
+    for name, tp, payload in _CORPUS:
+        results[name] = {}
+
+        for operation_name, operation in _operations(tp, payload).items():
+            # Compile and cache encoders and decoders before measuring.
+            operation()
+            result = results[name][operation_name] = {
+                'ns_per_op': _ns_per_op(operation, ns.repeat),
+                'blocks_per_op': _blocks_per_op(operation, ns.ops),
+                'peak_bytes_per_op': _peak_bytes_per_op(operation),
+            }
+            print(
+                f'{name:>16} {operation_name:>19} {result["ns_per_op"]:12,.0f} '
+                f'{result["blocks_per_op"]:10,.1f} '
+                f'{result["peak_bytes_per_op"]:10,.0f}'
+            )
+
+    if ns.output is not None:
+        with open(ns.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
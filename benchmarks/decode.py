@@ -0,0 +1,124 @@
+"""Compare the compiled decoders against the previous reflective decode path.
+
+Every decoded update gets the fields a typical handler looks at accessed
+(message text, chat id and sender id), so lazy decoding is measured fairly.
+
+Run with `python -m benchmarks.decode`.
+"""
+from argparse import ArgumentParser
+from copy import deepcopy
+from dataclasses import fields, is_dataclass
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, Dict, List, get_type_hints
+
+from typing_inspect import get_args, get_origin, is_optional_type
+
+from roboto import Update
+from roboto.datautil import JSONConversionError, from_json_like
+from roboto.typing_util import is_new_type, is_none_type, original_type
+
+from .payloads import updates
+
+
+def _reflective_from_json_like(tp, value, optional=False):
+    """The decode path before compiled decoders, kept as a baseline."""
+    if value is None:
+        if not optional:
+            raise JSONConversionError('Cannot read None.', tp, value)
+        return None
+
+    if get_origin(tp) is list:
+        (inner_type,) = get_args(tp)
+        return [_reflective_field(inner_type, v) for v in value]
+
+    if tp in (int, float):
+        return tp(value)
+
+    if is_dataclass(tp):
+        field_renames = {
+            f.metadata['rename']: f.name for f in fields(tp) if 'rename' in f.metadata
+        }
+        type_hints = get_type_hints(tp)
+
+        for k in field_renames:
+            if k in value:
+                value[field_renames[k]] = value.pop(k)
+
+        return tp(
+            **{
+                name: _reflective_field(type_hints[name], v)
+                for name, v in value.items()
+                if name in type_hints
+            }
+        )
+
+    real_type = tp if not is_new_type(tp) else original_type(tp)
+
+    if not isinstance(value, real_type):
+        raise JSONConversionError('Wrong type.', tp, value)
+
+    return value
+
+
+def _reflective_field(type_hint, value):
+    optional = is_optional_type(type_hint)
+
+    (real_type,) = (
+        (t for t in get_args(type_hint) if not is_none_type(t))
+        if optional
+        else (type_hint,)
+    )
+
+    if real_type is Any:
+        return value
+
+    return _reflective_from_json_like(real_type, value, optional)
+
+
+def _time_decode(
+    decode: Callable[[Any, Any], Any], batches: List[List[Dict[str, Any]]]
+) -> float:
+    # The reflective path pops renamed keys from its input, so every batch is
+    # decoded only once.
+    start = perf_counter()
+
+    for batch in batches:
+        for update in decode(List[Update], batch):
+            message = update.message
+            _ = (message.text, message.chat.id, message.from_.id)
+
+    return perf_counter() - start
+
+
+def main(args):
+    """Parse arguments and run the benchmark."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--batches', type=int, default=200)
+    argparser.add_argument('--batch-size', type=int, default=100)
+    ns = argparser.parse_args(args)
+
+    batch = updates(ns.batch_size)
+    total = ns.batches * ns.batch_size
+
+    # Warm up the decoder caches so compilation is not measured.
+    from_json_like(List[Update], deepcopy(batch))
+    from_json_like(List[Update], deepcopy(batch), lazy=True)
+
+    for name, decode in (
+        ('reflective', _reflective_from_json_like),
+        ('compiled', from_json_like),
+        ('lazy', partial(from_json_like, lazy=True)),
+    ):
+        batches = [deepcopy(batch) for _ in range(ns.batches)]
+        elapsed = _time_decode(decode, batches)
+        print(
+            f'{name:>10}: {total / elapsed:12,.0f} updates/s '
+            f'({elapsed / total * 1e6:.2f} us/update)'
+        )
+
+
+if __name__ == '__main__':
+    import sys
+
+    main(sys.argv[1:])
@@ -0,0 +1,113 @@
+"""Compare the compiled encoders against the previous `asdict` encode path.
+
+Run with `python -m benchmarks.encode`.
+"""
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+from time import perf_counter
+from typing import Any, Callable, Dict
+
+from roboto import (
+    ChatID,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    KeyboardButton,
+    ParseMode,
+    ReplyKeyboardMarkup,
+)
+from roboto.datautil import to_json_like
+from roboto.request_types import SendMessageRequest
+
+
+def _asdict_to_json_like(obj: Any) -> Any:
+    """The encode path before compiled encoders, kept as a baseline."""
+    if isinstance(obj, (int, float, str, bool, type(None))):
+        return obj
+    if isinstance(obj, dict):
+        return {k: _asdict_to_json_like(v) for k, v in obj.items() if v is not None}
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            k: _asdict_to_json_like(v) for k, v in asdict(obj).items() if v is not None
+        }
+    if isinstance(obj, list):
+        return [_asdict_to_json_like(v) for v in obj]
+    if isinstance(obj, Enum):
+        return _asdict_to_json_like(obj.value)
+
+    raise TypeError(obj)
+
+
+def _objects() -> Dict[str, Any]:
+    inline_keyboard = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(f'Option {row}.{column}', callback_data=f'{row}')
+                for column in range(3)
+            ]
+            for row in range(4)
+        ]
+    )
+
+    return {
+        'InlineKeyboardMarkup': inline_keyboard,
+        'ReplyKeyboardMarkup': ReplyKeyboardMarkup(
+            [
+                [KeyboardButton(f'{row}{column}') for column in range(4)]
+                for row in range(4)
+            ],
+            resize_keyboard=True,
+        ),
+        'SendMessageRequest': SendMessageRequest(
+            ChatID(-1001234567890),
+            'Hello, world!',
+            ParseMode.HTML,
+        ),
+    }
+
+
+def _peak_allocated(encode: Callable[[Any], Any], obj: Any) -> int:
+    tracemalloc.start()
+    encode(obj)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def _time(encode: Callable[[Any], Any], obj: Any, iterations: int) -> float:
+    start = perf_counter()
+
+    for _ in range(iterations):
+        encode(obj)
+
+    return (perf_counter() - start) / iterations
+
+
+def main(args):
+    """Parse arguments and run the benchmark."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--iterations', type=int, default=10000)
+    ns = argparser.parse_args(args)
+
+    for name, obj in _objects().items():
+        # Warm up the encoder cache so compilation is not measured.
+        to_json_like(obj)
+
+        for encoder_name, encode in (
+            ('asdict', _asdict_to_json_like),
+            ('compiled', to_json_like),
+        ):
+            elapsed = _time(encode, obj, ns.iterations)
+            peak = _peak_allocated(encode, obj)
+            print(
+                f'{name:>22} {encoder_name:>8}: {elapsed * 1e6:8.2f} us/op, '
+                f'{peak:7,} bytes peak allocated'
+            )
+
+
+if __name__ == '__main__':
+    import sys
+
+    main(sys.argv[1:])
@@ -0,0 +1,240 @@
+"""Measure the throughput of a BotAPI end to end, against a local fake server.
+
+Requests go through real HTTP to `roboto.testing.FakeBotAPI`, so encoding,
+multipart bodies, the transport and decoding are all measured. The server runs
+in the same process, so its work is measured too: compare runs against each
+other, not against Telegram.
+
+Measures:
+    - updates/s decoded by `get_updates`;
+    - messages/s sent by `send_message`, at several concurrency levels;
+    - MiB/s uploaded by `send_document`;
+    - the latency of `send_media_group`;
+    - the peak memory (RSS) of the process.
+
+Results are written as JSON (with the commit they were measured at), and can
+be compared against the results of an earlier run with `--baseline`.
+
+Run with `python -m benchmarks.end_to_end` (needs `trio`), or through
+`python -m tasks benchmark`.
+"""
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import trio
+
+from roboto import BotAPI, ChatID, InputMediaPhoto, Token
+from roboto.session import ConnectionOptions
+from roboto.testing import FakeBotAPI
+
+from .payloads import updates
+
+
+async def _updates_per_second(fake: FakeBotAPI, bot: BotAPI, count: int) -> float:
+    for update in updates(count):
+        fake.add_update(update)
+
+    decoded = 0
+    offset = None
+    start = trio.current_time()
+
+    while decoded < count:
+        batch = await bot.get_updates(offset=offset, limit=100)
+        decoded += len(batch)
+        offset = batch[-1].update_id + 1
+
+    elapsed = trio.current_time() - start
+    # Confirm the last batch, so that it's not kept by the server.
+    await bot.get_updates(offset=offset, limit=1)
+
+    return count / elapsed
+
+
+async def _messages_per_second(bot: BotAPI, requests: int, concurrency: int) -> float:
+    sent = 0
+
+    async def sender() -> None:
+        nonlocal sent
+
+        while sent < requests:
+            sent += 1
+            await bot.send_message(ChatID(1), 'Hello')
+
+    start = trio.current_time()
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(concurrency):
+            nursery.start_soon(sender)
+
+    return requests / (trio.current_time() - start)
+
+
+async def _upload_mib_per_second(bot: BotAPI, path: Path, uploads: int) -> float:
+    start = trio.current_time()
+
+    for _ in range(uploads):
+        await bot.send_document(ChatID(1), path)
+
+    elapsed = trio.current_time() - start
+
+    return path.stat().st_size * uploads / (1 << 20) / elapsed
+
+
+async def _media_group_latencies(
+    bot: BotAPI, paths: List[Path], requests: int
+) -> Dict[str, float]:
+    latencies = []
+
+    for _ in range(requests):
+        start = trio.current_time()
+        await bot.send_media_group(ChatID(1), [InputMediaPhoto(p) for p in paths])
+        latencies.append((trio.current_time() - start) * 1000)
+
+    percentiles = statistics.quantiles(latencies, n=20)
+
+    return {
+        'mean': statistics.mean(latencies),
+        'p50': statistics.median(latencies),
+        'p95': percentiles[18],
+    }
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS, and in KiB elsewhere.
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+async def _run(ns: Any, directory: Path) -> Dict[str, Any]:
+    document = directory / 'document.bin'
+    document.write_bytes(bytes(ns.upload_mib << 20))
+    photos = [directory / f'photo{i}.jpg' for i in range(ns.media_group_size)]
+
+    for photo in photos:
+        photo.write_bytes(bytes(100 << 10))
+
+    options = ConnectionOptions(connections=max(ns.concurrency))
+    results: Dict[str, Any] = {}
+
+    async with FakeBotAPI.make(latency=ns.latency_ms / 1000) as fake:
+        async with BotAPI.make(
+            Token(fake.token), fake.api_url, connection_options=options
+        ) as bot:
+            results['get_updates_updates_per_s'] = await _updates_per_second(
+                fake, bot, ns.updates
+            )
+            results['send_message_messages_per_s'] = {
+                str(concurrency): await _messages_per_second(
+                    bot, ns.messages, concurrency
+                )
+                for concurrency in ns.concurrency
+            }
+            results['send_document_mib_per_s'] = await _upload_mib_per_second(
+                bot, document, ns.uploads
+            )
+            results['send_media_group_latency_ms'] = await _media_group_latencies(
+                bot, photos, ns.media_groups
+            )
+
+    results['peak_rss_mib'] = _peak_rss_mib()
+
+    return results
+
+
+def _commit() -> Optional[str]:
+    try:
+        return (
+            subprocess.run(
+                ['git', 'rev-parse', 'HEAD'],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            .stdout.decode('ascii')
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+
+    return flat
+
+
+def _print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    flat = _flatten(results)
+    flat_baseline = _flatten(baseline or {})
+
+    for name, value in flat.items():
+        line = f'{name:>36}: {value:12,.1f}'
+        before = flat_baseline.get(name)
+
+        if before:
+            line += f' (was {before:12,.1f}, {(value - before) / before:+7.1%})'
+
+        print(line)
+
+
+def main(args):
+    """Parse arguments, run the benchmark and write its results."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--output', type=Path, default=Path('benchmark.json'))
+    argparser.add_argument(
+        '--baseline', type=Path, help='The results of a run to compare against.'
+    )
+    argparser.add_argument('--latency-ms', type=float, default=0)
+    argparser.add_argument('--updates', type=int, default=10000)
+    argparser.add_argument('--messages', type=int, default=2000)
+    argparser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 64])
+    argparser.add_argument('--upload-mib', type=int, default=20)
+    argparser.add_argument('--uploads', type=int, default=5)
+    argparser.add_argument('--media-groups', type=int, default=50)
+    argparser.add_argument('--media-group-size', type=int, default=4)
+    ns = argparser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = trio.run(_run, ns, Path(directory))
+
+    report = {
+        'commit': _commit(),
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            name: value
+            for name, value in vars(ns).items()
+            if name not in ('output', 'baseline')
+        },
+        'results': results,
+    }
+    ns.output.write_text(json.dumps(report, indent=2) + '\n')
+
+    baseline = None
+
+    if ns.baseline is not None:
+        baseline = json.loads(ns.baseline.read_text())['results']
+
+    _print_results(results, baseline)
+    print(f'Results written to {ns.output}.')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
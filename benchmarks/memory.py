@@ -0,0 +1,99 @@
+"""Measure how much memory decoded messages take.
+
+Compares the `__slots__`-based api_types against equivalent dataclasses that
+keep their fields in a per-instance `__dict__` (what api_types used to be).
+
+Run with `python -m benchmarks.memory`.
+"""
+import gc
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import fields, is_dataclass, make_dataclass
+from typing import Any, Callable, Dict, List
+
+from roboto import Message
+from roboto.datautil import from_json_like
+
+from .payloads import photo_message, reply_message, text_message
+
+_DICT_BASED_TYPES: Dict[type, type] = {}
+
+
+def _dict_based_type(cls: type) -> type:
+    try:
+        return _DICT_BASED_TYPES[cls]
+    except KeyError:
+        pass
+
+    dict_based = make_dataclass(
+        cls.__name__, [(f.name, Any) for f in fields(cls)], frozen=True
+    )
+    _DICT_BASED_TYPES[cls] = dict_based
+
+    return dict_based
+
+
+def _copy(value: Any, type_for: Callable[[type], type]) -> Any:
+    """Copy an object graph, using `type_for` to pick each dataclass's type.
+
+    Strings and numbers are shared with the original, so only the dataclass
+    objects (and lists) are newly allocated.
+    """
+    if isinstance(value, list):
+        return [_copy(v, type_for) for v in value]
+
+    if not is_dataclass(value):
+        return value
+
+    obj: Any = object.__new__(type_for(type(value)))
+
+    for f in fields(value):
+        object.__setattr__(obj, f.name, _copy(getattr(value, f.name), type_for))
+
+    return obj
+
+
+def _bytes_per_message(
+    messages: List[Message], type_for: Callable[[type], type]
+) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    copies = [_copy(message, type_for) for message in messages]
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copies
+
+    return (after - before) / len(messages)
+
+
+def main(args):
+    """Parse arguments and run the benchmark."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--count', type=int, default=20000)
+    ns = argparser.parse_args(args)
+
+    for name, payload in (
+        ('text', text_message),
+        ('photo', photo_message),
+        ('reply', reply_message),
+    ):
+        # Decode payloads up front, so only the resulting objects are measured.
+        payloads = [payload(i) for i in range(ns.count)]
+        messages = [from_json_like(Message, p) for p in payloads]
+        del payloads
+
+        for variant, type_for in (
+            ('__dict__', _dict_based_type),
+            ('__slots__', lambda cls: cls),
+        ):
+            per_message = _bytes_per_message(messages, type_for)
+            print(f'{name:>6} {variant:>9}: {per_message:8,.0f} bytes/Message')
+
+
+if __name__ == '__main__':
+    import sys
+
+    main(sys.argv[1:])
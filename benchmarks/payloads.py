@@ -0,0 +1,164 @@
+"""Realistic Bot API payloads for benchmarking."""
+from copy import deepcopy
+from typing import Any, Dict, List
+
+_USER = {
+    'id': 111111111,
+    'is_bot': False,
+    'first_name': 'Alice',
+    'last_name': 'Liddell',
+    'username': 'alice',
+    'language_code': 'en',
+}
+
+_GROUP_CHAT = {
+    'id': -1001234567890,
+    'title': 'Wonderland',
+    'username': 'wonderland',
+    'type': 'supergroup',
+}
+
+_PHOTO_SIZES = [
+    {
+        'file_id': f'AgACAgEAAxkBAAIBX2{size}',
+        'file_unique_id': f'AQADa{size}',
+        'width': size,
+        'height': size * 3 // 4,
+        'file_size': size * 40,
+    }
+    for size in (90, 320, 800, 1280)
+]
+
+
+def text_message(message_id: int = 1) -> Dict[str, Any]:
+    """A group text message with entities."""
+    return {
+        'message_id': message_id,
+        'from': deepcopy(_USER),
+        'chat': deepcopy(_GROUP_CHAT),
+        'date': 1594000000,
+        'text': '/start@roboto_bot check https://example.com #hashtag',
+        'entities': [
+            {'offset': 0, 'length': 17, 'type': 'bot_command'},
+            {'offset': 24, 'length': 19, 'type': 'url'},
+            {'offset': 44, 'length': 8, 'type': 'hashtag'},
+        ],
+    }
+
+
+def photo_message(message_id: int = 1) -> Dict[str, Any]:
+    """A group photo message with a caption and four sizes."""
+    return {
+        'message_id': message_id,
+        'from': deepcopy(_USER),
+        'chat': deepcopy(_GROUP_CHAT),
+        'date': 1594000000,
+        'photo': deepcopy(_PHOTO_SIZES),
+        'caption': 'Down the rabbit hole',
+    }
+
+
+def reply_message(message_id: int = 2) -> Dict[str, Any]:
+    """A group text message replying to a photo message."""
+    message = text_message(message_id)
+    message['reply_to_message'] = photo_message(message_id - 1)
+    return message
+
+
+def update(update_id: int = 1) -> Dict[str, Any]:
+    """A realistic mix of updates, chosen by `update_id`."""
+    kind = update_id % 3
+    message = (
+        text_message(update_id)
+        if kind == 0
+        else photo_message(update_id)
+        if kind == 1
+        else reply_message(update_id)
+    )
+
+    return {'update_id': update_id, 'message': message}
+
+
+def updates(count: int = 100) -> List[Dict[str, Any]]:
+    """A getUpdates result with `count` updates."""
+    return [update(i) for i in range(count)]
+
+
+def callback_query(query_id: int = 1) -> Dict[str, Any]:
+    """A callback query from an inline keyboard under a bot's message."""
+    message = text_message(query_id)
+    message['reply_markup'] = {
+        'inline_keyboard': [
+            [{'text': f'Option {row}.{column}', 'callback_data': f'{row}.{column}'}]
+            for row in range(4)
+            for column in range(3)
+        ]
+    }
+
+    return {
+        'id': f'{4382094029302 + query_id}',
+        'from': deepcopy(_USER),
+        'message': message,
+        'chat_instance': '-8364629202875643911',
+        'data': '2.1',
+    }
+
+
+def chat_administrators(count: int = 50) -> List[Dict[str, Any]]:
+    """A getChatAdministrators result with `count` administrators."""
+    administrators: List[Dict[str, Any]] = [
+        {'user': deepcopy(_USER), 'status': 'creator'}
+    ]
+
+    for i in range(1, count):
+        administrators.append(
+            {
+                'user': {
+                    'id': 100000000 + i,
+                    'is_bot': i % 10 == 0,
+                    'first_name': f'Admin {i}',
+                    'username': f'admin{i}',
+                },
+                'status': 'administrator',
+                'custom_title': f'Moderator {i}',
+                'can_be_edited': False,
+                'can_change_info': True,
+                'can_delete_messages': True,
+                'can_invite_users': True,
+                'can_restrict_members': True,
+                'can_pin_messages': True,
+                'can_promote_members': False,
+            }
+        )
+
+    return administrators
+
+
+def sticker_set(count: int = 120) -> Dict[str, Any]:
+    """A getStickerSet result with `count` stickers (the most a set can hold)."""
+    return {
+        'name': 'wonderland_by_roboto_bot',
+        'title': 'Wonderland',
+        'is_animated': False,
+        'contains_masks': False,
+        'stickers': [
+            {
+                'file_id': f'CAACAgEAAxkBAAIBY2{i:03}',
+                'file_unique_id': f'AgADY2{i:03}',
+                'width': 512,
+                'height': 512,
+                'is_animated': False,
+                'thumb': {
+                    'file_id': f'AAMCAQADGQEAAgFj{i:03}',
+                    'file_unique_id': f'AQADY2{i:03}',
+                    'width': 128,
+                    'height': 128,
+                    'file_size': 4096,
+                },
+                'emoji': '🐇',
+                'set_name': 'wonderland_by_roboto_bot',
+                'file_size': 24576,
+            }
+            for i in range(count)
+        ],
+    }
@@ -0,0 +1,125 @@
+"""Measure the throughput of concurrent requests against the connection pool size.
+
+A local HTTP server answers every request after a fixed latency (standing in
+for the round trip to Telegram), while many tasks send messages at once
+through a BotAPI. The first row uses what asks does by default: a single
+connection, closed after every request.
+
+Run with `python -m benchmarks.pool` (needs `trio`).
+"""
+import json
+from argparse import ArgumentParser
+from functools import partial
+
+import h11
+import trio
+
+from roboto import BotAPI, ChatID, Token
+from roboto.session import ConnectionOptions
+from roboto.url import URL
+
+_BODY = json.dumps(
+    {
+        'ok': True,
+        'result': {
+            'message_id': 1,
+            'from': {'id': 1, 'is_bot': True, 'first_name': 'Bot'},
+            'date': 0,
+            'chat': {'id': 1, 'type': 'private'},
+            'text': 'Hello',
+        },
+    }
+).encode()
+
+
+async def _handle(latency: float, stream: trio.SocketStream) -> None:
+    connection = h11.Connection(h11.SERVER)
+
+    try:
+        while True:
+            event = connection.next_event()
+
+            if event is h11.NEED_DATA:
+                connection.receive_data(await stream.receive_some())
+            elif isinstance(event, h11.EndOfMessage):
+                await trio.sleep(latency)
+                headers = [
+                    ('Content-Type', 'application/json'),
+                    ('Content-Length', str(len(_BODY))),
+                ]
+                await stream.send_all(
+                    connection.send(h11.Response(status_code=200, headers=headers))
+                    + connection.send(h11.Data(data=_BODY))
+                    + connection.send(h11.EndOfMessage())
+                )
+
+                if connection.our_state is not h11.DONE:
+                    return
+
+                connection.start_next_cycle()
+            elif isinstance(event, h11.ConnectionClosed):
+                return
+    except (trio.BrokenResourceError, h11.RemoteProtocolError):
+        pass
+    finally:
+        await stream.aclose()
+
+
+async def _throughput(
+    api_url: URL, options: ConnectionOptions, requests: int, concurrency: int
+) -> float:
+    sent = 0
+
+    async with BotAPI.make(Token('token'), api_url, connection_options=options) as bot:
+
+        async def sender() -> None:
+            nonlocal sent
+
+            while sent < requests:
+                sent += 1
+                await bot.send_message(ChatID(1), 'Hello')
+
+        start = trio.current_time()
+
+        async with trio.open_nursery() as nursery:
+            for _ in range(concurrency):
+                nursery.start_soon(sender)
+
+        return requests / (trio.current_time() - start)
+
+
+async def _run(latency: float, requests: int, concurrency: int) -> None:
+    async with trio.open_nursery() as nursery:
+        listeners = await nursery.start(
+            partial(trio.serve_tcp, partial(_handle, latency), 0, host='127.0.0.1')
+        )
+        port = listeners[0].socket.getsockname()[1]
+        api_url = URL.make(f'http://127.0.0.1:{port}')
+        rows = [('asks default', ConnectionOptions(connections=1, keep_alive=False))]
+        rows += [
+            (f'{connections} connections', ConnectionOptions(connections=connections))
+            for connections in (1, 2, 4, 8, 16, 32, 64)
+        ]
+
+        for name, options in rows:
+            throughput = await _throughput(api_url, options, requests, concurrency)
+            print(f'{name:>15}: {throughput:8,.1f} requests/s')
+
+        nursery.cancel_scope.cancel()
+
+
+def main(args):
+    """Parse arguments and run the benchmark."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--latency-ms', type=float, default=20)
+    argparser.add_argument('--requests', type=int, default=1000)
+    argparser.add_argument('--concurrency', type=int, default=64)
+    ns = argparser.parse_args(args)
+
+    trio.run(_run, ns.latency_ms / 1000, ns.requests, ns.concurrency)
+
+
+if __name__ == '__main__':
+    import sys
+
+    main(sys.argv[1:])
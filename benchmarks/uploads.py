@@ -0,0 +1,107 @@
+"""Measure the memory taken by the bodies of concurrent large uploads.
+
+Compares building multipart bodies with `roboto.multipart.MultipartBody`
+against asks' own multipart builder (what uploads used before). Several
+tasks upload the same file at once:
+
+    - `asks` and `MultipartBody.read` build each whole body and hold it as
+      if it was being sent. asks can't stream request bodies, so this is what
+      uploads through `roboto.transport.AsksTransport` take: about the size
+      of the file for each upload.
+    - `MultipartBody.chunks` reads each body a chunk at a time, as if it was
+      being streamed (as `roboto.httpx_transport.HTTPXTransport` does).
+
+Run with `python -m benchmarks.uploads` (needs `trio`).
+"""
+import gc
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+import trio
+from asks.multipart import build_multipart_body
+
+from roboto.multipart import MultipartBody
+
+BodyBuilder = Callable[[Dict[str, Any]], Awaitable[bytes]]
+
+
+async def _asks_body(fields: Dict[str, Any]) -> bytes:
+    return await build_multipart_body(fields, 'utf-8', 'boundary')
+
+
+async def _roboto_body(fields: Dict[str, Any]) -> bytes:
+    return await MultipartBody.make(fields).read()
+
+
+async def _streamed_body(fields: Dict[str, Any]) -> bytes:
+    async for _ in MultipartBody.make(fields).chunks():
+        # Let the other uploads read their chunks meanwhile.
+        await trio.sleep(0)
+
+    return b''
+
+
+async def _peak_memory(build: BodyBuilder, path: Path, uploads: int) -> int:
+    built = 0
+    all_built = trio.Event()
+
+    async def upload() -> None:
+        nonlocal built
+
+        body = await build({'chat_id': 1, 'video': path})
+        built += 1
+
+        if built == uploads:
+            all_built.set()
+
+        await all_built.wait()
+        del body
+
+    gc.collect()
+    tracemalloc.start()
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(uploads):
+            nursery.start_soon(upload)
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def main(args):
+    """Parse arguments and run the benchmark."""
+    argparser = ArgumentParser()
+    argparser.add_argument('--size-mb', type=int, default=50)
+    argparser.add_argument('--uploads', type=int, default=4)
+    ns = argparser.parse_args(args)
+
+    size = ns.size_mb << 20
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'video.mp4'
+
+        with path.open('wb') as f:
+            for _ in range(ns.size_mb):
+                f.write(b'\0' * (1 << 20))
+
+        for name, build in (
+            ('asks', _asks_body),
+            ('MultipartBody.read', _roboto_body),
+            ('MultipartBody.chunks', _streamed_body),
+        ):
+            peak = trio.run(_peak_memory, build, path, ns.uploads)
+            print(
+                f'{name:>20}: {peak / (1 << 20):8,.1f} MiB peak for {ns.uploads} '
+                f'uploads ({peak / (size * ns.uploads):.2f}x the file sizes)'
+            )
+
+
+if __name__ == '__main__':
+    import sys
+
+    main(sys.argv[1:])
@@ -1,4 +1,5 @@
 """Module for running test bots for testing Roboto's API."""
+from functools import partial
 from pathlib import Path
 from typing import Awaitable, Callable
 
@@ -14,6 +15,8 @@ from roboto import (
     Token,
     Update,
 )
+from roboto.dispatch import Dispatcher
+from roboto.polling import UpdatePoller
 
 app = typer.Typer()
 
@@ -21,21 +24,20 @@ app = typer.Typer()
 async def run_bot(token: str, handler: Callable[[BotAPI, Update], Awaitable[None]]):
     """Run a simple bot with a handler for its updates.
 
+    Updates from different chats are handled concurrently, and the next
+    updates are fetched while handlers run.
+
     Args:
         token: Token for the bot.
         handler: A handler that does something with an update.
     """
     async with BotAPI.make(Token(token)) as bot:
-        offset = 0
-
-        while True:
-            updates = await bot.get_updates(offset)
-
-            for update in updates:
-                await handler(bot, update)
-
-            if updates:
-                offset = updates[-1].update_id + 1
+        async with UpdatePoller.make(bot) as poller:
+            async with Dispatcher.make(
+                partial(handler, bot), on_handled=poller.ack
+            ) as dispatcher:
+                async for update in poller:
+                    await dispatcher.dispatch(update)
 
 
 async def callback_query_handler(bot: BotAPI, update: Update):
@@ -8,6 +8,7 @@ from typing import BinaryIO, List, NewType, Optional, Union
 
 from typing_extensions import Literal
 
+from .slots import with_slots
 from .url import URL
 
 Token = NewType('Token', str)
@@ -22,11 +23,12 @@ CallbackQueryID = NewType('CallbackQueryID', str)
 StickerSetName = NewType('StickerSetName', str)
 
 
+@with_slots
 @dataclass(frozen=True)
 class FileDescription:
     """Describe a file to be sent through the API with customized metadata."""
 
-    binary_source: Union[Path, BinaryIO, bytes]
+    binary_source: Union[Path, BinaryIO, bytes, bytearray, memoryview]
     basename: str
     mime_type: str = 'application/octet-stream'
 
@@ -50,6 +52,8 @@ Refer to https://core.telegram.org/bots/api#sending-files for more information.
 
 @dataclass(frozen=True)
 class _UserRequiredCommon:
+    __slots__ = ()
+
     id: UserID
     is_bot: bool
     first_name: str
@@ -57,6 +61,8 @@ class _UserRequiredCommon:
 
 @dataclass(frozen=True)
 class _BotUserRequired(_UserRequiredCommon):
+    __slots__ = ()
+
     can_join_groups: bool
     can_read_all_group_messages: bool
     supports_inline_queries: bool
@@ -64,21 +70,26 @@ class _BotUserRequired(_UserRequiredCommon):
 
 @dataclass(frozen=True)
 class _UserOptionalCommon:
+    __slots__ = ()
+
     last_name: Optional[str] = None
     username: Optional[str] = None
     language_code: Optional[str] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class User(_UserOptionalCommon, _UserRequiredCommon):
     """A user returned by the Bot API."""
 
 
+@with_slots
 @dataclass(frozen=True)
 class BotUser(_UserOptionalCommon, _BotUserRequired):
     """A Bot user returned by the Bot API (only through getMe)."""
 
 
+@with_slots
 @dataclass(frozen=True)
 class ChatPhoto:
     """Information for fetching the chat picture."""
@@ -89,6 +100,7 @@ class ChatPhoto:
     big_file_unique_id: FileUniqueID
 
 
+@with_slots
 @dataclass(frozen=True)
 class ChatMember:
     """Information about one member of a chat."""
@@ -114,6 +126,7 @@ class ChatMember:
     can_add_web_page_previews: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ChatPermissions:
     """Actions that a non-administrator user is allowed to take in a chat."""
@@ -128,6 +141,7 @@ class ChatPermissions:
     can_pin_messages: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Chat:
     """Representation of a given chat."""
@@ -149,6 +163,7 @@ class Chat:
     can_set_sticker_set: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class MessageEntity:
     """An entity inside a message (hashtags, links...)"""
@@ -161,6 +176,7 @@ class MessageEntity:
     language: Optional[str] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class PhotoSize:
     """Data about an image size both in pixels and bytes."""
@@ -172,6 +188,7 @@ class PhotoSize:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Audio:
     """Metadata about an audio message."""
@@ -186,6 +203,7 @@ class Audio:
     thumb: Optional[PhotoSize] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Document:
     """Metadata about a generic file."""
@@ -198,6 +216,7 @@ class Document:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Animation:
     """Metadata about a message with an animation (gif, mp4)."""
@@ -213,6 +232,7 @@ class Animation:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Game:
     """Data about a Telegram Game."""
@@ -225,6 +245,7 @@ class Game:
     animation: Optional[Animation] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class MaskPosition:
     """Information about where to put a mask on a face."""
@@ -235,6 +256,7 @@ class MaskPosition:
     scale: float
 
 
+@with_slots
 @dataclass(frozen=True)
 class Sticker:
     """Metadata about a given sticker."""
@@ -251,6 +273,7 @@ class Sticker:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class StickerSet:
     """Data about a sticker set."""
@@ -263,6 +286,7 @@ class StickerSet:
     thumb: Optional[PhotoSize] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Video:
     """Metadata about a video message."""
@@ -277,6 +301,7 @@ class Video:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Voice:
     """Metadata about a voice message."""
@@ -288,6 +313,7 @@ class Voice:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class VideoNote:
     """Metadata on a video note."""
@@ -300,6 +326,7 @@ class VideoNote:
     file_size: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Contact:
     """Representation of a contact."""
@@ -311,6 +338,7 @@ class Contact:
     vcard: Optional[str] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Location:
     """A GPS location."""
@@ -319,6 +347,7 @@ class Location:
     latitude: float
 
 
+@with_slots
 @dataclass(frozen=True)
 class Venue:
     """A venue on Foursquare."""
@@ -330,6 +359,7 @@ class Venue:
     foursquare_type: Optional[str] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class PollOption:
     """Option/Answer for a Poll"""
@@ -338,6 +368,7 @@ class PollOption:
     voter_count: int
 
 
+@with_slots
 @dataclass(frozen=True)
 class PollAnswer:
     """An answer of a user in a non-anonymous poll."""
@@ -354,6 +385,7 @@ class PollType(Enum):
     REGULAR = 'regular'
 
 
+@with_slots
 @dataclass(frozen=True)
 class Poll:
     """Representation of a Poll."""
@@ -381,6 +413,7 @@ class DiceEmoji(Enum):
     BASKETBALL = '🏀'
 
 
+@with_slots
 @dataclass(frozen=True)
 class Dice:
     """Representation of a Dice"""
@@ -389,6 +422,7 @@ class Dice:
     value: int
 
 
+@with_slots
 @dataclass(frozen=True)
 class UserProfilePhotos:
     """A user's profile pictures."""
@@ -397,6 +431,7 @@ class UserProfilePhotos:
     photos: List[List[PhotoSize]]
 
 
+@with_slots
 @dataclass(frozen=True)
 class File:
     """A file ready to be downloaded."""
@@ -407,6 +442,7 @@ class File:
     file_path: Optional[str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class Invoice:
     """A billing invoice."""
@@ -418,6 +454,7 @@ class Invoice:
     total_amount: int
 
 
+@with_slots
 @dataclass(frozen=True)
 class ShippingAddress:
     """An address for online purchases."""
@@ -430,6 +467,7 @@ class ShippingAddress:
     post_code: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class OrderInfo:
     """Information about an order."""
@@ -440,6 +478,7 @@ class OrderInfo:
     shipping_address: Optional[ShippingAddress] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SuccessfulPayment:
     """Confirmation data for a successful payment."""
@@ -453,6 +492,7 @@ class SuccessfulPayment:
     order_info: Optional[OrderInfo] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class PassportData:
     """Information about Telegram Passport data shared with the bot by the user."""
@@ -461,6 +501,7 @@ class PassportData:
     credentials: EncryptedCredentials
 
 
+@with_slots
 @dataclass(frozen=True)
 class PassportFile:
     """A file uploaded to Telegram Passport.
@@ -475,6 +516,7 @@ class PassportFile:
     file_date: int
 
 
+@with_slots
 @dataclass(frozen=True)
 class EncryptedPassportElement:
     """Information about Telegram Passport elements shared with the bot by the user."""
@@ -491,6 +533,7 @@ class EncryptedPassportElement:
     translation: Optional[List[PassportFile]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EncryptedCredentials:
     """Data required for decrypting and authenticating EncryptedPassportElement.
@@ -504,6 +547,7 @@ class EncryptedCredentials:
     secret: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class InlineKeyboardMarkup:
     """Represents an inline keyboard that appears next to the message it belongs to."""
@@ -511,6 +555,7 @@ class InlineKeyboardMarkup:
     inline_keyboard: List[List[InlineKeyboardButton]]
 
 
+@with_slots
 @dataclass(frozen=True)
 class InlineKeyboardButton:
     """One button of an inline keyboard.
@@ -528,11 +573,13 @@ class InlineKeyboardButton:
     pay: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class CallbackGame:
     """A placeholder, currently holds no information."""
 
 
+@with_slots
 @dataclass(frozen=True)
 class _MessageBase:
     """Base data for a Telegram Message.
@@ -590,6 +637,7 @@ class _MessageBase:
     reply_markup: Optional[InlineKeyboardMarkup] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class MessageWithNoReply(_MessageBase):
     """ A Message object without reply_to_message and pinned_message.
@@ -602,6 +650,7 @@ class MessageWithNoReply(_MessageBase):
     """
 
 
+@with_slots
 @dataclass(frozen=True)
 class Message(_MessageBase):
     """Data for a Telegram message."""
@@ -610,6 +659,7 @@ class Message(_MessageBase):
     pinned_message: Optional[MessageWithNoReply] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class InlineQuery:
     """An incoming inline query."""
@@ -621,6 +671,7 @@ class InlineQuery:
     location: Optional[Location] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ChosenInlineResult:
     """The result of an inline query that was chosen by the user."""
@@ -632,6 +683,7 @@ class ChosenInlineResult:
     inline_message_id: Optional[str] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class CallbackQuery:
     """An incoming callback from an inline keyboard."""
@@ -645,6 +697,7 @@ class CallbackQuery:
     game_short_name: Optional[str] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ShippingQuery:
     """An incoming shipping query."""
@@ -655,6 +708,7 @@ class ShippingQuery:
     from_: User = field(metadata={'rename': 'from'})
 
 
+@with_slots
 @dataclass(frozen=True)
 class PreCheckoutQuery:
     """An incoming pre-checkout query."""
@@ -668,6 +722,7 @@ class PreCheckoutQuery:
     order_info: Optional[OrderInfo] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class Update:
     """An update for the bot.
@@ -687,6 +742,7 @@ class Update:
     pre_checkout_query: Optional[PreCheckoutQuery] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class BotCommand:
     """This object represents a bot command."""
@@ -695,14 +751,31 @@ class BotCommand:
     description: str
 
 
+@with_slots
+@dataclass(frozen=True)
+class WebhookInfo:
+    """The current status of a bot's webhook."""
+
+    url: str
+    has_custom_certificate: bool
+    pending_update_count: int
+    ip_address: Optional[str] = None
+    last_error_date: Optional[int] = None
+    last_error_message: Optional[str] = None
+    max_connections: Optional[int] = None
+    allowed_updates: Optional[List[str]] = None
+
+
+@with_slots
 @dataclass(frozen=True)
 class ResponseParameters:
     """Information about why a request was unsuccessful."""
 
-    migrate_to_chat_id: Optional[int]
-    retry_after: Optional[int]
+    migrate_to_chat_id: Optional[int] = None
+    retry_after: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class InputMediaPhoto:
     """A photo to be sent."""
@@ -713,6 +786,7 @@ class InputMediaPhoto:
     type: Literal['photo'] = field(default='photo', init=False)
 
 
+@with_slots
 @dataclass(frozen=True)
 class InputMediaVideo:
     """The content of a media message to be sent.
@@ -731,6 +805,7 @@ class InputMediaVideo:
     type: Literal['video'] = field(default='video', init=False)
 
 
+@with_slots
 @dataclass(frozen=True)
 class InputMediaAnimation:
     """The content of a media message to be sent.
@@ -749,6 +824,7 @@ class InputMediaAnimation:
     type: Literal['animation'] = field(default='animation', init=False)
 
 
+@with_slots
 @dataclass(frozen=True)
 class InputMediaAudio:
     """The content of a media message to be sent.
@@ -766,6 +842,7 @@ class InputMediaAudio:
     type: Literal['animation'] = field(default='animation', init=False)
 
 
+@with_slots
 @dataclass(frozen=True)
 class InputMediaDocument:
     """A photo to be sent."""
@@ -793,6 +870,7 @@ class ParseMode(Enum):
     HTML = 'HTML'
 
 
+@with_slots
 @dataclass(frozen=True)
 class LoginUrl:
     """A parameter used to automatically authorize a user.
@@ -806,6 +884,7 @@ class LoginUrl:
     request_write_access: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class KeyboardButtonPollType:
     """The type of a poll.
@@ -817,6 +896,7 @@ class KeyboardButtonPollType:
     type: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class KeyboardButton:
     """One button of the reply keyboard.
@@ -830,6 +910,7 @@ class KeyboardButton:
     request_poll: Optional[KeyboardButtonPollType] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ReplyKeyboardMarkup:
     """A custom keyboard with reply options.
@@ -843,6 +924,7 @@ class ReplyKeyboardMarkup:
     selective: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ReplyKeyboardRemove:
     """Request for a client to remove the custom current keyboard."""
@@ -851,6 +933,7 @@ class ReplyKeyboardRemove:
     selective: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ForceReply:
     """Request for a client to display a reply interface to the user."""
@@ -957,4 +1040,5 @@ __all__ = [
     'Video',
     'VideoNote',
     'Voice',
+    'WebhookInfo',
 ]
@@ -1,9 +1,22 @@
 """The main bot class for Roboto."""
+import warnings
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
-from typing import List, Optional, Union
+from dataclasses import dataclass, field, replace
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from asks import Session
+import anyio
 
 from .api_types import (
     BotCommand,
@@ -35,20 +48,32 @@ from .api_types import (
     Update,
     UserID,
     UserProfilePhotos,
+    WebhookInfo,
 )
+from .cache import ResponseCache, TTLCache
+from .coalesce import Coalescer
 from .datautil import from_json_like
+from .downloads import FILE_PATH_TTL, open_download
+from .error import BotAPIError, RobotoError
 from .http_api import (
+    APIClient,
     HTTPMethod,
     make_multipart_request,
     make_multipart_request_with_attachments,
     make_request,
 )
+from .json_codec import STDLIB_JSON, JSONCodec
 from .media import extract_medias
+from .metrics import MetricsSink
+from .profiling import staged_methods
+from .rate_limit import RateLimiter
+from .replay import UpdateRecorder
 from .request_types import (
     AnswerCallbackQueryRequest,
     DeleteChatPhotoRequest,
     DeleteChatStickerSetRequest,
     DeleteMessageRequest,
+    DeleteWebhookRequest,
     EditInlineMessageCaptionRequest,
     EditInlineMessageLiveLocationRequest,
     EditInlineMessageMediaRequest,
@@ -97,6 +122,7 @@ from .request_types import (
     SetChatStickerSetRequest,
     SetChatTitleRequest,
     SetMyCommandsRequest,
+    SetWebhookRequest,
     StopInlineMessageLiveLocationRequest,
     StopMessageLiveLocationRequest,
     StopPollRequest,
@@ -105,11 +131,16 @@ from .request_types import (
     json_serialize,
     maybe_json_serialize,
 )
+from .retry import RetryPolicy
+from .session import ConnectionOptions
+from .transport import AsksTransport, TransportFactory
+from .upload_cache import UploadCache, is_file_id_error, uploaded_file_id
 from .url import URL
 
 TELEGRAM_BOT_API_URL = URL.make('https://api.telegram.org')
 
 
+@staged_methods
 @dataclass
 class BotAPI:
     """Bot API wrapper.
@@ -118,17 +149,58 @@ class BotAPI:
     Use the static method `make` which does everything for you (and its API
     is independent from the HTTP library).
 
+    Calls of its coroutine methods are stages for `roboto.profiling`.
+
     Args:
-        token: The Telegram API token for the bot.
-        session: An asks.Session object.
+        client: An APIClient object.
+        lazy_updates: Whether updates from `get_updates` are decoded lazily
+                      (see `roboto.datautil.from_json_like`).
+        upload_cache: Where the file ids of uploaded files are remembered, so
+                      that sending the same file again reuses them. If None,
+                      files are always uploaded.
+        update_recorder: Where the raw results of `get_updates` are recorded
+                         (see `roboto.replay.UpdateRecorder`). If None,
+                         nothing is recorded.
     """
 
-    session: Session
+    client: APIClient
+    lazy_updates: bool = False
+    upload_cache: Optional[UploadCache] = None
+    update_recorder: Optional[UpdateRecorder] = None
+    file_paths: TTLCache[FileID, str] = field(
+        default_factory=TTLCache, init=False, repr=False, compare=False
+    )
+
+    @property
+    def session(self) -> APIClient:
+        """Deprecated alias of `client`, which replaced the asks session.
+
+        The asks session itself, if any, is `client.transport.session`.
+        """
+        warnings.warn(
+            'BotAPI.session is deprecated, use BotAPI.client instead.',
+            DeprecationWarning,
+            stacklevel=2,
+        )
+
+        return self.client
 
     @staticmethod
     @asynccontextmanager
     async def make(
-        token: Token, api_url: URL = TELEGRAM_BOT_API_URL,
+        token: Token,
+        api_url: URL = TELEGRAM_BOT_API_URL,
+        json_codec: JSONCodec = STDLIB_JSON,
+        lazy_updates: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        upload_cache: Optional[UploadCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalescer: Optional[Coalescer] = None,
+        connection_options: ConnectionOptions = ConnectionOptions(),
+        transport: TransportFactory = AsksTransport.make,
+        metrics: Optional[MetricsSink] = None,
+        update_recorder: Optional[UpdateRecorder] = None,
     ):
         """Context manager for creating a BotAPI object.
 
@@ -138,12 +210,103 @@ class BotAPI:
             token: The Telegram Bot API token for the bot.
             api_url: The Telegram Bot API URL. Just for future-proofing. The
                      default should be ok.
+            json_codec: The JSON implementation to use for requests and
+                        responses (see `roboto.json_codec.get_json_codec`).
+            lazy_updates: Decode the nested objects of updates (messages,
+                          photos, entities...) only when they are first
+                          accessed.
+            retry_policy: How to retry failed requests (see
+                          `roboto.retry.RetryPolicy`). If None, failed
+                          requests are not retried.
+            rate_limiter: What throttles requests to stay within Telegram's
+                          limits (see `roboto.rate_limit.RateLimiter`). If
+                          None, requests are not throttled.
+            upload_cache: Where the file ids of uploaded files are remembered
+                          (see `roboto.upload_cache.UploadCache`). If None,
+                          files are always uploaded.
+            response_cache: Where the results of read-only methods (`get_chat`,
+                            `get_chat_member`, `get_me`...) are cached (see
+                            `roboto.cache.ResponseCache`). If None, nothing is
+                            cached.
+            coalescer: What makes identical requests to read-only methods
+                       in flight at the same time once (see
+                       `roboto.coalesce.Coalescer`). If None, every request is
+                       made.
+            connection_options: The size of the connection pools, timeouts
+                                and keep-alive (see
+                                `roboto.session.ConnectionOptions`).
+            transport: What makes the HTTP transport requests are sent
+                       through (see `roboto.transport`). `AsksTransport.make`
+                       by default, or e.g. `HTTPXTransport.make` from
+                       `roboto.httpx_transport` for HTTP/2.
+            metrics: Where the count, errors, sizes and latencies of requests
+                     are recorded, by API method (see `roboto.metrics`). If
+                     None, nothing is measured.
+            update_recorder: Where the updates fetched by `get_updates` are
+                             recorded, to be replayed later (see
+                             `roboto.replay`). If None, nothing is recorded.
 
         Yields:
             A BotAPI object.
         """
-        async with Session(base_location=api_url, endpoint=f'/bot{token}') as s:
-            yield BotAPI(s)
+        async with transport(api_url, token, connection_options) as t:
+            yield BotAPI(
+                APIClient(
+                    t,
+                    json_codec,
+                    retry_policy,
+                    rate_limiter,
+                    response_cache,
+                    coalescer,
+                    metrics,
+                ),
+                lazy_updates,
+                upload_cache,
+                update_recorder,
+            )
+
+    async def _send_file(self, api_method: str, request: Any, kind: str) -> Message:
+        """Send a file, reusing its file id if it was uploaded before."""
+        cache = self.upload_cache
+
+        if cache is None:
+            return await make_multipart_request(
+                self.client,
+                api_method,
+                request,
+                read_result=partial(from_json_like, Message),
+            )
+
+        input_file = getattr(request, kind)
+        file_id, keys = await cache.lookup(input_file, kind)
+
+        if file_id is not None:
+            try:
+                return await make_multipart_request(
+                    self.client,
+                    api_method,
+                    replace(request, **{kind: file_id}),
+                    read_result=partial(from_json_like, Message),
+                )
+            except BotAPIError as e:
+                if not is_file_id_error(e):
+                    raise
+
+            # Telegram refused the file id (e.g. it expired), so upload again.
+            await cache.forget(keys)
+
+        message = await make_multipart_request(
+            self.client,
+            api_method,
+            request,
+            read_result=partial(from_json_like, Message),
+        )
+        uploaded = uploaded_file_id(message, kind)
+
+        if uploaded is not None:
+            await cache.remember(keys, uploaded)
+
+        return message
 
     async def get_me(self) -> BotUser:
         """getMe API method.
@@ -151,16 +314,19 @@ class BotAPI:
         Returns:
             User: the user object representing the bot itself.
         """
-        return from_json_like(
-            BotUser, await make_request(self.session, HTTPMethod.GET, '/getMe')
+        return await make_request(
+            self.client,
+            HTTPMethod.GET,
+            '/getMe',
+            read_result=partial(from_json_like, BotUser),
         )
 
     async def get_updates(
         self,
-        offset: int = None,
-        limit: int = None,
-        timeout: int = None,
-        allowed_updates: List[str] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+        timeout: Optional[int] = None,
+        allowed_updates: Optional[List[str]] = None,
     ) -> List[Update]:
         """getUpdates API method. Won't work if a webhook is setup.
 
@@ -175,9 +341,93 @@ class BotAPI:
         """
         request = GetUpdatesRequest(offset, limit, timeout, allowed_updates)
 
-        return from_json_like(
-            List[Update],
-            await make_request(self.session, HTTPMethod.GET, '/getUpdates', request),
+        def read_updates(raw_updates: Any) -> Tuple[Any, List[Update]]:
+            updates = from_json_like(List[Update], raw_updates, lazy=self.lazy_updates)
+
+            return raw_updates, updates
+
+        raw_updates, updates = await make_request(
+            self.client,
+            HTTPMethod.GET,
+            '/getUpdates',
+            request,
+            read_result=read_updates,
+        )
+
+        # Recorded outside of decoding, so that writing isn't measured in it.
+        if self.update_recorder is not None:
+            await self.update_recorder.record(raw_updates)
+
+        return updates
+
+    async def set_webhook(
+        self,
+        url: URL,
+        certificate: Optional[InputFile] = None,
+        ip_address: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        allowed_updates: Optional[List[str]] = None,
+        drop_pending_updates: Optional[bool] = None,
+        secret_token: Optional[str] = None,
+    ) -> bool:
+        """setWebhook API method.
+
+        Args:
+            url: The HTTPS URL to send updates to.
+            certificate: The public key certificate of the server, if it is
+                         self-signed.
+            ip_address: A fixed IP address to send updates to, instead of
+                        resolving the URL's host.
+            max_connections: Maximum number of simultaneous connections to
+                             deliver updates through (1-100).
+            allowed_updates: Which kind of updates to receive.
+            drop_pending_updates: Whether to drop updates not delivered yet.
+            secret_token: A token to be sent with every update in the
+                          X-Telegram-Bot-Api-Secret-Token header.
+        """
+
+        request = SetWebhookRequest(
+            url,
+            certificate,
+            ip_address,
+            max_connections,
+            maybe_json_serialize(allowed_updates, self.client.json_codec),
+            drop_pending_updates,
+            secret_token,
+        )
+
+        return await make_multipart_request(
+            self.client,
+            '/setWebhook',
+            request,
+            read_result=partial(from_json_like, bool),
+        )
+
+    async def delete_webhook(self, drop_pending_updates: Optional[bool] = None) -> bool:
+        """deleteWebhook API method.
+
+        Args:
+            drop_pending_updates: Whether to drop updates not delivered yet.
+        """
+
+        request = DeleteWebhookRequest(drop_pending_updates)
+
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/deleteWebhook',
+            request,
+            read_result=partial(from_json_like, bool),
+        )
+
+    async def get_webhook_info(self) -> WebhookInfo:
+        """getWebhookInfo API method."""
+
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getWebhookInfo',
+            read_result=partial(from_json_like, WebhookInfo),
         )
 
     async def send_message(
@@ -214,12 +464,15 @@ class BotAPI:
             disable_web_page_preview,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(self.session, HTTPMethod.POST, '/sendMessage', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendMessage',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def forward_message(
@@ -245,11 +498,12 @@ class BotAPI:
             chat_id, from_chat_id, message_id, disable_notification,
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/forwardMessage', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/forwardMessage',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def send_photo(
@@ -285,12 +539,10 @@ class BotAPI:
             parse_mode,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message, await make_multipart_request(self.session, '/sendPhoto', request),
-        )
+        return await self._send_file('/sendPhoto', request, 'photo')
 
     async def send_audio(
         self,
@@ -340,12 +592,10 @@ class BotAPI:
             thumb,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message, await make_multipart_request(self.session, '/sendAudio', request),
-        )
+        return await self._send_file('/sendAudio', request, 'audio')
 
     async def send_document(
         self,
@@ -386,13 +636,10 @@ class BotAPI:
             parse_mode,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_multipart_request(self.session, '/sendDocument', request),
-        )
+        return await self._send_file('/sendDocument', request, 'document')
 
     async def send_video(
         self,
@@ -445,12 +692,10 @@ class BotAPI:
             disable_notification,
             supports_streaming,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message, await make_multipart_request(self.session, '/sendVideo', request),
-        )
+        return await self._send_file('/sendVideo', request, 'video')
 
     async def send_animation(
         self,
@@ -500,13 +745,10 @@ class BotAPI:
             parse_mode,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_multipart_request(self.session, '/sendAnimation', request),
-        )
+        return await self._send_file('/sendAnimation', request, 'animation')
 
     async def send_voice(
         self,
@@ -547,12 +789,10 @@ class BotAPI:
             duration,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message, await make_multipart_request(self.session, '/sendVoice', request),
-        )
+        return await self._send_file('/sendVoice', request, 'voice')
 
     async def send_video_note(
         self,
@@ -592,13 +832,10 @@ class BotAPI:
             thumb,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_multipart_request(self.session, '/sendVideoNote', request),
-        )
+        return await self._send_file('/sendVideoNote', request, 'video_note')
 
     async def send_media_group(
         self,
@@ -621,14 +858,18 @@ class BotAPI:
         media, attachments = extract_medias(media)
 
         request = SendMediaGroupRequest(
-            chat_id, json_serialize(media), disable_notification, reply_to_message_id,
+            chat_id,
+            json_serialize(media, self.client.json_codec),
+            disable_notification,
+            reply_to_message_id,
         )
 
-        return from_json_like(
-            List[Message],
-            await make_multipart_request_with_attachments(
-                self.session, '/sendMediaGroup', request, attachments
-            ),
+        return await make_multipart_request_with_attachments(
+            self.client,
+            '/sendMediaGroup',
+            request,
+            attachments,
+            read_result=partial(from_json_like, List[Message]),
         )
 
     async def send_location(
@@ -661,12 +902,15 @@ class BotAPI:
             live_period,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(self.session, HTTPMethod.POST, '/sendLocation', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendLocation',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_message_live_location(
@@ -696,14 +940,15 @@ class BotAPI:
             message_id,
             latitude,
             longitude,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageLiveLocation', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageLiveLocation',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_inline_message_live_location(
@@ -727,14 +972,18 @@ class BotAPI:
         """
 
         request = EditInlineMessageLiveLocationRequest(
-            inline_message_id, latitude, longitude, maybe_json_serialize(reply_markup),
+            inline_message_id,
+            latitude,
+            longitude,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageLiveLocation', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageLiveLocation',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def stop_message_live_location(
@@ -756,14 +1005,17 @@ class BotAPI:
         """
 
         request = StopMessageLiveLocationRequest(
-            chat_id, message_id, maybe_json_serialize(reply_markup),
+            chat_id,
+            message_id,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/stopMessageLiveLocation', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/stopMessageLiveLocation',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def stop_inline_message_live_location(
@@ -783,14 +1035,16 @@ class BotAPI:
         """
 
         request = StopInlineMessageLiveLocationRequest(
-            inline_message_id, maybe_json_serialize(reply_markup),
+            inline_message_id,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/stopMessageLiveLocation', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/stopMessageLiveLocation',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def send_venue(
@@ -832,12 +1086,15 @@ class BotAPI:
             foursquare_type,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(self.session, HTTPMethod.POST, '/sendVenue', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendVenue',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def send_contact(
@@ -873,12 +1130,15 @@ class BotAPI:
             vcard,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(self.session, HTTPMethod.POST, '/sendContact', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendContact',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def send_poll(
@@ -929,7 +1189,7 @@ class BotAPI:
         request = SendPollRequest(
             chat_id,
             question,
-            json_serialize(options),
+            json_serialize(options, self.client.json_codec),
             is_anonymous,
             poll_type,
             allows_multiple_answers,
@@ -941,12 +1201,15 @@ class BotAPI:
             is_closed,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(self.session, HTTPMethod.POST, '/sendPoll', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendPoll',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def stop_poll(
@@ -964,12 +1227,17 @@ class BotAPI:
         """
 
         request = StopPollRequest(
-            chat_id, message_id, maybe_json_serialize(reply_markup),
+            chat_id,
+            message_id,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Poll,
-            await make_request(self.session, HTTPMethod.POST, '/stopPoll', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/stopPoll',
+            request,
+            read_result=partial(from_json_like, Poll),
         )
 
     async def send_dice(
@@ -996,12 +1264,15 @@ class BotAPI:
             emoji,
             disable_notification,
             reply_to_message_id,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(self.session, HTTPMethod.POST, '/sendDice', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendDice',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def send_chat_action(
@@ -1016,11 +1287,12 @@ class BotAPI:
 
         request = SendChatActionRequest(chat_id, action)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/sendChatAction', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/sendChatAction',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def get_user_profile_photos(
@@ -1040,11 +1312,12 @@ class BotAPI:
 
         request = GetUserProfilePhotosRequest(user_id, offset, limit)
 
-        return from_json_like(
-            UserProfilePhotos,
-            await make_request(
-                self.session, HTTPMethod.POST, '/getUserProfilePhotos', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getUserProfilePhotos',
+            request,
+            read_result=partial(from_json_like, UserProfilePhotos),
         )
 
     async def get_file(self, file_id: FileID) -> File:
@@ -1056,11 +1329,106 @@ class BotAPI:
 
         request = GetFileRequest(file_id)
 
-        return from_json_like(
-            File,
-            await make_request(self.session, HTTPMethod.POST, '/getFile', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getFile',
+            request,
+            read_result=partial(from_json_like, File),
+        )
+
+    async def _file_path(self, file: Union[FileID, File]) -> str:
+        """Get the path to download a file from, calling getFile only if needed."""
+        if isinstance(file, File):
+            file_id = file.file_id
+            file_path = file.file_path
+        else:
+            file_id = file
+            file_path = self.file_paths.get(file_id)
+
+        if file_path is not None:
+            return file_path
+
+        file_path = (await self.get_file(file_id)).file_path
+
+        if file_path is None:
+            raise RobotoError(f'File {file_id} can\'t be downloaded.')
+
+        # Only paths fresh from getFile are known to be valid for the TTL.
+        self.file_paths.set(file_id, file_path, FILE_PATH_TTL)
+
+        return file_path
+
+    @asynccontextmanager
+    async def stream_file(
+        self, file: Union[FileID, File], start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[AsyncIterator[bytes]]:
+        """Context manager for reading a file as it is downloaded.
+
+        File paths are remembered for a while, so downloading the same file
+        again doesn't call getFile.
+
+        Args:
+            file: The ID of the file, or the File object from `get_file`.
+            start: The first byte to download.
+            end: Where to stop downloading (exclusive). The end of the file if
+                 None.
+
+        Yields:
+            An async iterator over chunks of the file.
+        """
+        file_path = await self._file_path(file)
+
+        async with open_download(self.client, file_path, start, end) as chunks:
+            yield chunks
+
+    async def download_file(
+        self,
+        file: Union[FileID, File],
+        destination: Union[Path, BinaryIO],
+        resume: bool = False,
+    ) -> int:
+        """Download a file to a path or a binary stream, a chunk at a time.
+
+        Args:
+            file: The ID of the file, or the File object from `get_file`.
+            destination: Where to write the file.
+            resume: Continue an interrupted download. Paths are appended to,
+                    from their size on, and streams are written from their
+                    current position on, from the same position of the file.
+
+        Returns:
+            How many bytes were written.
+        """
+        if isinstance(destination, Path):
+            # Files opened for appending start at their end.
+            async with await anyio.open_file(
+                destination, 'ab' if resume else 'wb'
+            ) as f:
+                return await self._download_to(file, f.write, await f.tell())
+
+        start = destination.tell() if resume else 0
+
+        return await self._download_to(
+            file, partial(anyio.to_thread.run_sync, destination.write), start
         )
 
+    async def _download_to(
+        self,
+        file: Union[FileID, File],
+        write: Callable[[bytes], Awaitable[Any]],
+        start: int,
+    ) -> int:
+        # Writes go through worker threads, to keep disks off the event loop.
+        written = 0
+
+        async with self.stream_file(file, start) as chunks:
+            async for chunk in chunks:
+                await write(chunk)
+                written += len(chunk)
+
+        return written
+
     async def kick_chat_member(
         self,
         chat_id: Union[ChatID, str],
@@ -1080,11 +1448,12 @@ class BotAPI:
 
         request = KickChatMemberRequest(chat_id, user_id, until_date)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/kickChatMember', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/kickChatMember',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def unban_chat_member(
@@ -1099,11 +1468,12 @@ class BotAPI:
 
         request = UnbanChatMemberRequest(chat_id, user_id)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/unbanChatMember', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/unbanChatMember',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def restrict_chat_member(
@@ -1127,14 +1497,18 @@ class BotAPI:
         """
 
         request = RestrictChatMemberRequest(
-            chat_id, user_id, json_serialize(permissions), until_date,
+            chat_id,
+            user_id,
+            json_serialize(permissions, self.client.json_codec),
+            until_date,
         )
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/restrictChatMember', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/restrictChatMember',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def promote_chat_member(
@@ -1189,11 +1563,12 @@ class BotAPI:
             can_promote_members,
         )
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/promoteChatMember', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/promoteChatMember',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def set_chat_administrator_custom_title(
@@ -1209,14 +1584,12 @@ class BotAPI:
 
         request = SetChatAdministratorCustomTitleRequest(chat_id, user_id, custom_title)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session,
-                HTTPMethod.POST,
-                '/setChatAdministratorCustomTitle',
-                request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/setChatAdministratorCustomTitle',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def set_chat_permissions(
@@ -1230,13 +1603,16 @@ class BotAPI:
                          restrict it, or True to a permission to lift a restriction.
         """
 
-        request = SetChatPermissionsRequest(chat_id, json_serialize(permissions))
+        request = SetChatPermissionsRequest(
+            chat_id, json_serialize(permissions, self.client.json_codec),
+        )
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/setChatPermissions', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/setChatPermissions',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def export_chat_invite_link(self, chat_id: Union[ChatID, str]) -> str:
@@ -1248,11 +1624,12 @@ class BotAPI:
 
         request = ExportChatInviteLinkRequest(chat_id)
 
-        return from_json_like(
-            str,
-            await make_request(
-                self.session, HTTPMethod.POST, '/exportChatInviteLink', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/exportChatInviteLink',
+            request,
+            read_result=partial(from_json_like, str),
         )
 
     async def set_chat_photo(
@@ -1267,8 +1644,11 @@ class BotAPI:
 
         request = SetChatPhotoRequest(chat_id, photo)
 
-        return from_json_like(
-            bool, await make_multipart_request(self.session, '/setChatPhoto', request),
+        return await make_multipart_request(
+            self.client,
+            '/setChatPhoto',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def delete_chat_photo(self, chat_id: Union[ChatID, str]) -> bool:
@@ -1280,11 +1660,12 @@ class BotAPI:
 
         request = DeleteChatPhotoRequest(chat_id)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/deleteChatPhoto', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/deleteChatPhoto',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def set_chat_title(self, chat_id: Union[ChatID, str], title: str) -> bool:
@@ -1297,9 +1678,12 @@ class BotAPI:
 
         request = SetChatTitleRequest(chat_id, title)
 
-        return from_json_like(
-            bool,
-            await make_request(self.session, HTTPMethod.POST, '/setChatTitle', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/setChatTitle',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def set_chat_description(
@@ -1314,11 +1698,12 @@ class BotAPI:
 
         request = SetChatDescriptionRequest(chat_id, description)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/setChatDescription', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/setChatDescription',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def pin_chat_message(
@@ -1337,11 +1722,12 @@ class BotAPI:
 
         request = PinChatMessageRequest(chat_id, message_id, disable_notification)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/pinChatMessage', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/pinChatMessage',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def unpin_chat_message(self, chat_id: Union[ChatID, str]) -> bool:
@@ -1353,11 +1739,12 @@ class BotAPI:
 
         request = UnpinChatMessageRequest(chat_id)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/unpinChatMessage', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/unpinChatMessage',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def leave_chat(self, chat_id: Union[ChatID, str]) -> bool:
@@ -1369,9 +1756,12 @@ class BotAPI:
 
         request = LeaveChatRequest(chat_id)
 
-        return from_json_like(
-            bool,
-            await make_request(self.session, HTTPMethod.POST, '/leaveChat', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/leaveChat',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def get_chat(self, chat_id: Union[ChatID, str]) -> Chat:
@@ -1383,9 +1773,12 @@ class BotAPI:
 
         request = GetChatRequest(chat_id)
 
-        return from_json_like(
-            Chat,
-            await make_request(self.session, HTTPMethod.POST, '/getChat', request),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getChat',
+            request,
+            read_result=partial(from_json_like, Chat),
         )
 
     async def get_chat_administrators(
@@ -1399,11 +1792,12 @@ class BotAPI:
 
         request = GetChatAdministratorsRequest(chat_id)
 
-        return from_json_like(
-            List[ChatMember],
-            await make_request(
-                self.session, HTTPMethod.POST, '/getChatAdministrators', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getChatAdministrators',
+            request,
+            read_result=partial(from_json_like, List[ChatMember]),
         )
 
     async def get_chat_members_count(self, chat_id: Union[ChatID, str]) -> int:
@@ -1415,11 +1809,12 @@ class BotAPI:
 
         request = GetChatMembersCountRequest(chat_id)
 
-        return from_json_like(
-            int,
-            await make_request(
-                self.session, HTTPMethod.POST, '/getChatMembersCount', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getChatMembersCount',
+            request,
+            read_result=partial(from_json_like, int),
         )
 
     async def get_chat_member(
@@ -1434,11 +1829,12 @@ class BotAPI:
 
         request = GetChatMemberRequest(chat_id, user_id)
 
-        return from_json_like(
-            ChatMember,
-            await make_request(
-                self.session, HTTPMethod.POST, '/getChatMember', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getChatMember',
+            request,
+            read_result=partial(from_json_like, ChatMember),
         )
 
     async def set_chat_sticker_set(
@@ -1454,11 +1850,12 @@ class BotAPI:
 
         request = SetChatStickerSetRequest(chat_id, sticker_set_name)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/setChatStickerSet', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/setChatStickerSet',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def delete_chat_sticker_set(self, chat_id: Union[ChatID, str]) -> bool:
@@ -1470,11 +1867,12 @@ class BotAPI:
 
         request = DeleteChatStickerSetRequest(chat_id)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/deleteChatStickerSet', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/deleteChatStickerSet',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def answer_callback_query(
@@ -1502,11 +1900,12 @@ class BotAPI:
             callback_query_id, text, show_alert, url, cache_time,
         )
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/answerCallbackQuery', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/answerCallbackQuery',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def set_my_commands(self, commands: List[BotCommand]) -> bool:
@@ -1516,21 +1915,26 @@ class BotAPI:
             commands: List of BotCommand objects describing the bot's commands.
         """
 
-        request = SetMyCommandsRequest(json_serialize(commands))
+        request = SetMyCommandsRequest(
+            json_serialize(commands, self.client.json_codec),
+        )
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/setMyCommands', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/setMyCommands',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def get_my_commands(self) -> List[BotCommand]:
         """getMyCommands API method."""
 
-        return from_json_like(
-            List[BotCommand],
-            await make_request(self.session, HTTPMethod.POST, '/getMyCommands'),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getMyCommands',
+            read_result=partial(from_json_like, List[BotCommand]),
         )
 
     async def edit_message_text(
@@ -1564,14 +1968,15 @@ class BotAPI:
             text,
             parse_mode,
             disable_web_page_preview,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageText', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageText',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_inline_message_text(
@@ -1602,14 +2007,15 @@ class BotAPI:
             text,
             parse_mode,
             disable_web_page_preview,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageText', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageText',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_message_caption(
@@ -1641,14 +2047,15 @@ class BotAPI:
             message_id,
             caption,
             parse_mode,
-            maybe_json_serialize(reply_markup),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageCaption', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageCaption',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_inline_message_caption(
@@ -1675,14 +2082,18 @@ class BotAPI:
         """
 
         request = EditInlineMessageCaptionRequest(
-            inline_message_id, caption, parse_mode, maybe_json_serialize(reply_markup),
+            inline_message_id,
+            caption,
+            parse_mode,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageCaption', request
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageCaption',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_message_media(
@@ -1710,15 +2121,16 @@ class BotAPI:
         request = EditMessageMediaRequest(
             chat_id,
             message_id,
-            json_serialize(media),
-            maybe_json_serialize(reply_markup),
+            json_serialize(media, self.client.json_codec),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_multipart_request_with_attachments(
-                self.session, '/editMessageMedia', request, attachments,
-            ),
+        return await make_multipart_request_with_attachments(
+            self.client,
+            '/editMessageMedia',
+            request,
+            attachments,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_inline_message_media(
@@ -1743,15 +2155,16 @@ class BotAPI:
 
         request = EditInlineMessageMediaRequest(
             inline_message_id,
-            json_serialize(media),
-            maybe_json_serialize(reply_markup),
+            json_serialize(media, self.client.json_codec),
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_multipart_request_with_attachments(
-                self.session, '/editMessageMedia', request, attachments,
-            ),
+        return await make_multipart_request_with_attachments(
+            self.client,
+            '/editMessageMedia',
+            request,
+            attachments,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_message_reply_markup(
@@ -1773,14 +2186,17 @@ class BotAPI:
         """
 
         request = EditMessageReplyMarkupRequest(
-            chat_id, message_id, maybe_json_serialize(reply_markup),
+            chat_id,
+            message_id,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageReplyMarkup', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageReplyMarkup',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def edit_inline_message_reply_markup(
@@ -1800,14 +2216,16 @@ class BotAPI:
         """
 
         request = EditInlineMessageReplyMarkupRequest(
-            inline_message_id, maybe_json_serialize(reply_markup),
+            inline_message_id,
+            maybe_json_serialize(reply_markup, self.client.json_codec),
         )
 
-        return from_json_like(
-            Message,
-            await make_request(
-                self.session, HTTPMethod.POST, '/editMessageReplyMarkup', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/editMessageReplyMarkup',
+            request,
+            read_result=partial(from_json_like, Message),
         )
 
     async def delete_message(
@@ -1822,11 +2240,12 @@ class BotAPI:
 
         request = DeleteMessageRequest(chat_id, message_id)
 
-        return from_json_like(
-            bool,
-            await make_request(
-                self.session, HTTPMethod.POST, '/deleteMessage', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/deleteMessage',
+            request,
+            read_result=partial(from_json_like, bool),
         )
 
     async def send_sticker(
@@ -1853,10 +2272,7 @@ class BotAPI:
             chat_id, sticker, disable_notification, reply_to_message_id, reply_markup,
         )
 
-        return from_json_like(
-            Message,
-            await make_multipart_request(self.session, '/sendSticker', request),
-        )
+        return await self._send_file('/sendSticker', request, 'sticker')
 
     async def get_sticker_set(self, name: StickerSetName) -> StickerSet:
         """getStickerSet API method.
@@ -1867,11 +2283,12 @@ class BotAPI:
 
         request = GetStickerSetRequest(name)
 
-        return from_json_like(
-            StickerSet,
-            await make_request(
-                self.session, HTTPMethod.POST, '/getStickerSet', request,
-            ),
+        return await make_request(
+            self.client,
+            HTTPMethod.POST,
+            '/getStickerSet',
+            request,
+            read_result=partial(from_json_like, StickerSet),
         )
 
 
@@ -0,0 +1,364 @@
+"""Sending the same message to many chats.
+
+This module needs `trio` (install roboto with the `trio` extra).
+"""
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from enum import Enum
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+import trio
+
+from .api_types import ChatID, FileID, Message, ParseMode, ReplyMarkup
+from .bot import BotAPI
+from .datautil import from_json_like
+from .error import BotAPIError
+from .http_api import HTTPMethod, make_request
+from .request_types import (
+    JSONSerialized,
+    SendMessageRequest,
+    SendPhotoRequest,
+    maybe_json_serialize,
+)
+from .retry import NETWORK_ERRORS
+from .url import URL
+
+_SEND_ERRORS: Tuple[Type[Exception], ...] = (BotAPIError, *NETWORK_ERRORS)
+
+ChatIDs = Union[Iterable[Union[ChatID, str]], AsyncIterable[Union[ChatID, str]]]
+"""The chats to broadcast to, as a (possibly async) iterable of chat ids."""
+
+
+@dataclass(frozen=True)
+class TextBroadcast:
+    """A text message to broadcast (see `BotAPI.send_message`)."""
+
+    text: str
+    parse_mode: Optional[ParseMode] = None
+    disable_web_page_preview: Optional[bool] = None
+    disable_notification: Optional[bool] = None
+    reply_markup: Optional[ReplyMarkup] = None
+
+
+@dataclass(frozen=True)
+class PhotoBroadcast:
+    """A photo to broadcast (see `BotAPI.send_photo`).
+
+    The photo must already be on Telegram's servers (or on the web), so that it
+    is not uploaded once per chat.
+    """
+
+    photo: Union[FileID, URL]
+    caption: Optional[str] = None
+    parse_mode: Optional[ParseMode] = None
+    disable_notification: Optional[bool] = None
+    reply_markup: Optional[ReplyMarkup] = None
+
+
+BroadcastMessage = Union[TextBroadcast, PhotoBroadcast]
+
+
+class BroadcastStatus(Enum):
+    """What happened when broadcasting to a chat."""
+
+    SENT = 'sent'
+    MIGRATED = 'migrated'
+    """The group became a supergroup, and the message was sent there."""
+    BLOCKED = 'blocked'
+    """The bot was blocked by the user or removed from the chat."""
+    RATE_LIMITED = 'rate_limited'
+    """Telegram refused the message for exceeding the flood limits."""
+    FAILED = 'failed'
+
+
+@dataclass(frozen=True)
+class BroadcastResult:
+    """The outcome of broadcasting to a chat.
+
+    Args:
+        index: The position of the chat among the broadcast's chat ids.
+        chat_id: The chat's id.
+        status: What happened.
+        message: The message that was sent, if any.
+        error: The error that made sending fail, if any.
+        migrated_to: The id of the supergroup the chat became, if it did.
+    """
+
+    index: int
+    chat_id: Union[ChatID, str]
+    status: BroadcastStatus
+    message: Optional[Message] = None
+    error: Optional[Exception] = None
+    migrated_to: Optional[ChatID] = None
+
+
+@dataclass
+class BroadcastStats:
+    """Counts of broadcast outcomes, and how fast they happened."""
+
+    started_at: float
+    finished_at: Optional[float] = None
+    sent: int = 0
+    migrated: int = 0
+    blocked: int = 0
+    rate_limited: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        """How many chats were handled."""
+        return (
+            self.sent + self.migrated + self.blocked + self.rate_limited + self.failed
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """How long the broadcast ran (or has been running), in seconds."""
+        end = self.finished_at if self.finished_at is not None else trio.current_time()
+
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """How many chats were handled per second."""
+        elapsed = self.elapsed
+
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def record(self, status: BroadcastStatus) -> None:
+        """Count an outcome."""
+        name = status.value
+        setattr(self, name, getattr(self, name) + 1)
+
+
+def _prepare(bot: BotAPI, message: BroadcastMessage) -> Tuple[str, Any]:
+    """Build the request for a message once, with a placeholder chat id."""
+    reply_markup: Optional[JSONSerialized[ReplyMarkup]] = maybe_json_serialize(
+        message.reply_markup, bot.client.json_codec
+    )
+
+    if isinstance(message, TextBroadcast):
+        return '/sendMessage', SendMessageRequest(
+            ChatID(0),
+            message.text,
+            message.parse_mode,
+            message.disable_web_page_preview,
+            message.disable_notification,
+            reply_markup=reply_markup,
+        )
+
+    return '/sendPhoto', SendPhotoRequest(
+        ChatID(0),
+        message.photo,
+        message.caption,
+        message.parse_mode,
+        message.disable_notification,
+        reply_markup=reply_markup,
+    )
+
+
+class Broadcast:
+    """Send a message to many chats concurrently, yielding the outcomes.
+
+    Outcomes (`BroadcastResult`) are yielded as an async iterator, in the
+    order messages finish sending. Chats are handled by `max_concurrency`
+    tasks, but requests also wait for the bot's rate limiter and session
+    connections, so give the bot a `roboto.rate_limit.RateLimiter` to stay
+    within Telegram's limits.
+
+    A broadcast can be resumed after stopping by passing its `progress` as
+    the `start` of a new one with the same chat ids. Chats after `progress`
+    that were already handled get the message again.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`, which runs the broadcast.
+    """
+
+    def __init__(
+        self,
+        bot: BotAPI,
+        receive_channel: trio.MemoryReceiveChannel,
+        api_method: str,
+        template: Any,
+        start: int,
+    ):
+        self._bot = bot
+        self._receive_channel = receive_channel
+        self._api_method = api_method
+        self._template = template
+        self._pending: Set[int] = set()
+        self._fed = start
+        self.stats = BroadcastStats(trio.current_time())
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        bot: BotAPI,
+        chat_ids: ChatIDs,
+        message: BroadcastMessage,
+        *,
+        max_concurrency: int = 8,
+        max_buffered: int = 100,
+        start: int = 0,
+    ) -> AsyncIterator['Broadcast']:
+        """Context manager for running a Broadcast.
+
+        Leaving the context stops the broadcast.
+
+        Args:
+            bot: The BotAPI to send messages with.
+            chat_ids: The chats to send the message to.
+            message: The message to send.
+            max_concurrency: How many messages can be sent at once.
+            max_buffered: How many outcomes can wait to be consumed before
+                          sending pauses.
+            start: How many of the first chat ids to skip (see `progress`).
+
+        Yields:
+            A Broadcast object.
+        """
+        send_channel, receive_channel = trio.open_memory_channel(max_buffered)
+        api_method, template = _prepare(bot, message)
+        broadcast = Broadcast(bot, receive_channel, api_method, template, start)
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(broadcast._run, chat_ids, max_concurrency, send_channel)
+            yield broadcast
+            nursery.cancel_scope.cancel()
+
+    @property
+    def progress(self) -> int:
+        """How many of the first chat ids were handled."""
+        if self._pending:
+            return min(self._pending)
+
+        return self._fed
+
+    def __aiter__(self) -> AsyncIterator[BroadcastResult]:
+        return self._receive_channel.__aiter__()
+
+    async def _run(
+        self,
+        chat_ids: ChatIDs,
+        max_concurrency: int,
+        send_channel: trio.MemorySendChannel,
+    ) -> None:
+        chats_send, chats_receive = trio.open_memory_channel(0)
+        to_skip = self._fed
+
+        async def feed(chat_id: Union[ChatID, str]) -> None:
+            nonlocal to_skip
+
+            if to_skip > 0:
+                to_skip -= 1
+                return
+
+            index = self._fed
+            self._pending.add(index)
+            self._fed += 1
+            await chats_send.send((index, chat_id))
+
+        async with send_channel, trio.open_nursery() as nursery:
+            for _ in range(max_concurrency):
+                nursery.start_soon(self._send_all, chats_receive, send_channel.clone())
+
+            async with chats_send:
+                if isinstance(chat_ids, AsyncIterable):
+                    async for chat_id in chat_ids:
+                        await feed(chat_id)
+                else:
+                    for chat_id in chat_ids:
+                        await feed(chat_id)
+
+        self.stats.finished_at = trio.current_time()
+
+    async def _send_all(
+        self,
+        chats_receive: trio.MemoryReceiveChannel,
+        send_channel: trio.MemorySendChannel,
+    ) -> None:
+        async with send_channel:
+            async for index, chat_id in chats_receive:
+                result = await self._send(index, chat_id)
+                self.stats.record(result.status)
+                self._pending.discard(index)
+                await send_channel.send(result)
+
+    async def _send(self, index: int, chat_id: Union[ChatID, str]) -> BroadcastResult:
+        try:
+            message = await self._send_to(chat_id)
+        except BotAPIError as e:
+            if e.migrate_to_chat_id is None:
+                return BroadcastResult(index, chat_id, _error_status(e), error=e)
+
+            migrated_to = ChatID(e.migrate_to_chat_id)
+
+            try:
+                message = await self._send_to(migrated_to)
+            except _SEND_ERRORS as e:
+                return BroadcastResult(
+                    index, chat_id, _error_status(e), error=e, migrated_to=migrated_to
+                )
+
+            return BroadcastResult(
+                index, chat_id, BroadcastStatus.MIGRATED, message, None, migrated_to
+            )
+        except NETWORK_ERRORS as e:
+            return BroadcastResult(index, chat_id, BroadcastStatus.FAILED, error=e)
+
+        if isinstance(chat_id, int) and message.chat.id != chat_id:
+            # The bot's retry policy already followed a migration.
+            return BroadcastResult(
+                index,
+                chat_id,
+                BroadcastStatus.MIGRATED,
+                message,
+                migrated_to=message.chat.id,
+            )
+
+        return BroadcastResult(index, chat_id, BroadcastStatus.SENT, message)
+
+    async def _send_to(self, chat_id: Union[ChatID, str]) -> Message:
+        request = replace(self._template, chat_id=chat_id)
+
+        return await make_request(
+            self._bot.client,
+            HTTPMethod.POST,
+            self._api_method,
+            request,
+            read_result=partial(from_json_like, Message),
+        )
+
+
+def _error_status(error: Exception) -> BroadcastStatus:
+    if isinstance(error, BotAPIError):
+        if error.error_code == 403:
+            return BroadcastStatus.BLOCKED
+
+        if error.error_code == 429:
+            return BroadcastStatus.RATE_LIMITED
+
+    return BroadcastStatus.FAILED
+
+
+__all__ = [
+    'Broadcast',
+    'BroadcastMessage',
+    'BroadcastResult',
+    'BroadcastStats',
+    'BroadcastStatus',
+    'ChatIDs',
+    'PhotoBroadcast',
+    'TextBroadcast',
+]
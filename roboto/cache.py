@@ -0,0 +1,251 @@
+"""In-memory caches for Bot API results."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import anyio
+
+from .coalesce import SingleFlight, serialize_body
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class TTLCache(Generic[K, V]):
+    """Keep values for a while, evicting the least recently used ones.
+
+    Args:
+        max_size: How many values are kept at most.
+        clock: What tells the current time, in seconds. The async library's
+               clock by default, so it can only be used inside of it.
+    """
+
+    def __init__(
+        self, max_size: int = 1024, clock: Callable[[], float] = anyio.current_time
+    ):
+        self.max_size = max_size
+        self.clock = clock
+        self._values: 'OrderedDict[K, Tuple[V, float]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: K) -> Optional[V]:
+        """Get the value for a key, or None if it is unknown or expired."""
+        entry = self._values.get(key)
+
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+
+        if expires_at <= self.clock():
+            del self._values[key]
+            return None
+
+        self._values.move_to_end(key)
+
+        return value
+
+    def set(self, key: K, value: V, ttl: float) -> None:
+        """Keep a value for `ttl` seconds."""
+        self._values[key] = (value, self.clock() + ttl)
+        self._values.move_to_end(key)
+
+        while len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        """Forget the value for a key, if known."""
+        self._values.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[K], bool]) -> None:
+        """Forget the values of every key for which `predicate` is true."""
+        for key in [key for key in self._values if predicate(key)]:
+            del self._values[key]
+
+    def clear(self) -> None:
+        """Forget every value."""
+        self._values.clear()
+
+
+DEFAULT_TTLS: Mapping[str, float] = {
+    '/getMe': 3600,
+    '/getMyCommands': 3600,
+    '/getStickerSet': 3600,
+    '/getChat': 60,
+    '/getChatAdministrators': 60,
+    '/getChatMembersCount': 60,
+    '/getChatMember': 30,
+}
+"""How long the results of the read-only methods are cached, in seconds."""
+
+_CHAT_METHODS = (
+    '/getChat',
+    '/getChatAdministrators',
+    '/getChatMembersCount',
+    '/getChatMember',
+)
+
+DEFAULT_INVALIDATIONS: Mapping[str, Tuple[str, ...]] = {
+    **dict.fromkeys(
+        (
+            '/kickChatMember',
+            '/unbanChatMember',
+            '/restrictChatMember',
+            '/promoteChatMember',
+            '/setChatAdministratorCustomTitle',
+            '/setChatPermissions',
+            '/exportChatInviteLink',
+            '/setChatPhoto',
+            '/deleteChatPhoto',
+            '/setChatTitle',
+            '/setChatDescription',
+            '/pinChatMessage',
+            '/unpinChatMessage',
+            '/leaveChat',
+            '/setChatStickerSet',
+            '/deleteChatStickerSet',
+        ),
+        _CHAT_METHODS,
+    ),
+    '/setMyCommands': ('/getMyCommands',),
+}
+"""The cached methods whose results each mutating method makes stale.
+
+Only the results about the same chat are dropped, if the mutating method is
+about a chat.
+"""
+
+_CacheKey = Tuple[str, Any, str]
+
+
+def _cache_key(api_method: str, body: Any) -> _CacheKey:
+    return api_method, getattr(body, 'chat_id', None), serialize_body(body)
+
+
+@dataclass
+class ResponseCacheStats:
+    """What a ResponseCache saved.
+
+    Args:
+        hits: Requests answered from the cache.
+        misses: Requests that were made because nothing was cached.
+        coalesced: Requests that waited for an identical one in flight
+                   instead of being made.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+
+
+class ResponseCache:
+    """Cache the results of read-only Bot API methods.
+
+    Identical requests made while one is in flight wait for its result
+    instead of being made too. Calling a mutating method drops the results it
+    may have made stale (see `DEFAULT_INVALIDATIONS`).
+
+    Args:
+        ttls: The methods to cache, to how long their results are kept, in
+              seconds.
+        invalidations: Mutating methods, to the cached methods whose results
+                       they make stale.
+        max_size: How many results are kept at most.
+    """
+
+    def __init__(
+        self,
+        ttls: Mapping[str, float] = DEFAULT_TTLS,
+        invalidations: Mapping[str, Tuple[str, ...]] = DEFAULT_INVALIDATIONS,
+        max_size: int = 1024,
+    ):
+        self.ttls = ttls
+        self.invalidations = invalidations
+        self.stats = ResponseCacheStats()
+        self._results: TTLCache[_CacheKey, Tuple[Any]] = TTLCache(max_size)
+        self._flights: SingleFlight[_CacheKey] = SingleFlight()
+        self._generation = 0
+
+    def invalidate(self, api_method: str, body: Any = None) -> None:
+        """Drop the results a mutating method call may have made stale.
+
+        Args:
+            api_method: The Telegram API method that was called.
+            body: Its request body (used to find the chat it was about).
+        """
+        methods = self.invalidations.get(api_method)
+
+        if methods is None:
+            return
+
+        chat_id = getattr(body, 'chat_id', None)
+        self._generation += 1
+        self._results.delete_where(
+            lambda key: key[0] in methods and (chat_id is None or key[1] == chat_id)
+        )
+
+    async def fetch(
+        self, api_method: str, body: Any, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Get the result of a request from the cache, or by making it.
+
+        Args:
+            api_method: The Telegram API method being called.
+            body: The request body.
+            request: What makes the request and returns its result.
+
+        Returns:
+            The result of the request.
+        """
+        ttl = self.ttls.get(api_method)
+
+        if ttl is None:
+            try:
+                return await request()
+            finally:
+                self.invalidate(api_method, body)
+
+        key = _cache_key(api_method, body)
+        cached = self._results.get(key)
+
+        if cached is not None:
+            self.stats.hits += 1
+            return cached[0]
+
+        async def request_and_cache() -> Any:
+            self.stats.misses += 1
+            generation = self._generation
+            result = await request()
+
+            # Results of requests that raced with a mutating method may be
+            # stale.
+            if generation == self._generation:
+                self._results.set(key, (result,), ttl)
+
+            return result
+
+        if key in self._flights:
+            self.stats.coalesced += 1
+
+        return await self._flights.run(key, request_and_cache)
+
+
+__all__ = [
+    'DEFAULT_INVALIDATIONS',
+    'DEFAULT_TTLS',
+    'ResponseCache',
+    'ResponseCacheStats',
+    'TTLCache',
+]
@@ -0,0 +1,178 @@
+"""Coalescing identical requests that are in flight at the same time."""
+import json
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import anyio
+
+from .datautil import to_json_like
+
+K = TypeVar('K', bound=Hashable)
+
+DEFAULT_COALESCED_METHODS = frozenset(
+    {
+        '/getMe',
+        '/getMyCommands',
+        '/getStickerSet',
+        '/getChat',
+        '/getChatAdministrators',
+        '/getChatMembersCount',
+        '/getChatMember',
+        '/getUserProfilePhotos',
+        '/getFile',
+        '/getWebhookInfo',
+    }
+)
+"""The read-only methods, whose identical requests can share a result."""
+
+
+def serialize_body(body: Any) -> str:
+    """Serialize a request body so that identical bodies compare equal."""
+    return json.dumps(to_json_like(body), sort_keys=True, default=str)
+
+
+class _Flight:
+    """A request in flight, whose result is shared with identical requests."""
+
+    def __init__(self) -> None:
+        self.done = anyio.Event()
+        self.result: Optional[Tuple[Any]] = None
+        self.error: Optional[Exception] = None
+
+
+class SingleFlight(Generic[K]):
+    """Make requests with the same key only once while one is in flight.
+
+    Later requests wait for the result of the one in flight (or its error)
+    instead of being made. If the request in flight is cancelled, one of the
+    waiting requests is made instead.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[K, _Flight] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._flights
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: K, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Make a request, unless an identical one is in flight.
+
+        Args:
+            key: What identifies identical requests.
+            request: What makes the request and returns its result.
+
+        Returns:
+            The result of the request.
+        """
+        while True:
+            flight = self._flights.get(key)
+
+            if flight is None:
+                break
+
+            await flight.done.wait()
+
+            if flight.error is not None:
+                raise flight.error
+
+            if flight.result is not None:
+                return flight.result[0]
+
+        flight = self._flights[key] = _Flight()
+
+        try:
+            flight.result = (await request(),)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            del self._flights[key]
+            flight.done.set()
+
+        return flight.result[0]
+
+
+@dataclass
+class CoalescerStats:
+    """What a Coalescer saved.
+
+    Args:
+        requests: Requests to coalesced methods.
+        coalesced: Requests that waited for an identical one in flight
+                   instead of being made.
+        coalesced_by_method: `coalesced`, by API method.
+    """
+
+    requests: int = 0
+    coalesced: int = 0
+    coalesced_by_method: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, api_method: str, coalesced: bool) -> None:
+        """Record a request to a coalesced method."""
+        self.requests += 1
+
+        if coalesced:
+            self.coalesced += 1
+            self.coalesced_by_method[api_method] = (
+                self.coalesced_by_method.get(api_method, 0) + 1
+            )
+
+
+class Coalescer:
+    """Make identical idempotent requests in flight at the same time once.
+
+    Requests are identical if they call the same method with the same body.
+
+    Args:
+        methods: The API methods whose requests are coalesced. They must not
+                 have side effects.
+    """
+
+    def __init__(self, methods: Collection[str] = DEFAULT_COALESCED_METHODS):
+        self.methods = frozenset(methods)
+        self.stats = CoalescerStats()
+        self._flights: SingleFlight[Tuple[str, str]] = SingleFlight()
+
+    async def run(
+        self, api_method: str, body: Any, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Make a request, unless an identical one is in flight.
+
+        Args:
+            api_method: The Telegram API method being called.
+            body: The request body.
+            request: What makes the request and returns its result.
+
+        Returns:
+            The result of the request.
+        """
+        if api_method not in self.methods:
+            return await request()
+
+        key = (api_method, serialize_body(body))
+        self.stats.record(api_method, key in self._flights)
+
+        return await self._flights.run(key, request)
+
+
+__all__ = [
+    'Coalescer',
+    'CoalescerStats',
+    'DEFAULT_COALESCED_METHODS',
+    'SingleFlight',
+    'serialize_body',
+]
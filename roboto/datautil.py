@@ -1,15 +1,17 @@
 """Utilities from deserializing values as dataclasses."""
-from dataclasses import asdict, fields, is_dataclass
+from dataclasses import MISSING, fields, is_dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
-    cast,
     get_type_hints,
     overload,
 )
@@ -18,6 +20,7 @@ from typing_extensions import Literal
 from typing_inspect import get_args, get_origin, is_optional_type
 
 from .error import RobotoError
+from .profiling import stage
 from .typing_util import is_new_type, is_none_type, original_type, type_name
 
 T = TypeVar('T')
@@ -45,29 +48,23 @@ def renames(cls: Type[T]) -> Dict[str, str]:
     }
 
 
+Decoder = Callable[[Any], Any]
+"""A compiled function that reads a non-None JSON-like value into a given type."""
+
+
 def from_list(tp: Type[List[T]], v: List[Any]) -> List[T]:
     """Transform a list of JSON-like structures into JSON-compatible objects."""
     (inner_type,) = get_args(tp)
-    return [_from_json_like(inner_type, value) for value in v]
+    decode = _field_decoder(inner_type)
+    return [decode(value) for value in v]
 
 
 def from_dict(tp: Type[T], v: Dict[str, Any]) -> T:
-    """Transform a JSON-like structure into a JSON-compatible dataclass."""
-    field_renames = renames(tp)
-
-    type_hints = get_type_hints(tp)
+    """Transform a JSON-like structure into a JSON-compatible dataclass.
 
-    for k in field_renames:
-        if k in v:
-            v[field_renames[k]] = v.pop(k)
-
-    return tp(  # type: ignore
-        **{
-            field_name: _from_json_like(type_hints[field_name], value)
-            for field_name, value in v.items()
-            if field_name in type_hints
-        }
-    )
+    `v` is not modified, so the same parsed payload can be decoded many times.
+    """
+    return _dataclass_decoder(tp).from_dict(v)
 
 
 class JSONConversionError(RobotoError):
@@ -81,31 +78,319 @@ class JSONConversionError(RobotoError):
 
 def convert_single(tp: Type[T], v: Any) -> T:
     """Convert a value into a single (non-list) type."""
-    if tp in (int, float):
-        if not isinstance(v, (int, float)):
-            raise JSONConversionError(f'Cannot read value {v} as a number.', tp, v)
+    return decoder_for(tp)(v)  # type: ignore
 
-        return tp(v)  # type: ignore
 
-    if is_dataclass(tp):
+class _DataclassDecoder:
+    """Compiled decoder for a dataclass type.
+
+    The field table (type hints, renames and nested decoders) is only built on
+    the first decode, so that recursive schemas (e.g. `Chat` -> `Message` ->
+    `Chat`) can refer to decoders that are still being compiled.
+
+    The field table is keyed by the names expected in the JSON-like input
+    (i.e. with renames already applied), so decoding never has to touch the
+    input dict.
+    """
+
+    def __init__(self, tp: Any):
+        self.tp = tp
+        self._fields: Optional[Dict[str, Tuple[str, Decoder]]] = None
+
+    def _compile(self) -> Dict[str, Tuple[str, Decoder]]:
+        type_hints = get_type_hints(self.tp)
+
+        table = {
+            name: (name, _field_decoder(type_hint))
+            for name, type_hint in type_hints.items()
+        }
+
+        for key, name in renames(self.tp).items():
+            table[key] = table[name]
+
+        self._fields = table
+
+        return table
+
+    def from_dict(self, v: Dict[str, Any]) -> Any:
+        field_table = self._fields
+        if field_table is None:
+            field_table = self._compile()
+
+        kwargs = {}
+
+        for key, value in v.items():
+            entry = field_table.get(key)
+
+            if entry is not None:
+                name, decode = entry
+                kwargs[name] = decode(value)
+
+        return self.tp(**kwargs)
+
+    def __call__(self, v: Any) -> Any:
         if not isinstance(v, dict):
             raise JSONConversionError(
-                f'Cannot read non-dict {v} as dataclass type {tp}.', tp, v,
+                f'Cannot read non-dict {v} as dataclass type {self.tp}.', self.tp, v,
             )
 
-        return from_dict(tp, v)
+        return self.from_dict(v)
+
+
+_RAW_VALUE = '_raw_json_value'
+
+
+class _LazyField:
+    """Descriptor that decodes a field from the raw JSON-like value on first access.
+
+    The decoded value is cached in the instance's `__dict__`, which shadows
+    this (non-data) descriptor from then on.
+    """
+
+    def __init__(self, name: str, keys: Tuple[str, ...], decode: Decoder, field):
+        self.name = name
+        self.keys = keys
+        self.decode = decode
+        self.field = field
+
+    def _default(self) -> Any:
+        if self.field.default_factory is not MISSING:
+            return self.field.default_factory()
+
+        return self.field.default
+
+    def __get__(self, obj: Any, owner: Any = None) -> Any:
+        if obj is None:
+            return self
+
+        raw = obj.__dict__[_RAW_VALUE]
+
+        for key in self.keys:
+            if key in raw:
+                value = self.decode(raw[key])
+                break
+        else:
+            value = self._default()
+
+        obj.__dict__[self.name] = value
+
+        return value
+
 
+def _is_nested(type_hint: Any) -> bool:
+    _, real_type = _unwrap_optional(type_hint)
+
+    return is_dataclass(real_type) or get_origin(real_type) is list
+
+
+def _rebuild_eager(tp: Any, values: Tuple[Tuple[str, Any], ...]) -> Any:
+    """Unpickle a lazily decoded object as an object of its dataclass."""
+    obj = object.__new__(tp)
+
+    for name, value in values:
+        object.__setattr__(obj, name, value)
+
+    return obj
+
+
+def _make_lazy_class(tp: Any, lazy_fields: Dict[str, _LazyField]) -> type:
+    names = tuple(f.name for f in fields(tp))
+    compared = tuple(f.name for f in fields(tp) if f.compare)
+
+    def __eq__(self, other):  # pylint: disable=invalid-name
+        if getattr(type(other), '_lazy_base', type(other)) is not tp:
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in compared)
+
+    def __reduce__(self):  # pylint: disable=invalid-name
+        # The lazy class can't be found by its name, so objects are pickled
+        # as objects of the dataclass, with every field decoded.
+        values = tuple((name, getattr(self, name)) for name in names)
+
+        return _rebuild_eager, (tp, values)
+
+    return type(
+        tp.__name__,
+        (tp,),
+        {
+            **lazy_fields,
+            '__module__': tp.__module__,
+            '__qualname__': tp.__qualname__,
+            '__eq__': __eq__,
+            '__hash__': tp.__hash__,
+            '__reduce__': __reduce__,
+            '_lazy_base': tp,
+        },
+    )
+
+
+class _LazyDataclassDecoder(_DataclassDecoder):
+    """Compiled decoder that defers decoding of nested values.
+
+    Fields holding dataclasses or lists are decoded on first access, from the
+    raw JSON-like value kept by the object. Objects are instances of a
+    subclass of the dataclass (so isinstance checks and attribute types are
+    preserved), and compare equal to their eagerly decoded counterparts. The
+    subclass has a `__dict__` even if the dataclass uses `__slots__`.
+    """
+
+    def __init__(self, tp: Any):
+        super().__init__(tp)
+        self._lazy_class: Optional[type] = None
+        self._required: List[Tuple[str, Tuple[str, ...]]] = []
+
+    def _compile(self) -> Dict[str, Tuple[str, Decoder]]:
+        type_hints = get_type_hints(self.tp)
+        keys: Dict[str, Tuple[str, ...]] = {name: (name,) for name in type_hints}
+
+        for key, name in renames(self.tp).items():
+            keys[name] = (key, name)
+
+        table: Dict[str, Tuple[str, Decoder]] = {}
+        descriptors: Dict[str, _LazyField] = {}
+        any_lazy = False
+
+        for f in fields(self.tp):
+            decode = _field_decoder(type_hints[f.name], True)
+            # Eager fields get a descriptor too, which shadows the slot of a
+            # `with_slots` base and falls back to the default when missing.
+            descriptors[f.name] = _LazyField(f.name, keys[f.name], decode, f)
+
+            if _is_nested(type_hints[f.name]) or f.default_factory is not MISSING:
+                any_lazy = True
+            else:
+                for key in keys[f.name]:
+                    table[key] = (f.name, decode)
+
+            if f.init and f.default is MISSING and f.default_factory is MISSING:
+                self._required.append((f.name, keys[f.name]))
+
+        if any_lazy:
+            self._lazy_class = _make_lazy_class(self.tp, descriptors)
+            self._fields = table
+        else:
+            self._fields = super()._compile()
+
+        return self._fields
+
+    def from_dict(self, v: Dict[str, Any]) -> Any:
+        field_table = self._fields
+        if field_table is None:
+            field_table = self._compile()
+
+        lazy_class = self._lazy_class
+
+        if lazy_class is None:
+            return super().from_dict(v)
+
+        obj: Any = object.__new__(lazy_class)
+        state = obj.__dict__
+        state[_RAW_VALUE] = v
+
+        for key, value in v.items():
+            entry = field_table.get(key)
+
+            if entry is not None:
+                name, decode = entry
+                state[name] = decode(value)
+
+        for name, keys in self._required:
+            if name not in state and not any(key in v for key in keys):
+                raise JSONConversionError(
+                    f'Missing required field "{name}" for {type_name(self.tp)}.',
+                    self.tp,
+                    v,
+                )
+
+        return obj
+
+
+def _dataclass_decoder(tp: type) -> _DataclassDecoder:
+    decoder = decoder_for(tp)
+
+    if not isinstance(decoder, _DataclassDecoder):
+        raise JSONConversionError(f'{type_name(tp)} is not a dataclass.', tp, None)
+
+    return decoder
+
+
+def _compile_list(tp, lazy: bool) -> Decoder:
+    (inner_type,) = get_args(tp)
+    decode = _field_decoder(inner_type, lazy)
+
+    def _decode_list(v):
+        if not isinstance(v, list):
+            raise JSONConversionError(
+                'Cannot read non-list value to a list type.', tp, v
+            )
+        return [decode(value) for value in v]
+
+    return _decode_list
+
+
+def _compile_number(tp) -> Decoder:
+    def _decode_number(v):
+        if not isinstance(v, (int, float)):
+            raise JSONConversionError(f'Cannot read value {v} as a number.', tp, v)
+
+        return tp(v)
+
+    return _decode_number
+
+
+def _compile_instance_check(tp) -> Decoder:
     real_type = tp if not is_new_type(tp) else original_type(tp)
 
-    if not isinstance(v, real_type):
-        raise JSONConversionError(
-            f'Cannot find any way to read value {v} as {tp}.', tp, v
-        )
+    def _decode_instance(v):
+        if not isinstance(v, real_type):
+            raise JSONConversionError(
+                f'Cannot find any way to read value {v} as {tp}.', tp, v
+            )
+
+        return v
+
+    return _decode_instance
+
+
+def _compile(tp, lazy: bool) -> Decoder:
+    if get_origin(tp) is list:
+        return _compile_list(tp, lazy)
 
-    return cast(T, v)
+    if tp in (int, float):
+        return _compile_number(tp)
+
+    if is_dataclass(tp):
+        return _LazyDataclassDecoder(tp) if lazy else _DataclassDecoder(tp)
+
+    return _compile_instance_check(tp)
+
+
+@lru_cache(maxsize=None)
+def decoder_for(tp: Type[T], lazy: bool = False) -> Callable[[Any], T]:
+    """Get the compiled decoder for a JSON-compatible type.
 
+    Decoders are compiled once per type and cached, so that the reflection on
+    the schema (type hints, renames, optionality) is not repeated on every
+    value read.
+
+    Args:
+        tp: A JSON-compatible type (see `from_json_like`).
+        lazy: Whether to decode nested dataclasses and lists only on first
+              access (see `from_json_like`).
+
+    Returns:
+        A function that reads a non-None JSON-like value into `tp`, raising
+        `JSONConversionError` on failure.
+    """
+    return _compile(tp, lazy)
 
-def _from_json_like(type_hint, value):
+
+def _identity(v: Any) -> Any:
+    return v
+
+
+def _unwrap_optional(type_hint) -> Tuple[bool, Any]:
     optional = is_optional_type(type_hint)
 
     (real_type,) = (
@@ -114,15 +399,47 @@ def _from_json_like(type_hint, value):
         else (type_hint,)
     )
 
+    return optional, real_type
+
+
+@lru_cache(maxsize=None)
+def _field_decoder(type_hint, lazy: bool = False) -> Decoder:
+    """Compile the decoder for a type hint that may be Optional or Any.
+
+    Unlike the decoders from `decoder_for`, the resulting function also
+    accepts None (if the hint is optional).
+    """
+    optional, real_type = _unwrap_optional(type_hint)
+
     if real_type is Any:
-        return value
+        return _identity
+
+    decode = decoder_for(real_type, lazy)
 
-    return from_json_like(real_type, value, optional)
+    if optional:
+
+        def _decode_optional(v):
+            return None if v is None else decode(v)
+
+        return _decode_optional
+
+    def _decode_required(v):
+        if v is None:
+            raise JSONConversionError(
+                'Cannot read None as a non optional value.', real_type, v
+            )
+
+        return decode(v)
+
+    return _decode_required
 
 
 @overload
 def from_json_like(
-    tp: Type[List[T]], value: List[JSONLike], optional: Literal[True],
+    tp: Type[List[T]],
+    value: List[JSONLike],
+    optional: Literal[True],
+    lazy: bool = False,
 ) -> Optional[List[T]]:  # pragma: no cover
     """Overload for from_json_like, refer to implementation."""
     ...
@@ -130,7 +447,7 @@ def from_json_like(
 
 @overload
 def from_json_like(
-    tp: Type[T], value: JSONLike, optional: Literal[True],
+    tp: Type[T], value: JSONLike, optional: Literal[True], lazy: bool = False,
 ) -> Optional[T]:  # pragma: no cover
     """Overload for from_json_like, refer to implementation."""
     ...
@@ -138,7 +455,10 @@ def from_json_like(
 
 @overload
 def from_json_like(
-    tp: Type[List[T]], value: List[JSONLike], optional: Literal[False] = False,
+    tp: Type[List[T]],
+    value: List[JSONLike],
+    optional: Literal[False] = False,
+    lazy: bool = False,
 ) -> List[T]:  # pragma: no cover
     """Overload for from_json_like, refer to implementation."""
     ...
@@ -146,13 +466,18 @@ def from_json_like(
 
 @overload
 def from_json_like(
-    tp: Type[T], value: JSONLike, optional: Literal[False] = False,
+    tp: Type[T],
+    value: JSONLike,
+    optional: Literal[False] = False,
+    lazy: bool = False,
 ) -> T:  # pragma: no cover
     """Overload for from_json_like, refer to implementation."""
     ...
 
 
-def from_json_like(tp: Type[T], value: Any, optional: bool = False) -> Optional[T]:
+def from_json_like(
+    tp: Type[T], value: Any, optional: bool = False, lazy: bool = False
+) -> Optional[T]:
     """Read a JSON-like object into a given schema type.
 
     `tp` must be:
@@ -160,10 +485,16 @@ def from_json_like(tp: Type[T], value: Any, optional: bool = False) -> Optional[
         - a List[T] of a JSON-compatible type, or
         - a dataclass where every field is of a JSON-compatible type
 
+    With `lazy`, dataclasses keep a reference to `value` and fields holding
+    dataclasses or lists are only read (and validated) on first access. The
+    results are still instances of the requested types, but `value` must not
+    be modified while they are in use.
+
     Args:
         tp: A JSON-compatible type.
         value: A JSON-compatible value to read.
         optional: Whether None should be accepted.
+        lazy: Whether to defer reading of nested values until first access.
 
     Returns:
         An object of the type given by `tp`, or maybe None if `optional` is `True`.
@@ -177,14 +508,81 @@ def from_json_like(tp: Type[T], value: Any, optional: bool = False) -> Optional[
 
         return None
 
-    if get_origin(tp) is list:
-        if not isinstance(value, list):
-            raise JSONConversionError(
-                'Cannot read non-list value to a list type.', tp, value
-            )
-        return from_list(tp, value)  # type: ignore
+    with stage('from_json_like'):
+        return decoder_for(tp, lazy)(value)  # type: ignore
+
+
+Encoder = Callable[[Any], JSONLike]
+"""A compiled function that serializes objects of a given type."""
+
+
+def _encode_dict(obj: Dict[str, Any]) -> JSONLike:
+    return {k: to_json_like(v) for k, v in obj.items() if v is not None}
+
+
+def _encode_list(obj: List[Any]) -> JSONLike:
+    return [to_json_like(v) for v in obj]
+
+
+def _encode_enum(obj: Enum) -> JSONLike:
+    return to_json_like(obj.value)
+
 
-    return convert_single(tp, value)
+def _compile_dataclass_encoder(cls: Any) -> Encoder:
+    field_names = tuple(f.name for f in fields(cls))
+
+    def _encode_dataclass(obj):
+        result = {}
+
+        for name in field_names:
+            value = getattr(obj, name)
+
+            if value is not None:
+                result[name] = to_json_like(value)
+
+        return result
+
+    return _encode_dataclass
+
+
+def _compile_unsupported_encoder(cls: Any) -> Encoder:
+    def _encode_unsupported(obj):
+        raise JSONConversionError(
+            f'Failed to turn value of type {type_name(cls)} into a JSONLike.',
+            cls,
+            obj,
+        )
+
+    return _encode_unsupported
+
+
+@lru_cache(maxsize=None)
+def encoder_for(cls: type) -> Encoder:
+    """Get the compiled encoder for objects of a given class.
+
+    Encoders are compiled once per class and cached. Dataclass encoders read
+    fields directly from the object (instead of deep-copying it through
+    `dataclasses.asdict`) and drop None fields in the same pass.
+
+    Args:
+        cls: The class of the objects to serialize.
+
+    Returns:
+        A function that serializes objects of `cls` into a JSON-like
+        representation, raising `JSONConversionError` if `cls` is unsupported.
+    """
+    if issubclass(cls, get_args(JSONPrimitives)):  # type: ignore
+        return _identity
+    if issubclass(cls, dict):
+        return _encode_dict
+    if is_dataclass(cls):
+        return _compile_dataclass_encoder(cls)
+    if issubclass(cls, list):
+        return _encode_list
+    if issubclass(cls, Enum):
+        return _encode_enum
+
+    return _compile_unsupported_encoder(cls)
 
 
 def to_json_like(obj: Any) -> JSONLike:
@@ -201,21 +599,4 @@ def to_json_like(obj: Any) -> JSONLike:
     Returns:
         A representation that can be converted to JSON.
     """
-    if isinstance(obj, get_args(JSONPrimitives)):  # type: ignore
-        return obj
-    if isinstance(obj, dict):
-        return {k: to_json_like(v) for k, v in obj.items() if v is not None}
-    if is_dataclass(obj):
-        return {k: to_json_like(v) for k, v in asdict(obj).items() if v is not None}
-    if isinstance(obj, list):
-        return [to_json_like(v) for v in obj]
-    if isinstance(obj, Enum):
-        return to_json_like(obj.value)
-
-    obj_type = type(obj)
-
-    raise JSONConversionError(
-        f'Failed to turn value of type {type_name(obj_type)} into a JSONLike.',
-        obj_type,
-        obj,
-    )
+    return encoder_for(type(obj))(obj)  # type: ignore
@@ -0,0 +1,200 @@
+"""Concurrent dispatching of updates to handlers.
+
+This module needs `trio` (install roboto with the `trio` extra).
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional
+
+import trio
+
+from .api_types import Update
+
+UpdateHandler = Callable[[Update], Awaitable[None]]
+"""An async function that does something with an update."""
+
+UpdateCallback = Callable[[Update], None]
+"""A function notified about an update, such as `UpdatePoller.ack`."""
+
+UpdateKey = Callable[[Update], Optional[Hashable]]
+"""A function that says which updates must be handled in order relative to
+each other (the ones with the same key). Updates with a None key are not
+ordered at all."""
+
+
+def chat_key(update: Update) -> Optional[Hashable]:
+    """Key updates by the chat they happened in, or by the user that sent them.
+
+    Messages (including edits and channel posts) and callback queries on
+    messages are keyed by the message's chat id. Other queries are keyed by
+    the id of the user that sent them, which is also the id of their private
+    chat with the bot.
+    """
+    message = (
+        update.message
+        or update.edited_message
+        or update.channel_post
+        or update.edited_channel_post
+    )
+
+    if message is not None:
+        return message.chat.id
+
+    if update.callback_query is not None:
+        if update.callback_query.message is not None:
+            return update.callback_query.message.chat.id
+
+        return update.callback_query.from_.id
+
+    query = (
+        update.inline_query
+        or update.chosen_inline_result
+        or update.shipping_query
+        or update.pre_checkout_query
+    )
+
+    if query is not None:
+        return query.from_.id
+
+    return None
+
+
+class Dispatcher:
+    """Run handlers for updates concurrently, keeping order within each chat.
+
+    Updates with the same key (see `chat_key`) are handled one at a time, in
+    the order they were dispatched. Updates with different keys are handled
+    concurrently, by at most `max_concurrency` handlers at once.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`, which runs the dispatcher's tasks.
+    """
+
+    def __init__(
+        self,
+        nursery: trio.Nursery,
+        handler: UpdateHandler,
+        max_concurrency: int,
+        max_pending: int,
+        key: UpdateKey,
+        on_handled: Optional[UpdateCallback],
+    ):
+        self._nursery = nursery
+        self._handler = handler
+        self._limiter = trio.CapacityLimiter(max_concurrency)
+        self._pending = trio.Semaphore(max_pending)
+        self._key = key
+        self._on_handled = on_handled
+        self._queues: Dict[Hashable, Deque[Update]] = {}
+        self._unfinished = 0
+        self._idle = trio.Event()
+        self._idle.set()
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        handler: UpdateHandler,
+        *,
+        max_concurrency: int = 64,
+        max_pending: int = 1024,
+        key: UpdateKey = chat_key,
+        on_handled: Optional[UpdateCallback] = None,
+    ) -> AsyncIterator['Dispatcher']:
+        """Context manager for running a Dispatcher.
+
+        Exiting the context waits for all dispatched updates to be handled.
+        If a handler raises, the exception cancels the other handlers and
+        propagates out of the context (handle errors inside handlers to avoid
+        that).
+
+        Args:
+            handler: The function to call for each update.
+            max_concurrency: The maximum number of handlers running at once.
+            max_pending: The maximum number of dispatched updates not yet
+                         handled. Once reached, `dispatch` waits for handlers
+                         to finish, which slows down whoever is producing
+                         updates.
+            key: Which updates must keep their relative order (see
+                 `UpdateKey`).
+            on_handled: Called with each update whose handler finished
+                        without raising (e.g. `UpdatePoller.ack`).
+
+        Yields:
+            A Dispatcher object.
+        """
+        async with trio.open_nursery() as nursery:
+            yield Dispatcher(
+                nursery, handler, max_concurrency, max_pending, key, on_handled
+            )
+
+    @property
+    def unfinished(self) -> int:
+        """The number of dispatched updates that were not handled yet."""
+        return self._unfinished
+
+    async def dispatch(self, update: Update) -> None:
+        """Schedule an update to be handled.
+
+        Returns as soon as the update is scheduled, waiting only if there are
+        already `max_pending` updates waiting to be handled.
+
+        Args:
+            update: The update to handle.
+        """
+        await self._pending.acquire()
+
+        if self._unfinished == 0:
+            self._idle = trio.Event()
+
+        self._unfinished += 1
+
+        key = self._key(update)
+
+        if key is None:
+            self._nursery.start_soon(self._handle, update)
+            return
+
+        queue = self._queues.get(key)
+
+        if queue is not None:
+            queue.append(update)
+            return
+
+        self._queues[key] = deque([update])
+        self._nursery.start_soon(self._drain, key)
+
+    async def wait_idle(self) -> None:
+        """Wait until every dispatched update has been handled."""
+        await self._idle.wait()
+
+    async def _drain(self, key: Hashable) -> None:
+        queue = self._queues[key]
+
+        try:
+            while queue:
+                await self._handle(queue.popleft())
+        finally:
+            del self._queues[key]
+
+    async def _handle(self, update: Update) -> None:
+        try:
+            async with self._limiter:
+                await self._handler(update)
+
+            if self._on_handled is not None:
+                self._on_handled(update)
+        finally:
+            self._pending.release()
+            self._unfinished -= 1
+
+            if self._unfinished == 0:
+                self._idle.set()
+
+
+__all__ = [
+    'Dispatcher',
+    'UpdateCallback',
+    'UpdateHandler',
+    'UpdateKey',
+    'chat_key',
+]
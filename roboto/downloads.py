@@ -0,0 +1,111 @@
+"""Downloading files from the Bot API's file endpoint."""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from .error import BotAPIError
+from .http_api import APIClient
+
+FILE_PATH_TTL = 55 * 60
+"""How long the file path of a file is kept, in seconds.
+
+Telegram guarantees file paths work for at least an hour after `getFile`.
+"""
+
+
+def _range_headers(start: int, end: Optional[int]) -> Dict[str, str]:
+    if start == 0 and end is None:
+        return {}
+
+    last = '' if end is None else str(end - 1)
+
+    return {'Range': f'bytes={start}-{last}'}
+
+
+class _Chunks:
+    """The chunks of a response body, cut to a byte range.
+
+    Servers that don't support ranges send whole files, so the bytes outside
+    of the range are dropped here instead.
+    """
+
+    def __init__(
+        self, chunks: AsyncIterator[bytes], skip: int = 0, limit: Optional[int] = None
+    ):
+        self._chunks = chunks
+        self._skip = skip
+        self._limit = limit
+
+    def __aiter__(self) -> '_Chunks':
+        return self
+
+    async def __anext__(self) -> bytes:
+        while True:
+            if self._limit is not None and self._limit <= 0:
+                raise StopAsyncIteration
+
+            chunk = await self._chunks.__anext__()
+
+            if self._skip > 0:
+                skipped = min(self._skip, len(chunk))
+                chunk = chunk[skipped:]
+                self._skip -= skipped
+
+            if self._limit is not None:
+                chunk = chunk[: self._limit]
+                self._limit -= len(chunk)
+
+            if chunk:
+                return chunk
+
+
+class _NoChunks:
+    def __aiter__(self) -> '_NoChunks':
+        return self
+
+    async def __anext__(self) -> bytes:
+        raise StopAsyncIteration
+
+
+@asynccontextmanager
+async def open_download(
+    client: APIClient, file_path: str, start: int = 0, end: Optional[int] = None
+) -> AsyncIterator[AsyncIterator[bytes]]:
+    """Context manager for reading a file as it is downloaded.
+
+    The response body is streamed through the client's transport, so files
+    are never held in memory as a whole.
+
+    Args:
+        client: The APIClient to make the request with.
+        file_path: The path of the file, from `getFile`.
+        start: The first byte to download.
+        end: Where to stop downloading (exclusive). The end of the file if
+             None.
+
+    Yields:
+        An async iterator over chunks of the file. Nothing is read if `start`
+        is past the end of the file.
+
+    Raises:
+        BotAPIError: If the file can't be downloaded.
+    """
+    headers = _range_headers(start, end)
+
+    async with client.transport.download(file_path, headers) as download:
+        status_code = download.status_code
+
+        if status_code == 206:
+            yield _Chunks(download.chunks)
+        elif status_code == 200:
+            limit = None if end is None else end - start
+            yield _Chunks(download.chunks, start, limit)
+        elif status_code == 416 and start > 0:
+            yield _NoChunks()
+        else:
+            raise BotAPIError(status_code, download.reason_phrase)
+
+
+__all__ = [
+    'FILE_PATH_TTL',
+    'open_download',
+]
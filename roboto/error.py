@@ -1,17 +1,35 @@
 """Basic error classes."""
 from dataclasses import dataclass
+from typing import Optional
 
 
 class RobotoError(Exception):
     """Base class for Roboto errors."""
 
 
+class TransportError(RobotoError):
+    """Signal a network error from an HTTP transport (a timeout, a connection
+    that was refused or dropped...).
+    """
+
+
 @dataclass
 class BotAPIError(Exception):
-    """Signal error with an API access."""
+    """Signal error with an API access.
+
+    Args:
+        error_code: The error code (usually an HTTP status code).
+        description: A human-readable description of the error.
+        retry_after: For flood control errors (429), how many seconds to wait
+                     before the request can be repeated.
+        migrate_to_chat_id: If the group the request was about was migrated
+                            to a supergroup, the id of the supergroup.
+    """
 
     error_code: int
     description: str
+    retry_after: Optional[int] = None
+    migrate_to_chat_id: Optional[int] = None
 
     def __post_init__(self):
         super().__init__(f'Error {self.error_code}: {self.description}')
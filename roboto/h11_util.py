@@ -0,0 +1,51 @@
+"""Utilities for serving HTTP with `h11` over trio streams.
+
+This module needs `trio` (install roboto with the `trio` extra).
+"""
+from typing import Any, Sequence, Tuple
+
+import h11
+import trio
+
+MAX_RECEIVE_SIZE = 65536
+"""How many bytes are read from a stream at a time."""
+
+CONNECTION_ERRORS = (trio.BrokenResourceError, trio.ClosedResourceError)
+"""What a stream raises when its connection is lost."""
+
+
+async def next_event(connection: h11.Connection, stream: trio.abc.Stream) -> Any:
+    """Get the next event of a connection, receiving data as needed."""
+    while True:
+        event = connection.next_event()
+
+        if event is not h11.NEED_DATA:
+            return event
+
+        connection.receive_data(await stream.receive_some(MAX_RECEIVE_SIZE))
+
+
+async def respond(
+    connection: h11.Connection,
+    stream: trio.abc.Stream,
+    status_code: int,
+    body: bytes = b'',
+    headers: Sequence[Tuple[str, str]] = (),
+) -> None:
+    """Send a whole response.
+
+    Args:
+        connection: The h11 connection of the stream.
+        stream: The stream to send the response through.
+        status_code: The status code of the response.
+        body: The body of the response.
+        headers: Headers to send, besides `content-length`.
+    """
+    all_headers = [('content-length', str(len(body))), *headers]
+    data = connection.send(h11.Response(status_code=status_code, headers=all_headers))
+
+    if body:
+        data += connection.send(h11.Data(data=body))
+
+    data += connection.send(h11.EndOfMessage())
+    await stream.send_all(data)
@@ -1,17 +1,26 @@
 """Bot API request function."""
+import time
 from collections import ChainMap
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Any, Awaitable, Callable, Dict, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, Union
 
-from asks import Session
-from asks.multipart import MultipartData
-from asks.response_objects import Response
+import anyio
 from typing_extensions import Literal, Protocol
 
-from .api_types import FileDescription
+from .api_types import ChatID, FileDescription, ResponseParameters
+from .cache import ResponseCache
+from .coalesce import Coalescer
 from .datautil import from_json_like, to_json_like
 from .error import BotAPIError
+from .json_codec import STDLIB_JSON, JSONCodec
+from .metrics import NETWORK_ERROR, MetricsSink, RequestSample
+from .multipart import MultipartBody
+from .profiling import stage
+from .rate_limit import RateLimiter
+from .retry import NETWORK_ERRORS, RetryPolicy
+from .slots import field_values
+from .transport import HTTPResponse, Transport
 
 
 class APIResult(Protocol):
@@ -27,6 +36,7 @@ class APIError(Protocol):
     ok: Literal[False]
     error_code: int
     description: str
+    parameters: Optional[ResponseParameters]
 
 
 APIResponse = Union[APIResult, APIError]
@@ -40,6 +50,35 @@ class AnyAPIResponse:
     result: Optional[Any] = None
     error_code: Optional[int] = None
     description: Optional[str] = None
+    parameters: Optional[ResponseParameters] = None
+
+
+@dataclass(frozen=True)
+class APIClient:
+    """Everything needed for making requests to the Bot API.
+
+    Args:
+        transport: What sends requests (e.g. a `roboto.transport.AsksTransport`).
+        json_codec: The JSON implementation for request and response bodies.
+        retry_policy: How to retry failed requests. If None, failed requests
+                      are not retried.
+        rate_limiter: What throttles requests (retries included). If None,
+                      requests are not throttled.
+        response_cache: Where the results of read-only methods are cached. If
+                        None, nothing is cached.
+        coalescer: What makes identical requests in flight at the same time
+                   once. If None, every request is made.
+        metrics: Where what is measured of each request goes (see
+                 `roboto.metrics`). If None, nothing is measured.
+    """
+
+    transport: Transport
+    json_codec: JSONCodec = STDLIB_JSON
+    retry_policy: Optional[RetryPolicy] = None
+    rate_limiter: Optional[RateLimiter] = None
+    response_cache: Optional[ResponseCache] = None
+    coalescer: Optional[Coalescer] = None
+    metrics: Optional[MetricsSink] = None
 
 
 class HTTPMethod(Enum):
@@ -63,73 +102,275 @@ def validate_response(response: APIResponse) -> Any:
         BotAPIError: If response.ok is false.
     """
     if not response.ok:
+        parameters = response.parameters
+
+        if parameters is None:
+            raise BotAPIError(response.error_code, response.description)
+
         raise BotAPIError(
-            response.error_code, response.description,
+            response.error_code,
+            response.description,
+            parameters.retry_after,
+            parameters.migrate_to_chat_id,
         )
 
     return response.result
 
 
 async def _json_request(
-    session: Session, method: HTTPMethod, api_method: str, body: Any = None
-) -> Response:
-    return await session.request(method.value, path=api_method, json=to_json_like(body))
+    client: APIClient, method: HTTPMethod, api_method: str, body: Any = None
+) -> Tuple[HTTPResponse, int]:
+    with stage('encode'):
+        json_body = to_json_like(body)
+        data = None if json_body is None else client.json_codec.dumpb(json_body)
 
+    long_poll = None
 
-def _to_multipart_compatible(value: Any) -> Any:
-    """Transform values into multipart/form-data compatible versions."""
-    if isinstance(value, FileDescription):
-        return MultipartData(value.binary_source, value.mime_type, value.basename)
+    if api_method == '/getUpdates':
+        long_poll = getattr(body, 'timeout', None) or 0
 
-    return value
+    with stage('transport'):
+        response = await client.transport.json_request(
+            method.value, api_method, data, long_poll
+        )
 
+    return response, 0 if data is None else len(data)
 
-async def _multipart_request_from_dict(
-    session: Session, method: HTTPMethod, api_method: str, body: Dict[str, Any]
-) -> Response:
-    fields = {k: _to_multipart_compatible(v) for k, v in body.items() if v is not None}
 
-    return await session.request(method.value, path=api_method, multipart=fields)
+APIRequester = Callable[
+    [APIClient, HTTPMethod, str, Any], Awaitable[Tuple[HTTPResponse, int]]
+]
+"""What sends a request, returning its response and the size of its body."""
 
 
-async def _multipart_request(
-    session: Session, method: HTTPMethod, api_method: str, body: Any
-) -> Response:
-    return await _multipart_request_from_dict(
-        session, method, api_method, body.__dict__
+def _multipart_requester(fields: Dict[str, Any]) -> APIRequester:
+    # The body is described once and sent again on retries, as streams that
+    # can't seek can only be read once.
+    multipart_body = MultipartBody.make(
+        {k: v for k, v in fields.items() if v is not None}
     )
 
+    async def _multipart_request(
+        client: APIClient, method: HTTPMethod, api_method: str, body: Any
+    ) -> Tuple[HTTPResponse, int]:
+        with stage('transport'):
+            response = await client.transport.multipart_request(
+                method.value, api_method, multipart_body
+            )
+
+        return response, multipart_body.content_length
+
+    return _multipart_request
+
+
+ResultReader = Callable[[Any], Any]
+"""What reads the result of a response into objects (e.g. a `functools.partial`
+of `from_json_like`)."""
+
+
+def _parse_response(client: APIClient, content: HTTPResponse) -> Any:
+    # The body is parsed straight from the response bytes, skipping the
+    # decoding to text.
+    try:
+        with stage('parse'):
+            return client.json_codec.loads(content.content)
+    except ValueError:
+        # Not a Bot API response, e.g. an error page from a proxy.
+        raise BotAPIError(content.status_code, content.reason_phrase) from None
+
+
+def _decode_response(value: Any, read_result: Optional[ResultReader]) -> Any:
+    with stage('decode'):
+        # We know that the server ensures the object will follow either
+        # protocol, but mypy can't see that.
+        response: Any = from_json_like(AnyAPIResponse, value)
+        result = validate_response(response)
+
+        return result if read_result is None else read_result(result)
+
+
+async def _request(
+    requester: APIRequester,
+    client: APIClient,
+    method: HTTPMethod,
+    api_method: str,
+    body: Any,
+    read_result: Optional[ResultReader],
+) -> Any:
+    content, _ = await requester(client, method, api_method, body)
+
+    return _decode_response(_parse_response(client, content), read_result)
+
+
+async def _measured_request(
+    metrics: MetricsSink,
+    requester: APIRequester,
+    client: APIClient,
+    method: HTTPMethod,
+    api_method: str,
+    body: Any,
+    read_result: Optional[ResultReader],
+) -> Any:
+    start = time.perf_counter()
+
+    try:
+        content, bytes_sent = await requester(client, method, api_method, body)
+    except NETWORK_ERRORS:
+        metrics.record(
+            RequestSample(api_method, NETWORK_ERROR, 0, 0, time.perf_counter() - start)
+        )
+        raise
+
+    received = time.perf_counter()
+    error = None
+    parse_time = decode_time = None
+
+    def sample() -> RequestSample:
+        return RequestSample(
+            api_method,
+            error,
+            bytes_sent,
+            len(content.content),
+            received - start,
+            parse_time,
+            decode_time,
+        )
+
+    try:
+        value = _parse_response(client, content)
+        parsed = time.perf_counter()
+        parse_time = parsed - received
+        result = _decode_response(value, read_result)
+    except Exception as e:  # pylint: disable=broad-except
+        # Responses that can't be read are counted too, by exception class.
+        error = str(e.error_code) if isinstance(e, BotAPIError) else type(e).__name__
+
+        if parse_time is not None:
+            decode_time = time.perf_counter() - parsed
 
-APIRequester = Callable[[Session, HTTPMethod, str, Any], Awaitable[Response]]
+        metrics.record(sample())
+        raise
+
+    decode_time = time.perf_counter() - parsed
+    metrics.record(sample())
+
+    return result
+
+
+_RETRIABLE_ERRORS: Tuple[Type[Exception], ...] = (BotAPIError, *NETWORK_ERRORS)
+
+
+def _migrated(body: Any, error: BotAPIError) -> Any:
+    """Re-target a request body to the supergroup a group migrated to.
+
+    Returns None if the body can't be re-targeted.
+    """
+    if (
+        error.migrate_to_chat_id is None
+        or 'chat_id' not in getattr(body, '__dataclass_fields__', ())
+        or body.chat_id == error.migrate_to_chat_id
+    ):
+        return None
+
+    return replace(body, chat_id=ChatID(error.migrate_to_chat_id))
+
+
+async def _send_request(
+    requester: APIRequester,
+    client: APIClient,
+    method: HTTPMethod,
+    api_method: str,
+    body: Any = None,
+    read_result: Optional[ResultReader] = None,
+) -> Any:
+    policy = client.retry_policy
+    attempt = 0
+
+    while True:
+        if client.rate_limiter is not None:
+            with stage('rate_limit'):
+                await client.rate_limiter.acquire(api_method, body)
+
+        try:
+            if client.metrics is None:
+                return await _request(
+                    requester, client, method, api_method, body, read_result
+                )
+
+            return await _measured_request(
+                client.metrics,
+                requester,
+                client,
+                method,
+                api_method,
+                body,
+                read_result,
+            )
+        except _RETRIABLE_ERRORS as e:
+            if policy is None:
+                raise
+
+            attempt += 1
+
+            if isinstance(e, BotAPIError) and policy.follow_migrations:
+                migrated = _migrated(body, e)
+
+                if migrated is not None and attempt < policy.max_attempts:
+                    body = migrated
+                    continue
+
+            delay = policy.delay(e, attempt)
+
+            if delay is None:
+                raise
+
+        with stage('retry_wait'):
+            await anyio.sleep(delay)
 
 
 async def _make_request(
     requester: APIRequester,
-    session: Session,
+    client: APIClient,
     method: HTTPMethod,
     api_method: str,
     body: Any = None,
+    read_result: Optional[ResultReader] = None,
 ) -> Any:
-    content = await requester(session, method, api_method, body)
+    async def request() -> Any:
+        return await _send_request(
+            requester, client, method, api_method, body, read_result
+        )
+
+    async def coalesced_request() -> Any:
+        if client.coalescer is None:
+            return await request()
+
+        return await client.coalescer.run(api_method, body, request)
 
-    # We know that the server ensures the object will follow either protocol,
-    # but mypy can't see that.
-    response: Any = from_json_like(AnyAPIResponse, content.json())
+    if client.response_cache is None:
+        return await coalesced_request()
 
-    return validate_response(response)
+    return await client.response_cache.fetch(api_method, body, coalesced_request)
 
 
 async def make_request(
-    session: Session, method: HTTPMethod, api_method: str, body: Any = None
+    client: APIClient,
+    method: HTTPMethod,
+    api_method: str,
+    body: Any = None,
+    read_result: Optional[ResultReader] = None,
 ) -> Any:
     """Basic request function for the telegram API
 
     Args:
-        session: An `asks.Session` object with the correct `base_location` and
-                 `endpoint` set up.
+        client: The APIClient to make the request with.
         method: The HTTP method to use.
         api_method: The Telegram API method to call.
         body: An object to send as JSON.
+        read_result: What reads the APIResponse contents into objects. Reading
+                     them here counts towards the decode time of the client's
+                     metrics, and cached results are kept already read. If
+                     None, the contents are returned as parsed from JSON.
 
     Returns:
         The APIResponse contents if everything went right.
@@ -137,19 +378,27 @@ async def make_request(
     Raises:
         BotAPIError: If response.ok is false.
     """
-    return await _make_request(_json_request, session, method, api_method, body)
+    return await _make_request(
+        _json_request, client, method, api_method, body, read_result
+    )
 
 
-async def make_multipart_request(session: Session, api_method: str, body: Any) -> Any:
+async def make_multipart_request(
+    client: APIClient,
+    api_method: str,
+    body: Any,
+    read_result: Optional[ResultReader] = None,
+) -> Any:
     """Function for doing POST multipart/form-data requests.
 
     Useful for requests that send files.
 
     Args:
-        session: An `asks.Session` object with the correct `base_location` and
-                 `endpoint` set up.
+        client: The APIClient to make the request with.
         api_method: The HTTP method to use.
         body: An object to send as JSON.
+        read_result: What reads the APIResponse contents into objects (see
+                     `make_request`).
 
     Returns:
         The APIResponse contents if everything went right.
@@ -158,15 +407,21 @@ async def make_multipart_request(session: Session, api_method: str, body: Any) -
         BotAPIError: If response.ok is false.
     """
     return await _make_request(
-        _multipart_request, session, HTTPMethod.POST, api_method, body
+        _multipart_requester(field_values(body)),
+        client,
+        HTTPMethod.POST,
+        api_method,
+        body,
+        read_result,
     )
 
 
 async def make_multipart_request_with_attachments(
-    session: Session,
+    client: APIClient,
     api_method: str,
     body: Any,
     attachments: Dict[str, FileDescription],
+    read_result: Optional[ResultReader] = None,
 ) -> Any:
     """Function for doing POST multipart/form-data requests with attachments.
 
@@ -175,10 +430,12 @@ async def make_multipart_request_with_attachments(
     Useful for requests that send files.
 
     Args:
-        session: An `asks.Session` object with the correct `base_location` and
-                 `endpoint` set up.
+        client: The APIClient to make the request with.
         api_method: The HTTP method to use.
         body: An object to send as JSON.
+        attachments: The files attached to the request, by name.
+        read_result: What reads the APIResponse contents into objects (see
+                     `make_request`).
 
     Returns:
         The APIResponse contents if everything went right.
@@ -186,12 +443,13 @@ async def make_multipart_request_with_attachments(
     Raises:
         BotAPIError: If response.ok is false.
     """
-    fields = dict(ChainMap(body.__dict__, attachments))
+    fields = dict(ChainMap(field_values(body), attachments))
 
-    content = await _multipart_request_from_dict(
-        session, HTTPMethod.POST, api_method, body=fields,
+    return await _make_request(
+        _multipart_requester(fields),
+        client,
+        HTTPMethod.POST,
+        api_method,
+        body,
+        read_result,
     )
-
-    response: Any = from_json_like(AnyAPIResponse, content.json())
-
-    return validate_response(response)
@@ -0,0 +1,168 @@
+"""An HTTP transport built on httpx, with HTTP/2 support.
+
+This module needs `httpx` (install roboto with the `httpx` extra).
+"""
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import AsyncGenerator, AsyncIterator, Iterator, Mapping, Optional, cast
+
+import httpx
+
+from .error import TransportError
+from .multipart import MultipartBody
+from .session import ConnectionOptions
+from .transport import Download, HTTPResponse
+
+
+@contextmanager
+def _network_errors() -> Iterator[None]:
+    try:
+        yield
+    except httpx.TransportError as e:
+        raise TransportError(str(e) or type(e).__name__) from e
+
+
+def _timeout(options: ConnectionOptions, long_poll: float = 0) -> httpx.Timeout:
+    read_timeout = options.read_timeout
+
+    return httpx.Timeout(
+        None if read_timeout is None else read_timeout + long_poll,
+        connect=options.connect_timeout,
+        # Waiting for a connection is what the pool size is for.
+        pool=None,
+    )
+
+
+def _client(
+    api_url: str, options: ConnectionOptions, connections: int, http2: bool
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=api_url,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=connections if options.keep_alive else 0,
+            keepalive_expiry=options.idle_timeout,
+        ),
+        timeout=_timeout(options),
+    )
+
+
+class HTTPXTransport:
+    """Send requests through `httpx` clients.
+
+    httpx runs on both asyncio and trio. Over HTTP/2, concurrent requests
+    share connections instead of each taking one.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        long_poll_client: Optional[httpx.AsyncClient],
+        token: str,
+        options: ConnectionOptions,
+    ):
+        self.client = client
+        self.long_poll_client = long_poll_client
+        self.options = options
+        self._endpoint = f'/bot{token}'
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        api_url: str,
+        token: str,
+        options: ConnectionOptions = ConnectionOptions(),
+        http2: bool = True,
+    ) -> AsyncIterator['HTTPXTransport']:
+        """Context manager for creating an HTTPXTransport object.
+
+        Args:
+            api_url: The Telegram Bot API URL.
+            token: The Telegram Bot API token for the bot.
+            options: How connections are made and kept. With HTTP/2, each
+                     connection carries many requests at once.
+            http2: Whether to use HTTP/2 (needs the `h2` package, installed by
+                   the `httpx` extra), when the server supports it.
+
+        Yields:
+            An HTTPXTransport object.
+        """
+        async with AsyncExitStack() as stack:
+            client = await stack.enter_async_context(
+                _client(api_url, options, options.connections, http2)
+            )
+            long_poll_client = None
+
+            if options.long_poll_connections > 0:
+                long_poll_client = await stack.enter_async_context(
+                    _client(api_url, options, options.long_poll_connections, http2)
+                )
+
+            yield HTTPXTransport(client, long_poll_client, token, options)
+
+    async def json_request(
+        self,
+        method: str,
+        api_method: str,
+        body: Optional[bytes] = None,
+        long_poll: Optional[float] = None,
+    ) -> HTTPResponse:
+        client = self.client
+
+        if long_poll is not None:
+            client = self.long_poll_client or self.client
+
+        headers = {} if body is None else {'Content-Type': 'application/json'}
+
+        with _network_errors():
+            return await client.request(
+                method,
+                f'{self._endpoint}{api_method}',
+                content=body,
+                headers=headers,
+                timeout=_timeout(self.options, long_poll or 0),
+            )
+
+    async def multipart_request(
+        self, method: str, api_method: str, body: MultipartBody
+    ) -> HTTPResponse:
+        # With its length known, the body is streamed instead of sent chunked.
+        headers = {
+            'Content-Type': body.content_type,
+            'Content-Length': str(body.content_length),
+        }
+        chunks = body.chunks()
+
+        try:
+            with _network_errors():
+                return await self.client.request(
+                    method,
+                    f'{self._endpoint}{api_method}',
+                    content=chunks,
+                    headers=headers,
+                )
+        finally:
+            await chunks.aclose()
+
+    @asynccontextmanager
+    async def download(
+        self, file_path: str, headers: Mapping[str, str]
+    ) -> AsyncIterator[Download]:
+        url = f'/file{self._endpoint}/{file_path}'
+
+        with _network_errors():
+            async with self.client.stream('GET', url, headers=headers) as response:
+                chunks = cast(AsyncGenerator[bytes, None], response.aiter_bytes())
+
+                try:
+                    yield Download(response.status_code, response.reason_phrase, chunks)
+                finally:
+                    await chunks.aclose()
+
+
+__all__ = [
+    'HTTPXTransport',
+]
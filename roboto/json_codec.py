@@ -0,0 +1,110 @@
+"""Pluggable JSON implementations for encoding requests and decoding responses."""
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Union
+
+from .error import RobotoError
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    """A JSON implementation.
+
+    Args:
+        name: A name to identify the implementation.
+        dumps: Serialize a JSON-like value into a `str`.
+        dumpb: Serialize a JSON-like value into UTF-8 encoded `bytes`.
+        loads: Parse JSON from `bytes` (or `str`).
+    """
+
+    name: str
+    dumps: Callable[[Any], str]
+    dumpb: Callable[[Any], bytes]
+    loads: Callable[[Union[bytes, str]], Any]
+
+
+class JSONCodecUnavailable(RobotoError):
+    """Signal that a JSON implementation is unknown or not installed."""
+
+
+def _stdlib_dumpb(value: Any) -> bytes:
+    return json.dumps(value).encode('utf-8')
+
+
+STDLIB_JSON = JSONCodec('json', json.dumps, _stdlib_dumpb, json.loads)
+
+
+def _make_orjson() -> JSONCodec:
+    import orjson  # pylint: disable=import-outside-toplevel
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value).decode('utf-8')
+
+    return JSONCodec('orjson', _dumps, orjson.dumps, orjson.loads)
+
+
+def _make_ujson() -> JSONCodec:
+    import ujson  # pylint: disable=import-outside-toplevel
+
+    def _dumps(value: Any) -> str:
+        return ujson.dumps(value, escape_forward_slashes=False)
+
+    def _dumpb(value: Any) -> bytes:
+        return _dumps(value).encode('utf-8')
+
+    return JSONCodec('ujson', _dumps, _dumpb, ujson.loads)
+
+
+def _make_rapidjson() -> JSONCodec:
+    import rapidjson  # pylint: disable=import-outside-toplevel
+
+    def _dumpb(value: Any) -> bytes:
+        return rapidjson.dumps(value).encode('utf-8')
+
+    return JSONCodec('rapidjson', rapidjson.dumps, _dumpb, rapidjson.loads)
+
+
+_CODEC_FACTORIES: Dict[str, Callable[[], JSONCodec]] = {
+    'json': lambda: STDLIB_JSON,
+    'orjson': _make_orjson,
+    'ujson': _make_ujson,
+    'rapidjson': _make_rapidjson,
+}
+
+
+def get_json_codec(name: str) -> JSONCodec:
+    """Get a JSON implementation by name.
+
+    Args:
+        name: One of 'json' (the standard library), 'orjson', 'ujson' or
+              'rapidjson'. All but 'json' need the respective package to be
+              installed.
+
+    Returns:
+        The JSONCodec for the given implementation.
+
+    Raises:
+        JSONCodecUnavailable: If the implementation is unknown or not installed.
+    """
+    try:
+        factory = _CODEC_FACTORIES[name]
+    except KeyError:
+        raise JSONCodecUnavailable(f'Unknown JSON implementation "{name}".') from None
+
+    try:
+        return factory()
+    except ImportError as e:
+        raise JSONCodecUnavailable(
+            f'JSON implementation "{name}" is not installed.'
+        ) from e
+
+
+def fastest_json_codec() -> JSONCodec:
+    """Get the fastest installed JSON implementation, falling back to stdlib."""
+    for name in ('orjson', 'rapidjson', 'ujson'):
+        try:
+            return get_json_codec(name)
+        except JSONCodecUnavailable:
+            pass
+
+    return STDLIB_JSON
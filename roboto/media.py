@@ -6,6 +6,7 @@ from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, TypeVar, Uni
 from uuid import uuid4
 
 from .api_types import FileDescription, InputMedia
+from .profiling import stage
 
 ConstrainedInputMedia = TypeVar('ConstrainedInputMedia', bound=InputMedia)
 
@@ -54,8 +55,9 @@ def extract_medias(
     media: Sequence[ConstrainedInputMedia],
 ) -> Tuple[List[ConstrainedInputMedia], Dict[str, FileDescription]]:
     """Apply extract_media to a sequence of InputMedia and transpose the result."""
-    medias_and_files = [extract_media(m) for m in media]
+    with stage('extract_medias'):
+        medias_and_files = [extract_media(m) for m in media]
 
-    medias, files = zip(*medias_and_files)
+        medias, files = zip(*medias_and_files)
 
-    return list(medias), {f.basename: f for f in files if f is not None}
+        return list(medias), {f.basename: f for f in files if f is not None}
@@ -0,0 +1,303 @@
+"""Per-method metrics of the requests made to the Bot API."""
+from bisect import bisect_left
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from typing_extensions import Protocol
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+"""The upper bounds of the latency histograms, in seconds.
+
+They go down to fractions of a millisecond, where JSON parsing and decoding
+usually land, and up to a minute, where long polling does.
+"""
+
+NETWORK_ERROR = 'network'
+"""The error recorded for requests that failed without a response."""
+
+
+@dataclass(frozen=True)
+class RequestSample:
+    """What was measured of a single HTTP request (retries are requests too).
+
+    Args:
+        api_method: The API method (e.g. '/sendMessage').
+        error: None if the request succeeded, the error code of the Bot API
+               (e.g. '429'), `NETWORK_ERROR`, or the class of the exception
+               raised reading the response (e.g. 'JSONConversionError').
+        bytes_sent: The size of the request body.
+        bytes_received: The size of the response body.
+        network_time: How long it took to get the response, in seconds.
+        parse_time: How long it took to parse the JSON of the response, in
+                    seconds, or None if there was no response to parse.
+        decode_time: How long it took to turn the parsed JSON into objects
+                     (`from_json_like`), in seconds, or None if it didn't
+                     happen.
+    """
+
+    api_method: str
+    error: Optional[str]
+    bytes_sent: int
+    bytes_received: int
+    network_time: float
+    parse_time: Optional[float] = None
+    decode_time: Optional[float] = None
+
+
+class MetricsSink(Protocol):
+    """Where request samples go."""
+
+    def record(self, sample: RequestSample) -> None:
+        """Record what was measured of a request."""
+
+
+@dataclass
+class Histogram:
+    """Count values into buckets, as Prometheus histograms do.
+
+    Args:
+        bounds: The upper bounds of the buckets, in increasing order.
+        counts: How many values fell into each bucket (not cumulative). The
+                last one is for values above every bound.
+        total: The sum of the values.
+        count: How many values there are.
+    """
+
+    bounds: Tuple[float, ...] = DEFAULT_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """Count a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        """How many values are at most each bound, then how many there are."""
+        counts = []
+        count = 0
+
+        for bucket_count in self.counts:
+            count += bucket_count
+            counts.append(count)
+
+        return counts
+
+
+@dataclass
+class MethodMetrics:
+    """The metrics of an API method.
+
+    Args:
+        bounds: The upper bounds of the latency histograms, in seconds.
+        requests: How many requests were made.
+        errors: How many requests failed, by error (see `RequestSample`).
+        bytes_sent: How many bytes were sent, in request bodies.
+        bytes_received: How many bytes were received, in response bodies.
+        network_time: How long it took to get responses.
+        parse_time: How long it took to parse their JSON.
+        decode_time: How long it took to turn the JSON into objects.
+    """
+
+    bounds: Tuple[float, ...] = DEFAULT_BUCKETS
+    requests: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    network_time: Histogram = field(init=False)
+    parse_time: Histogram = field(init=False)
+    decode_time: Histogram = field(init=False)
+
+    def __post_init__(self):
+        self.network_time = Histogram(self.bounds)
+        self.parse_time = Histogram(self.bounds)
+        self.decode_time = Histogram(self.bounds)
+
+    def record(self, sample: RequestSample) -> None:
+        """Add a request to the metrics."""
+        self.requests += 1
+        self.bytes_sent += sample.bytes_sent
+        self.bytes_received += sample.bytes_received
+        self.network_time.observe(sample.network_time)
+
+        if sample.error is not None:
+            self.errors[sample.error] = self.errors.get(sample.error, 0) + 1
+
+        if sample.parse_time is not None:
+            self.parse_time.observe(sample.parse_time)
+
+        if sample.decode_time is not None:
+            self.decode_time.observe(sample.decode_time)
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def prometheus_text(metrics: Dict[str, MethodMetrics], prefix: str = 'roboto') -> str:
+    """Format metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics: The metrics, by API method (e.g. from `Metrics.snapshot`).
+        prefix: What the names of the metrics start with.
+
+    Returns:
+        The metrics, ready to be served to Prometheus.
+    """
+    lines: List[str] = []
+
+    def counter(name: str, help_text: str, values: List[Tuple[str, int]]) -> None:
+        lines.append(f'# HELP {prefix}_{name} {help_text}')
+        lines.append(f'# TYPE {prefix}_{name} counter')
+        lines.extend(f'{prefix}_{name}{{{labels}}} {value}' for labels, value in values)
+
+    methods = sorted(metrics.items())
+    counter(
+        'requests_total',
+        'Requests made to the Bot API.',
+        [(f'method="{method[1:]}"', m.requests) for method, m in methods],
+    )
+    counter(
+        'request_errors_total',
+        'Requests to the Bot API that failed.',
+        [
+            (f'method="{method[1:]}",error="{error}"', count)
+            for method, m in methods
+            for error, count in sorted(m.errors.items())
+        ],
+    )
+    counter(
+        'request_bytes_total',
+        'Bytes sent in request bodies.',
+        [(f'method="{method[1:]}"', m.bytes_sent) for method, m in methods],
+    )
+    counter(
+        'response_bytes_total',
+        'Bytes received in response bodies.',
+        [(f'method="{method[1:]}"', m.bytes_received) for method, m in methods],
+    )
+
+    name = f'{prefix}_request_duration_seconds'
+    lines.append(
+        f'# HELP {name} Time spent on requests, by phase (network, parse, decode).'
+    )
+    lines.append(f'# TYPE {name} histogram')
+
+    for method, m in methods:
+        for phase, histogram in (
+            ('network', m.network_time),
+            ('parse', m.parse_time),
+            ('decode', m.decode_time),
+        ):
+            labels = f'method="{method[1:]}",phase="{phase}"'
+            bounds = [_format_bound(b) for b in histogram.bounds] + ['+Inf']
+
+            for bound, count in zip(bounds, histogram.cumulative_counts()):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+
+            lines.append(f'{name}_sum{{{labels}}} {histogram.total!r}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+class Metrics:
+    """Keep the metrics of every API method in memory.
+
+    Args:
+        bounds: The upper bounds of the latency histograms, in seconds.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self._methods: Dict[str, MethodMetrics] = {}
+
+    def record(self, sample: RequestSample) -> None:
+        """Record what was measured of a request."""
+        metrics = self._methods.get(sample.api_method)
+
+        if metrics is None:
+            metrics = self._methods[sample.api_method] = MethodMetrics(self.bounds)
+
+        metrics.record(sample)
+
+    def snapshot(self) -> Dict[str, MethodMetrics]:
+        """Get a copy of the metrics so far, by API method."""
+        return deepcopy(self._methods)
+
+    def prometheus(self, prefix: str = 'roboto') -> str:
+        """Get the metrics so far in the Prometheus text exposition format."""
+        return prometheus_text(self._methods, prefix)
+
+    def clear(self) -> None:
+        """Forget every metric."""
+        self._methods.clear()
+
+
+class StatsdSink:
+    """Send samples as statsd metrics.
+
+    Args:
+        send: What sends a statsd line (e.g. 'roboto.sendMessage.requests:1|c')
+              to the statsd server, e.g. over a UDP socket.
+        prefix: What the names of the metrics start with.
+    """
+
+    def __init__(self, send: Callable[[str], None], prefix: str = 'roboto'):
+        self.send = send
+        self.prefix = prefix
+
+    def record(self, sample: RequestSample) -> None:
+        """Send what was measured of a request."""
+        name = f'{self.prefix}.{sample.api_method[1:]}'
+
+        self.send(f'{name}.requests:1|c')
+        self.send(f'{name}.request_bytes:{sample.bytes_sent}|c')
+        self.send(f'{name}.response_bytes:{sample.bytes_received}|c')
+        self.send(f'{name}.network_time:{sample.network_time * 1000:g}|ms')
+
+        if sample.error is not None:
+            self.send(f'{name}.errors.{sample.error}:1|c')
+
+        if sample.parse_time is not None:
+            self.send(f'{name}.parse_time:{sample.parse_time * 1000:g}|ms')
+
+        if sample.decode_time is not None:
+            self.send(f'{name}.decode_time:{sample.decode_time * 1000:g}|ms')
+
+
+__all__ = [
+    'DEFAULT_BUCKETS',
+    'Histogram',
+    'MethodMetrics',
+    'Metrics',
+    'MetricsSink',
+    'NETWORK_ERROR',
+    'RequestSample',
+    'StatsdSink',
+    'prometheus_text',
+]
@@ -0,0 +1,288 @@
+"""Building multipart/form-data request bodies without extra copies of files."""
+import io
+import mimetypes
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+from uuid import uuid4
+
+import anyio
+
+from .api_types import FileDescription
+from .error import RobotoError
+
+_OCTET_STREAM = 'application/octet-stream'
+
+CHUNK_SIZE = 1 << 20
+"""How many bytes of a file are read at a time."""
+
+InMemorySource = Union[bytes, bytearray, memoryview]
+
+
+class _FileSource:
+    """A file (or stream) whose contents are read only when sending.
+
+    Streams are sought back to where they started after being read, so that
+    they can be sent again (e.g. when a request is retried). Files are read
+    in worker threads, so that reading them doesn't block the event loop.
+    """
+
+    def __init__(self, source: Union[Path, BinaryIO], size: int, start: int = 0):
+        self.source = source
+        self.size = size
+        self.start = start
+
+    def _open(self) -> BinaryIO:
+        if isinstance(self.source, Path):
+            return self.source.open('rb')
+
+        self.source.seek(self.start)
+
+        return self.source
+
+    def _close(self, stream: BinaryIO) -> None:
+        if stream is self.source:
+            stream.seek(self.start)
+        else:
+            stream.close()
+
+    async def read_into(self, view: memoryview, chunk_size: int) -> None:
+        """Fill `view` (which must be `size` long) with the file's contents."""
+        stream = await anyio.to_thread.run_sync(self._open)
+        readinto: Callable[[Any], Optional[int]] = getattr(
+            stream, 'readinto', lambda b: _read_into(stream, b)
+        )
+
+        try:
+            position = 0
+
+            while position < self.size:
+                read = await anyio.to_thread.run_sync(
+                    readinto, view[position : position + chunk_size]
+                )
+
+                if not read:
+                    raise RobotoError(f'{self.source} is smaller than when measured')
+
+                position += read
+        finally:
+            await anyio.to_thread.run_sync(self._close, stream)
+
+    async def chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Read the file's contents a chunk at a time."""
+        stream = await anyio.to_thread.run_sync(self._open)
+
+        try:
+            remaining = self.size
+
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(
+                    stream.read, min(chunk_size, remaining)
+                )
+
+                if not chunk:
+                    raise RobotoError(f'{self.source} is smaller than when measured')
+
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await anyio.to_thread.run_sync(self._close, stream)
+
+
+def _read_into(stream: BinaryIO, view: memoryview) -> int:
+    data = stream.read(len(view))
+    view[: len(data)] = data
+
+    return len(data)
+
+
+_Piece = Union[InMemorySource, _FileSource]
+
+
+def _size(piece: _Piece) -> int:
+    if isinstance(piece, _FileSource):
+        return piece.size
+
+    return memoryview(piece).nbytes
+
+
+def _file_piece(source: Any) -> _Piece:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+
+    if isinstance(source, Path):
+        return _FileSource(source, source.stat().st_size)
+
+    if source.seekable():
+        start = source.tell()
+        size = source.seek(0, io.SEEK_END) - start
+        source.seek(start)
+
+        return _FileSource(source, size, start)
+
+    # The size of a stream that can't seek is only known after reading it,
+    # and it can only be read once, so it is kept for sending the body again.
+    return source.read()
+
+
+def _quote(value: str) -> str:
+    return value.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def _guess_mime_type(basename: Optional[str]) -> str:
+    if basename is None:
+        return _OCTET_STREAM
+
+    mime_type, _ = mimetypes.guess_type(basename)
+
+    return mime_type if mime_type is not None else _OCTET_STREAM
+
+
+class MultipartBody:
+    """A multipart/form-data body, with its length known before reading files.
+
+    Files are only read when the body is sent, either all at once into a
+    single buffer (`read`) or a chunk at a time (`chunks`). In-memory data
+    (`bytes`, `bytearray` or `memoryview`) is used without being copied
+    until then. Streams that can't seek are the exception: they are read
+    when the body is described, so that the body can be sent again (e.g.
+    when a request is retried).
+
+    Only `chunks` keeps memory bounded: `read` holds the whole body, which is
+    what `roboto.transport.AsksTransport` sends, since asks can't stream
+    request bodies. `roboto.httpx_transport.HTTPXTransport` streams them.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`.
+    """
+
+    def __init__(self, pieces: List[_Piece], boundary: str):
+        self._pieces = pieces
+        self.boundary = boundary
+        self.content_length = sum(_size(piece) for piece in pieces)
+
+    @staticmethod
+    def make(
+        fields: Mapping[str, Any], boundary: Optional[str] = None
+    ) -> 'MultipartBody':
+        """Describe a body with some form fields.
+
+        Args:
+            fields: Form field names to values. `Path`, binary stream,
+                    `bytes`, `bytearray`, `memoryview` and `FileDescription`
+                    values are sent as files, and other values as their
+                    `str`.
+            boundary: The boundary between fields. A random one by default.
+
+        Returns:
+            A MultipartBody object.
+        """
+        boundary = boundary if boundary is not None else uuid4().hex
+        delimiter = f'--{boundary}\r\n'.encode()
+        pieces: List[_Piece] = []
+
+        for name, value in fields.items():
+            header = f'Content-Disposition: form-data; name="{_quote(name)}"'
+
+            if isinstance(value, FileDescription):
+                source: Any = value.binary_source
+                basename: Optional[str] = value.basename
+                mime_type: Optional[str] = value.mime_type
+            elif isinstance(value, (Path, bytes, bytearray, memoryview)) or hasattr(
+                value, 'read'
+            ):
+                source = value
+                name_attribute = getattr(value, 'name', None)
+                basename = (
+                    Path(name_attribute).name
+                    if isinstance(name_attribute, (str, Path))
+                    else None
+                )
+                mime_type = _guess_mime_type(basename)
+            else:
+                source = str(value).encode()
+                basename = mime_type = None
+
+            if basename is not None:
+                header += f'; filename="{_quote(basename)}"'
+
+            if mime_type is not None:
+                header += f'\r\nContent-Type: {mime_type}'
+
+            pieces += [
+                delimiter,
+                f'{header}\r\n\r\n'.encode(),
+                _file_piece(source),
+                b'\r\n',
+            ]
+
+        pieces.append(f'--{boundary}--\r\n'.encode())
+
+        return MultipartBody(pieces, boundary)
+
+    @property
+    def content_type(self) -> str:
+        """The value of the body's Content-Type header."""
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    async def read(self, chunk_size: int = CHUNK_SIZE) -> bytes:
+        """Read the whole body.
+
+        Files are read straight into a buffer of the body's exact size, which
+        then becomes the returned `bytes` without being copied.
+
+        Args:
+            chunk_size: How many bytes of a file are read at a time.
+        """
+        body = io.BytesIO()
+
+        if self.content_length > 0:
+            body.seek(self.content_length - 1)
+            body.write(b'\0')
+
+        with body.getbuffer() as view:
+            position = 0
+
+            for piece in self._pieces:
+                size = _size(piece)
+
+                with view[position : position + size] as target:
+                    if isinstance(piece, _FileSource):
+                        await piece.read_into(target, chunk_size)
+                    else:
+                        target[:] = piece
+
+                position += size
+
+        # BytesIO shares its buffer with the bytes it returns, if it is not
+        # exported anymore.
+        return body.getvalue()
+
+    async def chunks(self, chunk_size: int = CHUNK_SIZE) -> AsyncGenerator[bytes, None]:
+        """Read the body a chunk at a time, for sending it as a stream.
+
+        Args:
+            chunk_size: How many bytes of a file are read at a time.
+        """
+        for piece in self._pieces:
+            if isinstance(piece, _FileSource):
+                async for chunk in piece.chunks(chunk_size):
+                    yield chunk
+            else:
+                yield bytes(piece)
+
+
+__all__ = [
+    'CHUNK_SIZE',
+    'InMemorySource',
+    'MultipartBody',
+]
@@ -0,0 +1,208 @@
+"""Long polling for updates, with offsets committed only for handled updates.
+
+This module needs `trio` (install roboto with the `trio` extra).
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set
+
+import trio
+
+from .api_types import Update
+from .bot import BotAPI
+
+MAX_UPDATES_LIMIT = 100
+"""The maximum `limit` accepted by getUpdates."""
+
+_UNACKED_POLL_INTERVAL = 1
+
+
+class UpdatePoller:
+    """Fetch updates through long polling and yield them as an async iterator.
+
+    The next getUpdates call is made while previously fetched updates are
+    still being handled. An update is only confirmed to Telegram (through
+    getUpdates' `offset`) once it and every update before it are acknowledged
+    through `ack`, so updates not handled before the bot stops are delivered
+    again when it restarts.
+
+    Telegram sends unconfirmed updates again with every getUpdates call, and
+    they count towards its limit of 100 updates per call. So that a single
+    slow update can't stall polling, it is confirmed anyway once
+    `max_unacked` updates were fetched since it (it is then not delivered
+    again on a restart). While fetched updates are unacknowledged, getUpdates
+    can't long poll (it answers right away with them): when it returns no new
+    updates, it is only called again after an update is acknowledged, or
+    after a second.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`, which runs the polling task.
+    """
+
+    def __init__(
+        self,
+        bot: BotAPI,
+        receive_channel: trio.MemoryReceiveChannel,
+        timeout: int,
+        batch_size: int,
+        max_unacked: int,
+        allowed_updates: Optional[List[str]],
+    ):
+        self._bot = bot
+        self._receive_channel = receive_channel
+        self._timeout = timeout
+        self._batch_size = batch_size
+        self._max_unacked = min(max_unacked, MAX_UPDATES_LIMIT - 1)
+        self._allowed_updates = allowed_updates
+        self._unacked: Set[int] = set()
+        self._last_seen: Optional[int] = None
+        self._last_committed: Optional[int] = None
+        self._acked = trio.Event()
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        bot: BotAPI,
+        *,
+        timeout: int = 30,
+        batch_size: int = MAX_UPDATES_LIMIT,
+        max_buffered: int = MAX_UPDATES_LIMIT,
+        max_unacked: int = MAX_UPDATES_LIMIT // 2,
+        allowed_updates: Optional[List[str]] = None,
+    ) -> AsyncIterator['UpdatePoller']:
+        """Context manager for running an UpdatePoller.
+
+        On a clean exit, the offset of acknowledged updates is committed to
+        Telegram with a last getUpdates call.
+
+        Args:
+            bot: The BotAPI to poll with.
+            timeout: How long each getUpdates call long polls for, in seconds.
+            batch_size: How many new updates to ask for at most in each call.
+                        Fewer are asked for when updates are piling up
+                        unconsumed.
+            max_buffered: How many fetched updates can wait to be consumed
+                          before polling pauses.
+            max_unacked: How many updates can be fetched since the oldest
+                         unacknowledged update before it is confirmed
+                         anyway. At most 99, so that each getUpdates call
+                         can return new updates.
+            allowed_updates: Which kind of updates to fetch.
+
+        Yields:
+            An UpdatePoller object.
+        """
+        send_channel, receive_channel = trio.open_memory_channel(max_buffered)
+        poller = UpdatePoller(
+            bot, receive_channel, timeout, batch_size, max_unacked, allowed_updates
+        )
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(poller._poll, send_channel)
+            yield poller
+            nursery.cancel_scope.cancel()
+
+        await poller.commit()
+
+    @property
+    def committed_offset(self) -> Optional[int]:
+        """The offset up to which every update was acknowledged.
+
+        None if no update was fetched yet.
+        """
+        if self._unacked:
+            return min(self._unacked)
+
+        if self._last_seen is None:
+            return None
+
+        return self._last_seen + 1
+
+    def ack(self, update: Update) -> None:
+        """Acknowledge that an update was handled.
+
+        Updates confirmed anyway (see `max_unacked`) can still be
+        acknowledged: it does nothing.
+
+        Args:
+            update: An update yielded by this poller.
+        """
+        self._unacked.discard(update.update_id)
+        self._acked.set()
+
+    async def commit(self) -> None:
+        """Confirm acknowledged updates to Telegram, if not done already."""
+        offset = self.committed_offset
+
+        if offset is None or offset == self._last_committed:
+            return
+
+        await self._bot.get_updates(offset, limit=1, timeout=0)
+        self._last_committed = offset
+
+    def __aiter__(self) -> AsyncIterator[Update]:
+        return self._receive_channel.__aiter__()
+
+    def _limit(self, offset: Optional[int]) -> int:
+        # Updates since `offset` that were already fetched are sent again by
+        # Telegram and count towards the limit, so ask for enough of them.
+        # Update ids are sequential.
+        refetched = 0
+
+        if offset is not None and self._last_seen is not None:
+            refetched = self._last_seen + 1 - offset
+
+        backlog = self._receive_channel.statistics().current_buffer_used
+        wanted = max(1, self._batch_size - backlog)
+
+        return min(MAX_UPDATES_LIMIT, refetched + wanted)
+
+    def _confirm_stale(self) -> None:
+        # Keep the updates sent again by Telegram (from the oldest
+        # unacknowledged one on) to at most `max_unacked`.
+        if self._last_seen is None:
+            return
+
+        oldest = self._last_seen + 1 - self._max_unacked
+
+        if self._unacked and min(self._unacked) < oldest:
+            self._unacked = {i for i in self._unacked if i >= oldest}
+
+    async def _poll(self, send_channel: trio.MemorySendChannel) -> None:
+        async with send_channel:
+            while True:
+                offset = self.committed_offset
+                updates = await self._bot.get_updates(
+                    offset, self._limit(offset), self._timeout, self._allowed_updates
+                )
+                self._last_committed = offset
+
+                new = [
+                    u
+                    for u in updates
+                    if self._last_seen is None or u.update_id > self._last_seen
+                ]
+
+                if updates and not new and self.committed_offset == offset:
+                    # Everything fetched is still being handled. Polling again
+                    # now would return immediately with the same updates.
+                    self._acked = trio.Event()
+
+                    with trio.move_on_after(_UNACKED_POLL_INTERVAL):
+                        await self._acked.wait()
+
+                    continue
+
+                for update in new:
+                    self._unacked.add(update.update_id)
+                    self._last_seen = update.update_id
+
+                self._confirm_stale()
+
+                for update in new:
+                    await send_channel.send(update)
+
+
+__all__ = [
+    'MAX_UPDATES_LIMIT',
+    'UpdatePoller',
+]
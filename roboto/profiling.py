@@ -0,0 +1,285 @@
+"""Hooks for profiling the stages of Bot API calls.
+
+Each call of a `BotAPI` method is a stage, named after the method (e.g.
+`send_media_group`). Within it, these stages are reported:
+
+    - `extract_medias`: taking the files out of input media;
+    - `json_serialize`: serializing nested fields of requests to JSON;
+    - `rate_limit`: waiting for the rate limiter;
+    - `encode`: encoding JSON request bodies;
+    - `transport`: sending a request and receiving its response (with
+      `multipart` nested in it when multipart bodies are assembled);
+    - `parse`: parsing the JSON of a response;
+    - `decode`: checking a response and reading its result into objects
+      (with `from_json_like` nested in it);
+    - `retry_wait`: waiting before a retry.
+
+The time a method takes outside of those (mostly building its request) is
+its own. Stages are only reported to the hooks given to `profile`, which are
+kept in a context variable: they follow tasks started while profiling (trio
+and asyncio tasks inherit the context of their parent), and cost almost
+nothing when no hook is set.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import wraps
+from inspect import iscoroutinefunction
+from pathlib import Path
+from types import FunctionType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from typing_extensions import Literal, Protocol
+
+Stack = Tuple[str, ...]
+"""The stages being run, from the outermost one."""
+
+T = TypeVar('T')
+C = TypeVar('C', bound=type)
+H = TypeVar('H', bound='StageHook')
+
+
+class StageHook(Protocol):
+    """What is told about stages as they start and end."""
+
+    def stage_started(self, stack: Stack) -> None:
+        """A stage started.
+
+        Args:
+            stack: The stages being run, ending with the one that started.
+        """
+
+    def stage_ended(self, stack: Stack, wall_time: float, cpu_time: float) -> None:
+        """A stage ended.
+
+        Args:
+            stack: The stages being run, ending with the one that ended.
+            wall_time: How long the stage took, in seconds.
+            cpu_time: How much CPU time the thread used during the stage, in
+                      seconds. For stages that wait on the network, that
+                      includes what other tasks did meanwhile.
+        """
+
+
+_HOOKS: ContextVar[Tuple[StageHook, ...]] = ContextVar('roboto_hooks', default=())
+_STACK: ContextVar[Stack] = ContextVar('roboto_stack', default=())
+
+
+class _Stage:
+    __slots__ = ('name', '_hooks', '_token', '_wall_start', '_cpu_start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self._hooks = _HOOKS.get()
+
+        if not self._hooks:
+            return
+
+        stack = _STACK.get() + (self.name,)
+        self._token: Token = _STACK.set(stack)
+
+        for hook in self._hooks:
+            hook.stage_started(stack)
+
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if not self._hooks:
+            return
+
+        wall_time = time.perf_counter() - self._wall_start
+        cpu_time = time.thread_time() - self._cpu_start
+        stack = _STACK.get()
+
+        for hook in self._hooks:
+            hook.stage_ended(stack, wall_time, cpu_time)
+
+        _STACK.reset(self._token)
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Context manager for running a stage, reported to the current hooks.
+
+    Args:
+        name: The name of the stage.
+    """
+    return _Stage(name)
+
+
+def staged(name: str) -> Callable[[Callable[..., Awaitable[T]]], Any]:
+    """Decorate a coroutine function to run as a stage.
+
+    Args:
+        name: The name of the stage.
+    """
+
+    def decorator(f: Callable[..., Awaitable[T]]) -> Any:
+        @wraps(f)
+        async def _staged(*args: Any, **kwargs: Any) -> T:
+            with _Stage(name):
+                return await f(*args, **kwargs)
+
+        return _staged
+
+    return decorator
+
+
+def staged_methods(cls: C) -> C:
+    """Make every public coroutine method of a class run as a stage.
+
+    Stages are named after the methods.
+    """
+    for name, value in list(vars(cls).items()):
+        if (
+            not name.startswith('_')
+            and isinstance(value, FunctionType)
+            and iscoroutinefunction(value)
+        ):
+            setattr(cls, name, staged(name)(value))
+
+    return cls
+
+
+@contextmanager
+def profile(hook: H) -> Iterator[H]:
+    """Context manager for reporting stages to a hook.
+
+    Stages of tasks started inside of it are reported too. Hooks can be
+    nested: stages are reported to every one of them.
+
+    Args:
+        hook: What stages are reported to (e.g. a `StageCollector`).
+
+    Yields:
+        The hook.
+    """
+    token = _HOOKS.set(_HOOKS.get() + (hook,))
+
+    try:
+        yield hook
+    finally:
+        _HOOKS.reset(token)
+
+
+@dataclass
+class StageStats:
+    """How long a stage took, added up over its runs.
+
+    Args:
+        count: How many times the stage ran.
+        wall_time: How long it took, in seconds.
+        cpu_time: How much CPU time it took, in seconds.
+    """
+
+    count: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+
+
+class StageCollector:
+    """Add up the wall and CPU time of stages.
+
+    Stages are added up by stack, so the same stage is kept apart when it runs
+    under different stages (e.g. `transport` under `send_message`, and under
+    `send_photo`).
+    """
+
+    def __init__(self) -> None:
+        self.stacks: DefaultDict[Stack, StageStats] = defaultdict(StageStats)
+
+    def stage_started(self, stack: Stack) -> None:
+        """Nothing is collected when stages start."""
+
+    def stage_ended(self, stack: Stack, wall_time: float, cpu_time: float) -> None:
+        """Add a run of a stage to the stats."""
+        stats = self.stacks[stack]
+        stats.count += 1
+        stats.wall_time += wall_time
+        stats.cpu_time += cpu_time
+
+    def by_stage(self) -> Dict[str, StageStats]:
+        """Get the stats of each stage, whatever it ran under.
+
+        A stage running under itself (e.g. a method calling another one) is
+        only counted at its outermost run.
+        """
+        totals: Dict[str, StageStats] = defaultdict(StageStats)
+
+        for stack, stats in self.stacks.items():
+            name = stack[-1]
+
+            if name in stack[:-1]:
+                continue
+
+            total = totals[name]
+            total.count += stats.count
+            total.wall_time += stats.wall_time
+            total.cpu_time += stats.cpu_time
+
+        return dict(totals)
+
+    def folded(self, metric: Literal['wall', 'cpu'] = 'wall') -> List[str]:
+        """Get the stats as folded stacks, for flame graphs.
+
+        Each line holds a stack (stages separated by ';') and the time spent
+        in its last stage outside of nested stages, in microseconds. Tools
+        like flamegraph.pl, inferno or speedscope read this format.
+
+        Args:
+            metric: Whether to use wall time or CPU time.
+        """
+        inclusive = {
+            stack: stats.wall_time if metric == 'wall' else stats.cpu_time
+            for stack, stats in self.stacks.items()
+        }
+        exclusive = dict(inclusive)
+
+        for stack, value in inclusive.items():
+            parent = stack[:-1]
+
+            if parent in exclusive:
+                exclusive[parent] -= value
+
+        return [
+            f'{";".join(stack)} {max(0, round(value * 1e6))}'
+            for stack, value in sorted(exclusive.items())
+        ]
+
+    def dump_folded(
+        self, path: Union[str, Path], metric: Literal['wall', 'cpu'] = 'wall'
+    ) -> None:
+        """Write the stats as folded stacks to a file (see `folded`)."""
+        Path(path).write_text(''.join(f'{line}\n' for line in self.folded(metric)))
+
+    def clear(self) -> None:
+        """Forget every stat."""
+        self.stacks.clear()
+
+
+__all__ = [
+    'Stack',
+    'StageCollector',
+    'StageHook',
+    'StageStats',
+    'profile',
+    'stage',
+    'staged',
+    'staged_methods',
+]
@@ -0,0 +1,269 @@
+"""Client-side throttling of requests to stay within Telegram's rate limits."""
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import anyio
+
+GLOBAL = 'global'
+"""The key of the bucket shared by all throttled requests."""
+
+GROUP = 'group'
+"""Tags the keys of the buckets with the limits of groups and channels."""
+
+DEFAULT_PRIORITIES: Mapping[str, int] = {
+    '/answerCallbackQuery': 1,
+    '/answerInlineQuery': 1,
+    '/answerShippingQuery': 1,
+    '/answerPreCheckoutQuery': 1,
+}
+"""Methods that users are actively waiting on skip ahead of other requests."""
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A rate limit, as a number of requests allowed in a period.
+
+    Args:
+        requests: How many requests are allowed in each period.
+        period: The length of the period, in seconds.
+        burst: How many requests can be made at once after being idle.
+               Defaults to `requests`.
+    """
+
+    requests: int
+    period: float
+    burst: Optional[int] = None
+
+    @property
+    def interval(self) -> float:
+        """The time between requests when sending at the limit."""
+        return self.period / self.requests
+
+
+class _Bucket:
+    """A token bucket, implemented as a generic cell rate algorithm.
+
+    `tat` (theoretical arrival time) is when the bucket will be full again.
+    """
+
+    def __init__(self, rate: Rate):
+        self.interval = rate.interval
+        burst = rate.burst if rate.burst is not None else rate.requests
+        self.tolerance = (burst - 1) * self.interval
+        self.tat = float('-inf')
+
+    def ready_at(self) -> float:
+        return self.tat - self.tolerance
+
+    def take(self, now: float) -> None:
+        self.tat = max(self.tat, now) + self.interval
+
+
+@dataclass
+class RateLimiterStats:
+    """Accumulated information about throttled requests.
+
+    Args:
+        requests: How many requests went through the limiter.
+        delayed_requests: How many requests had to wait.
+        total_wait: The sum of the time all requests waited, in seconds.
+        max_wait: The longest time a request waited, in seconds.
+    """
+
+    requests: int = 0
+    delayed_requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        """Account for a request that waited `wait` seconds."""
+        self.requests += 1
+
+        if wait > 0:
+            self.delayed_requests += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+@dataclass(order=True)
+class _Waiter:
+    sort_key: Tuple[int, int]
+    keys: Tuple[Hashable, ...] = field(compare=False)
+
+
+class RateLimiter:
+    """Throttle requests with token buckets matching Telegram's limits.
+
+    Every request except getUpdates takes a token from a global bucket.
+    Requests that send messages (the send* methods other than
+    sendChatAction, and forwardMessage) also take a token from a bucket for
+    their chat. Messages to groups and channels (negative ids and usernames)
+    take another token from a bucket with the limit of groups, keyed by
+    `(GROUP, chat_id)`.
+
+    Waiting requests are served by priority, then in arrival order, when
+    they compete for the same bucket. Requests that can't proceed sleep
+    until the time their buckets will have tokens again, or until the
+    requests ahead of them are served.
+
+    Args:
+        global_rate: The limit for all requests.
+        chat_rate: The limit for messages to each chat, groups and channels
+                   included.
+        group_rate: The limit for messages to each group or channel, on top
+                    of `chat_rate`.
+        priorities: The priority of API methods (e.g. '/answerCallbackQuery').
+                    Higher priorities are served first, and unlisted methods
+                    have priority 0.
+    """
+
+    def __init__(
+        self,
+        global_rate: Rate = Rate(30, 1),
+        chat_rate: Rate = Rate(1, 1),
+        group_rate: Rate = Rate(20, 60),
+        priorities: Mapping[str, int] = DEFAULT_PRIORITIES,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.priorities = priorities
+        self.stats = RateLimiterStats()
+        self._buckets: Dict[Hashable, _Bucket] = {GLOBAL: _Bucket(global_rate)}
+        self._waiters: List[_Waiter] = []
+        self._tickets = count()
+        self._waiters_changed: Optional[anyio.Event] = None
+
+    def keys_for(self, api_method: str, body: Any = None) -> Tuple[Hashable, ...]:
+        """Get the keys of the buckets a request takes tokens from.
+
+        Args:
+            api_method: The Telegram API method being called.
+            body: The request body.
+        """
+        if api_method == '/getUpdates':
+            return ()
+
+        sends_message = (
+            api_method.startswith('/send') and api_method != '/sendChatAction'
+        ) or api_method == '/forwardMessage'
+        chat_id = getattr(body, 'chat_id', None)
+
+        if not sends_message or chat_id is None:
+            return (GLOBAL,)
+
+        if isinstance(chat_id, str) or (isinstance(chat_id, int) and chat_id < 0):
+            return (GLOBAL, chat_id, (GROUP, chat_id))
+
+        return (GLOBAL, chat_id)
+
+    async def acquire(self, api_method: str, body: Any = None) -> float:
+        """Wait until a request can be made without exceeding the limits.
+
+        Args:
+            api_method: The Telegram API method being called.
+            body: The request body (used to find the chat it is about).
+
+        Returns:
+            How long the request waited, in seconds.
+        """
+        keys = self.keys_for(api_method, body)
+
+        if not keys:
+            return 0.0
+
+        priority = self.priorities.get(api_method, 0)
+        waiter = _Waiter((-priority, next(self._tickets)), keys)
+        buckets = [self._bucket(key) for key in keys]
+        start = anyio.current_time()
+
+        self._waiters.append(waiter)
+        self._waiters.sort()
+
+        try:
+            while True:
+                now = anyio.current_time()
+                ready_at = max(bucket.ready_at() for bucket in buckets)
+
+                if ready_at > now:
+                    await anyio.sleep(ready_at - now)
+                elif self._has_ready_waiter_before(waiter, now):
+                    # Let the waiter ahead take the token first.
+                    await self._wait_for_waiters()
+                else:
+                    break
+        finally:
+            self._waiters.remove(waiter)
+            self._notify_waiters()
+
+        for bucket in buckets:
+            bucket.take(now)
+
+        self._prune(now)
+
+        wait = now - start
+        self.stats.record(wait)
+
+        return wait
+
+    def _bucket(self, key: Hashable) -> _Bucket:
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            is_group = isinstance(key, tuple) and key[0] == GROUP
+            bucket = _Bucket(self.group_rate if is_group else self.chat_rate)
+            self._buckets[key] = bucket
+
+        return bucket
+
+    async def _wait_for_waiters(self) -> None:
+        # Created lazily, as events need a running event loop.
+        if self._waiters_changed is None:
+            self._waiters_changed = anyio.Event()
+
+        await self._waiters_changed.wait()
+
+    def _notify_waiters(self) -> None:
+        if self._waiters_changed is not None:
+            self._waiters_changed.set()
+            self._waiters_changed = None
+
+    def _has_ready_waiter_before(self, waiter: _Waiter, now: float) -> bool:
+        keys = set(waiter.keys)
+
+        for other in self._waiters:
+            if other is waiter:
+                return False
+
+            if keys.intersection(other.keys) and all(
+                self._buckets[key].ready_at() <= now for key in other.keys
+            ):
+                return True
+
+        return False
+
+    def _prune(self, now: float) -> None:
+        # Buckets that are full again behave like new ones, so forget them to
+        # keep memory bounded by the number of recently active chats.
+        if len(self._buckets) <= 2 * len(self._waiters) + 1024:
+            return
+
+        waiting = {key for waiter in self._waiters for key in waiter.keys}
+
+        for key in [
+            key
+            for key, bucket in self._buckets.items()
+            if key != GLOBAL and key not in waiting and bucket.tat <= now
+        ]:
+            del self._buckets[key]
+
+
+__all__ = [
+    'DEFAULT_PRIORITIES',
+    'GLOBAL',
+    'GROUP',
+    'Rate',
+    'RateLimiter',
+    'RateLimiterStats',
+]
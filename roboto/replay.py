@@ -0,0 +1,221 @@
+"""Recording the updates a bot receives, and replaying them later.
+
+Recordings are gzip-compressed newline-delimited JSON: each line holds the
+raw result of a getUpdates call (before it is decoded), with when it was
+received. Replaying decodes them just as `BotAPI.get_updates` does, so decode
+and handler performance can be profiled on real traffic.
+
+Each line is compressed as a gzip member of its own, so that a recording is
+complete up to its last line even if the bot recording it is killed.
+"""
+import gzip
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import anyio
+
+from .api_types import Update
+from .datautil import from_json_like
+from .json_codec import STDLIB_JSON, JSONCodec
+
+
+class UpdateRecorder:
+    """Append the raw results of getUpdates to a recording.
+
+    Give it to `BotAPI.make` (as `update_recorder`) to record every update
+    fetched by `get_updates`, polling included.
+
+    Args:
+        file: The (uncompressed) file to append gzip members to.
+        json_codec: The JSON implementation to write updates with.
+        clock: What tells when updates are received, as a timestamp.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        json_codec: JSONCodec = STDLIB_JSON,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._file = file
+        self._json_codec = json_codec
+        self._clock = clock
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def make(
+        path: Union[str, Path], json_codec: JSONCodec = STDLIB_JSON
+    ) -> Iterator['UpdateRecorder']:
+        """Context manager for recording updates to a file.
+
+        Args:
+            path: The file to record to. If it exists, updates are appended to
+                  it, after dropping a last line that was cut short.
+            json_codec: The JSON implementation to write updates with.
+
+        Yields:
+            An UpdateRecorder object.
+        """
+        path = Path(path)
+
+        if path.exists():
+            with path.open('r+b') as f:
+                f.truncate(_complete_length(f))
+
+        with path.open('ab') as f:
+            yield UpdateRecorder(f, json_codec)
+
+    async def record(self, updates: List[Any]) -> None:
+        """Record the raw result of a getUpdates call.
+
+        Empty results are skipped. Each result is written and flushed as it
+        is recorded, in a worker thread, so that a bot that crashes loses none
+        of them.
+
+        Args:
+            updates: The updates, as JSON-like values.
+        """
+        if not updates:
+            return
+
+        line = {'time': self._clock(), 'updates': updates}
+        await anyio.to_thread.run_sync(self._write, line)
+
+    def _write(self, line: Any) -> None:
+        member = gzip.compress(self._json_codec.dumpb(line) + b'\n')
+
+        with self._write_lock:
+            self._file.write(member)
+            self._file.flush()
+
+
+_GZIP_WBITS = zlib.MAX_WBITS | 16
+_READ_SIZE = 65536
+
+
+def _members(f: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """Decompress the gzip members of a file, with the offset each one ends at.
+
+    Stops at the end of the file, or at a member that is cut short or corrupt.
+    """
+    end = 0
+    pending = b''
+
+    while True:
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        parts = []
+
+        while not decompressor.eof:
+            data = pending or f.read(_READ_SIZE)
+            pending = b''
+
+            if not data:
+                return
+
+            try:
+                parts.append(decompressor.decompress(data))
+            except zlib.error:
+                return
+
+            end += len(data) - len(decompressor.unused_data)
+
+        pending = decompressor.unused_data
+        yield end, b''.join(parts)
+
+
+def _complete_length(f: BinaryIO) -> int:
+    """How many bytes of a recording hold complete gzip members."""
+    end = 0
+
+    for end, _ in _members(f):
+        pass
+
+    return end
+
+
+def read_recording(
+    path: Union[str, Path], json_codec: JSONCodec = STDLIB_JSON
+) -> Iterator[Tuple[float, List[Any]]]:
+    """Read a recording, a getUpdates result at a time.
+
+    Args:
+        path: The file of the recording.
+        json_codec: The JSON implementation to read updates with.
+
+    Yields:
+        When each result was received (as a timestamp), and its updates as
+        JSON-like values. A last line that was cut short (e.g. by a crash
+        while recording it) is skipped.
+    """
+    with open(path, 'rb') as f:
+        for _, data in _members(f):
+            for line in data.splitlines():
+                if line.strip():
+                    entry = json_codec.loads(line)
+                    yield entry['time'], entry['updates']
+
+
+async def replay_updates(
+    path: Union[str, Path],
+    dispatch: Callable[[Update], Awaitable[Any]],
+    *,
+    speed: Optional[float] = 1.0,
+    lazy: bool = False,
+    json_codec: JSONCodec = STDLIB_JSON,
+) -> int:
+    """Feed the updates of a recording to a dispatcher.
+
+    Args:
+        path: The file of the recording.
+        dispatch: What takes each update (e.g. `Dispatcher.dispatch`).
+        speed: How many times faster than recorded the updates are fed. If
+               None, they are fed as fast as `dispatch` takes them.
+        lazy: Whether updates are decoded lazily (see
+              `roboto.datautil.from_json_like`), as with `BotAPI.make`'s
+              `lazy_updates`.
+        json_codec: The JSON implementation to read updates with.
+
+    Returns:
+        How many updates were fed.
+    """
+    count = 0
+    first_time = None
+    start = anyio.current_time()
+
+    for recorded_at, raw_updates in read_recording(path, json_codec):
+        if first_time is None:
+            first_time = recorded_at
+
+        if speed is not None:
+            await anyio.sleep_until(start + (recorded_at - first_time) / speed)
+
+        for update in from_json_like(List[Update], raw_updates, lazy=lazy):
+            await dispatch(update)
+            count += 1
+
+    return count
+
+
+__all__ = [
+    'UpdateRecorder',
+    'read_recording',
+    'replay_updates',
+]
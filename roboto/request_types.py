@@ -1,5 +1,4 @@
 """Types representing the bodies of API requests."""
-import json
 from dataclasses import dataclass
 from typing import Generic, List, Optional, TypeVar, Union, cast
 
@@ -24,6 +23,10 @@ from .api_types import (
     UserID,
 )
 from .datautil import to_json_like
+from .json_codec import STDLIB_JSON, JSONCodec
+from .profiling import stage
+from .slots import with_slots
+from .url import URL
 
 T = TypeVar('T')
 
@@ -32,19 +35,23 @@ class JSONSerialized(str, Generic[T]):
     """Strong type for the JSON serialized version of a type."""
 
 
-def json_serialize(value: T) -> JSONSerialized[T]:
+def json_serialize(value: T, codec: JSONCodec = STDLIB_JSON) -> JSONSerialized[T]:
     """Serialize value to its strong-typed JSON string type."""
-    return cast(JSONSerialized[T], json.dumps(to_json_like(value)))
+    with stage('json_serialize'):
+        return cast(JSONSerialized[T], codec.dumps(to_json_like(value)))
 
 
-def maybe_json_serialize(value: Optional[T]) -> Optional[JSONSerialized[T]]:
+def maybe_json_serialize(
+    value: Optional[T], codec: JSONCodec = STDLIB_JSON
+) -> Optional[JSONSerialized[T]]:
     """Serialize value to its strong-typed JSON string type."""
     if value is None:
         return None
 
-    return json_serialize(value)
+    return json_serialize(value, codec)
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetUpdatesRequest:
     """Parameters for getting updates for a bot."""
@@ -55,6 +62,29 @@ class GetUpdatesRequest:
     allowed_updates: Optional[List[str]] = None
 
 
+@with_slots
+@dataclass(frozen=True)
+class SetWebhookRequest:
+    """Parameters for setting a webhook."""
+
+    url: URL
+    certificate: Optional[InputFile] = None
+    ip_address: Optional[str] = None
+    max_connections: Optional[int] = None
+    allowed_updates: Optional[JSONSerialized[List[str]]] = None
+    drop_pending_updates: Optional[bool] = None
+    secret_token: Optional[str] = None
+
+
+@with_slots
+@dataclass(frozen=True)
+class DeleteWebhookRequest:
+    """Parameters for removing a webhook."""
+
+    drop_pending_updates: Optional[bool] = None
+
+
+@with_slots
 @dataclass(frozen=True)
 class SendMessageRequest:
     """Parameters for sending a message."""
@@ -68,6 +98,7 @@ class SendMessageRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class ForwardMessageRequest:
     """Parameters for forwarding a message."""
@@ -78,6 +109,7 @@ class ForwardMessageRequest:
     disable_notification: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendPhotoRequest:
     """Parameters for sending a photo."""
@@ -91,6 +123,7 @@ class SendPhotoRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendAudioRequest:
     """Parameters for sending an audio."""
@@ -108,6 +141,7 @@ class SendAudioRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendDocumentRequest:
     """Parameters for sending a document."""
@@ -122,6 +156,7 @@ class SendDocumentRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendVideoRequest:
     """Parameters for sending a video."""
@@ -140,6 +175,7 @@ class SendVideoRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendAnimationRequest:
     """Parameters for sending an animation."""
@@ -157,6 +193,7 @@ class SendAnimationRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendVoiceRequest:
     """Parameters for sending a voice note (OGG/OPUS audio)."""
@@ -171,6 +208,7 @@ class SendVoiceRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendVideoNoteRequest:
     """Parameters for sending a video note (rounded square mp4 videos)."""
@@ -185,6 +223,7 @@ class SendVideoNoteRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendMediaGroupRequest:
     """Parameters for sending a group of photos or videos as an album."""
@@ -195,6 +234,7 @@ class SendMediaGroupRequest:
     reply_to_message_id: Optional[MessageID] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendLocationRequest:
     """Parameters for sending a point on the map."""
@@ -208,6 +248,7 @@ class SendLocationRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditMessageLiveLocationRequest:
     """Parameters for editing a live location non-inline message."""
@@ -219,6 +260,7 @@ class EditMessageLiveLocationRequest:
     reply_markup: Optional[JSONSerialized[InlineKeyboardMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditInlineMessageLiveLocationRequest:
     """Parameters for editing a live location inline message."""
@@ -229,6 +271,7 @@ class EditInlineMessageLiveLocationRequest:
     reply_markup: Optional[JSONSerialized[InlineKeyboardMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class StopMessageLiveLocationRequest:
     """Parameters for stopping a live location non-inline message."""
@@ -238,6 +281,7 @@ class StopMessageLiveLocationRequest:
     reply_markup: Optional[JSONSerialized[InlineKeyboardMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class StopInlineMessageLiveLocationRequest:
     """Parameters for stopping a live location inline message."""
@@ -246,6 +290,7 @@ class StopInlineMessageLiveLocationRequest:
     reply_markup: Optional[JSONSerialized[InlineKeyboardMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendVenueRequest:
     """Parameters for sending information about a venue."""
@@ -262,6 +307,7 @@ class SendVenueRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendContactRequest:
     """Parameters for sending a phone contact."""
@@ -276,6 +322,7 @@ class SendContactRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendPollRequest:
     """Parameters for sending a native poll."""
@@ -297,6 +344,7 @@ class SendPollRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class StopPollRequest:
     """Parameters for stopping a poll sent by the bot."""
@@ -306,6 +354,7 @@ class StopPollRequest:
     reply_markup: Optional[JSONSerialized[InlineKeyboardMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendDiceRequest:
     """Parameters for sending a Dice."""
@@ -317,6 +366,7 @@ class SendDiceRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendChatActionRequest:
     """Parameters for sending a chat action."""
@@ -325,6 +375,7 @@ class SendChatActionRequest:
     action: ChatAction
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetUserProfilePhotosRequest:
     """Parameters for getting a list of user profile pictures."""
@@ -334,6 +385,7 @@ class GetUserProfilePhotosRequest:
     limit: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetFileRequest:
     """Parameters for getting information to download a file."""
@@ -341,6 +393,7 @@ class GetFileRequest:
     file_id: FileID
 
 
+@with_slots
 @dataclass(frozen=True)
 class KickChatMemberRequest:
     """Parameters for kicking a chat member."""
@@ -350,6 +403,7 @@ class KickChatMemberRequest:
     until_date: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class UnbanChatMemberRequest:
     """Parameters for unbanning a chat member."""
@@ -358,6 +412,7 @@ class UnbanChatMemberRequest:
     user_id: UserID
 
 
+@with_slots
 @dataclass(frozen=True)
 class RestrictChatMemberRequest:
     """Parameters for restricting permissions of a chat member."""
@@ -368,6 +423,7 @@ class RestrictChatMemberRequest:
     until_date: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class PromoteChatMemberRequest:
     """Parameters for promoting a chat member to administrator."""
@@ -384,6 +440,7 @@ class PromoteChatMemberRequest:
     can_promote_members: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetChatAdministratorCustomTitleRequest:
     """Parameters for setting an administrator's custom title."""
@@ -393,6 +450,7 @@ class SetChatAdministratorCustomTitleRequest:
     custom_title: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetChatPermissionsRequest:
     """Parameters for setting the default chat permissions."""
@@ -401,6 +459,7 @@ class SetChatPermissionsRequest:
     permissions: JSONSerialized[ChatPermissions]
 
 
+@with_slots
 @dataclass(frozen=True)
 class ExportChatInviteLinkRequest:
     """Parameters for exporting a chat's invite link."""
@@ -408,6 +467,7 @@ class ExportChatInviteLinkRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetChatPhotoRequest:
     """Parameters for setting a chat's photo."""
@@ -416,6 +476,7 @@ class SetChatPhotoRequest:
     photo: InputFile
 
 
+@with_slots
 @dataclass(frozen=True)
 class DeleteChatPhotoRequest:
     """Parameters for deleting a chat's photo."""
@@ -423,6 +484,7 @@ class DeleteChatPhotoRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetChatTitleRequest:
     """Parameters for setting a chat's title."""
@@ -431,6 +493,7 @@ class SetChatTitleRequest:
     title: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetChatDescriptionRequest:
     """Parameters for setting a chat's description."""
@@ -439,6 +502,7 @@ class SetChatDescriptionRequest:
     description: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class PinChatMessageRequest:
     """Parameters for pinning a message in a chat."""
@@ -448,6 +512,7 @@ class PinChatMessageRequest:
     disable_notification: Optional[bool] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class UnpinChatMessageRequest:
     """Parameters for unpinning the message from a chat."""
@@ -455,6 +520,7 @@ class UnpinChatMessageRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class LeaveChatRequest:
     """Parameters for leaving a chat."""
@@ -462,6 +528,7 @@ class LeaveChatRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetChatRequest:
     """Parameters for getting information about a chat."""
@@ -469,6 +536,7 @@ class GetChatRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetChatAdministratorsRequest:
     """Parameters for getting the administrators of a chat."""
@@ -476,6 +544,7 @@ class GetChatAdministratorsRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetChatMembersCountRequest:
     """Parameters for getting the number of members in a chat."""
@@ -483,6 +552,7 @@ class GetChatMembersCountRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetChatMemberRequest:
     """Parameters for getting information about a member in a chat."""
@@ -491,6 +561,7 @@ class GetChatMemberRequest:
     user_id: UserID
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetChatStickerSetRequest:
     """Parameters for setting the sticker set of a supergroup."""
@@ -499,6 +570,7 @@ class SetChatStickerSetRequest:
     sticker_set_name: str
 
 
+@with_slots
 @dataclass(frozen=True)
 class DeleteChatStickerSetRequest:
     """Parameters for deleting the sticker set of a supergroup."""
@@ -506,6 +578,7 @@ class DeleteChatStickerSetRequest:
     chat_id: Union[ChatID, str]
 
 
+@with_slots
 @dataclass(frozen=True)
 class AnswerCallbackQueryRequest:
     """Parameters for answering a callback query from an inline keyboard."""
@@ -517,6 +590,7 @@ class AnswerCallbackQueryRequest:
     cache_time: Optional[int] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class SetMyCommandsRequest:
     """Parameters for setting a bot's command list."""
@@ -524,6 +598,7 @@ class SetMyCommandsRequest:
     commands: JSONSerialized[List[BotCommand]]
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditMessageTextRequest:
     """Parameters for editing the text of a non-inline message."""
@@ -536,6 +611,7 @@ class EditMessageTextRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditInlineMessageTextRequest:
     """Parameters for editing the text of an inline message."""
@@ -547,6 +623,7 @@ class EditInlineMessageTextRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditMessageCaptionRequest:
     """Parameters for editing the caption of a non-inline message."""
@@ -558,6 +635,7 @@ class EditMessageCaptionRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditInlineMessageCaptionRequest:
     """Parameters for editing the caption of an inline message."""
@@ -568,6 +646,7 @@ class EditInlineMessageCaptionRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditMessageMediaRequest:
     """Parameters for editing the media of a non-inline message."""
@@ -578,6 +657,7 @@ class EditMessageMediaRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditInlineMessageMediaRequest:
     """Parameters for editing the media of an inline message."""
@@ -587,6 +667,7 @@ class EditInlineMessageMediaRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditMessageReplyMarkupRequest:
     """Parameters for editing the reply markup of a non-inline message."""
@@ -596,6 +677,7 @@ class EditMessageReplyMarkupRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class EditInlineMessageReplyMarkupRequest:
     """Parameters for editing the reply markup of an inline message."""
@@ -604,6 +686,7 @@ class EditInlineMessageReplyMarkupRequest:
     reply_markup: Optional[JSONSerialized[ReplyMarkup]] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class DeleteMessageRequest:
     """Parameters for deleting a message."""
@@ -612,6 +695,7 @@ class DeleteMessageRequest:
     message_id: MessageID
 
 
+@with_slots
 @dataclass(frozen=True)
 class SendStickerRequest:
     """Parameters for sending a sticker."""
@@ -623,6 +707,7 @@ class SendStickerRequest:
     reply_markup: Optional[ReplyMarkup] = None
 
 
+@with_slots
 @dataclass(frozen=True)
 class GetStickerSetRequest:
     """Parameters for getting a sticker set."""
@@ -0,0 +1,104 @@
+"""Policies for retrying failed Bot API requests."""
+import random
+from dataclasses import dataclass
+from typing import Optional, Tuple, Type
+
+from asks.errors import BadHttpResponse, RequestTimeout, ServerClosedConnectionError
+
+from .error import BotAPIError, TransportError
+
+NETWORK_ERRORS: Tuple[Type[Exception], ...] = (
+    OSError,
+    BadHttpResponse,
+    RequestTimeout,
+    ServerClosedConnectionError,
+    TransportError,
+)
+"""Exceptions that signal a failure to talk to the Bot API server."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Describe when and after how long failed requests are retried.
+
+    Flood control errors (429) are retried after the `retry_after` sent by
+    Telegram. Server errors (5xx) and network errors are retried with
+    exponential backoff and full jitter: the n-th retry waits a random time
+    between 0 and `min(max_delay, base_delay * 2 ** (n - 1))`. Requests about
+    groups that were migrated to supergroups are repeated for the supergroup.
+
+    Note that a request can reach Telegram even though a network error
+    happens while waiting for its response, so retrying network errors may
+    repeat side effects (e.g. send a message twice).
+
+    Args:
+        max_attempts: How many times a request is tried at most, including
+                      the first try.
+        base_delay: The backoff before the first retry, in seconds.
+        max_delay: The maximum backoff, in seconds.
+        max_retry_after: The longest `retry_after` that is waited for, in
+                         seconds. Flood control errors asking for longer
+                         waits are raised instead.
+        retry_server_errors: Whether to retry server errors.
+        retry_network_errors: Whether to retry network errors.
+        follow_migrations: Whether to repeat requests for the supergroup a
+                           group was migrated to.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    max_retry_after: float = 60.0
+    retry_server_errors: bool = True
+    retry_network_errors: bool = True
+    follow_migrations: bool = True
+
+    def backoff(self, attempt: int) -> float:
+        """Get a jittered backoff delay.
+
+        Args:
+            attempt: How many tries failed so far (starting at 1).
+
+        Returns:
+            How long to wait before the next try, in seconds.
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    def delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Decide if and when a failed request is retried.
+
+        Args:
+            error: What made the request fail.
+            attempt: How many tries failed so far (starting at 1).
+
+        Returns:
+            How long to wait before retrying, in seconds, or None if the
+            request must not be retried.
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        if isinstance(error, BotAPIError):
+            if error.retry_after is not None:
+                if error.retry_after > self.max_retry_after:
+                    return None
+
+                return error.retry_after
+
+            if self.retry_server_errors and error.error_code >= 500:
+                return self.backoff(attempt)
+
+            return None
+
+        if self.retry_network_errors and isinstance(error, NETWORK_ERRORS):
+            return self.backoff(attempt)
+
+        return None
+
+
+__all__ = [
+    'NETWORK_ERRORS',
+    'RetryPolicy',
+]
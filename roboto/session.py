@@ -0,0 +1,116 @@
+"""HTTP sessions with tuned connection pools for talking to the Bot API."""
+from dataclasses import dataclass
+from typing import Optional
+
+import anyio
+from asks import Session
+
+
+@dataclass(frozen=True)
+class ConnectionOptions:
+    """How connections to the Bot API are made and kept.
+
+    Args:
+        connections: How many connections are open (and requests in flight) at
+                     most.
+        long_poll_connections: How many connections are kept apart for
+                               long polling `getUpdates`, so that it never
+                               holds up other requests. If 0, `getUpdates`
+                               shares the other connections.
+        connect_timeout: How long connecting may take, in seconds.
+        read_timeout: How long a request may take once connected (sending it
+                      included, so large uploads on slow links need more), in
+                      seconds. Long polling `getUpdates` may take its timeout
+                      on top of it. If None, requests may take forever.
+        keep_alive: Whether connections are reused between requests.
+        idle_timeout: How long connections are kept once no request is in
+                      flight before being closed, in seconds. If None, they
+                      are kept until the server closes them.
+    """
+
+    connections: int = 16
+    long_poll_connections: int = 1
+    connect_timeout: float = 10
+    read_timeout: Optional[float] = 60
+    keep_alive: bool = True
+    idle_timeout: Optional[float] = 30
+
+
+class PooledSession(Session):
+    """An `asks.Session` with timeouts, keep-alive and idle connection reaping.
+
+    Only public asks APIs are used, so idle connections are reaped when the
+    whole session has been idle: once no request has been in flight for the
+    idle timeout, the next request closes the pooled connections first.
+
+    Args:
+        base_location: The scheme and host of the Bot API.
+        endpoint: The path every request path is relative to.
+        options: How connections are made and kept.
+        connections: How many connections are open at most. Defaults to
+                     `options.connections`.
+    """
+
+    def __init__(
+        self,
+        base_location: str,
+        endpoint: str,
+        options: ConnectionOptions = ConnectionOptions(),
+        connections: Optional[int] = None,
+    ):
+        if connections is None:
+            connections = options.connections
+
+        super().__init__(
+            base_location=base_location,
+            endpoint=endpoint,
+            # asks asks servers to close connections unless told otherwise.
+            headers={'Connection': 'keep-alive' if options.keep_alive else 'close'},
+            connections=connections,
+        )
+        self.options = options
+        self._in_flight = 0
+        self._idle_since: Optional[float] = None
+
+    def long_poll_timeout(self, long_poll: float) -> Optional[float]:
+        """The read timeout of a request that long polls for `long_poll`."""
+        read_timeout = self.options.read_timeout
+
+        return None if read_timeout is None else read_timeout + long_poll
+
+    async def request(self, method, url=None, *, path='', **kwargs):
+        kwargs.setdefault('connection_timeout', self.options.connect_timeout)
+
+        if self.options.read_timeout is not None:
+            kwargs.setdefault('timeout', self.options.read_timeout)
+
+        await self._reap_idle_connections()
+        self._in_flight += 1
+
+        try:
+            return await super().request(method, url, path=path, **kwargs)
+        finally:
+            self._in_flight -= 1
+
+            if not self._in_flight:
+                self._idle_since = anyio.current_time()
+
+    async def _reap_idle_connections(self) -> None:
+        idle_timeout = self.options.idle_timeout
+        idle_since = self._idle_since
+
+        if idle_timeout is None or self._in_flight or idle_since is None:
+            return
+
+        if anyio.current_time() - idle_since >= idle_timeout:
+            # Every pooled connection has been unused since then. Closing a
+            # session only closes its pooled connections, so it can be used
+            # again right away.
+            self._idle_since = None
+            await self.close()
+
+
+__all__ = [
+    'ConnectionOptions',
+    'PooledSession',
+]
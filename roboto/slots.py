@@ -0,0 +1,87 @@
+"""Compact (`__slots__`-based) dataclasses."""
+from dataclasses import MISSING, FrozenInstanceError, fields, is_dataclass
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+T = TypeVar('T')
+
+
+def _slotted_names(cls: type) -> Tuple[str, ...]:
+    names: List[str] = []
+
+    for base in cls.__mro__[1:]:
+        slots = base.__dict__.get('__slots__', ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+
+    return tuple(names)
+
+
+def _frozen_setattr(self, name: str, value: Any) -> None:
+    raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+
+def _frozen_delattr(self, name: str) -> None:
+    raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+
+def with_slots(cls: Type[T]) -> Type[T]:
+    """Recreate a dataclass so its instances store fields in `__slots__`.
+
+    Instances of the new class have no `__dict__`, which makes them
+    considerably smaller. Must be applied on top of `@dataclass`. Fields
+    already stored in the slots of a base class are not slotted again, and
+    dataclasses used as mixins in multiple inheritance should declare
+    `__slots__ = ()` themselves, leaving their fields to the concrete class.
+
+    This is a stand-in for `@dataclass(slots=True)`, which is only available
+    from Python 3.10 on.
+
+    Args:
+        cls: A dataclass type.
+
+    Returns:
+        An equivalent dataclass type that uses `__slots__`.
+    """
+    if not is_dataclass(cls):
+        raise TypeError(f'{cls.__name__} is not a dataclass.')
+
+    inherited = _slotted_names(cls)
+    # Fields that are not passed to __init__ keep their default as a class
+    # attribute, since __init__ never assigns them.
+    stored = tuple(
+        f.name for f in fields(cls) if f.init or f.default_factory is not MISSING
+    )
+    names = tuple(name for name in stored if name not in inherited)
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in stored)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(stored, state):
+            object.__setattr__(self, name, value)
+
+    namespace: Dict[str, Any] = {
+        k: v for k, v in cls.__dict__.items() if k not in names
+    }
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = names
+    namespace['__qualname__'] = cls.__qualname__
+    namespace['__getstate__'] = __getstate__
+    namespace['__setstate__'] = __setstate__
+
+    if cls.__dataclass_params__.frozen:  # type: ignore
+        namespace['__setattr__'] = _frozen_setattr
+        namespace['__delattr__'] = _frozen_delattr
+
+    metaclass: Any = type(cls)
+
+    return metaclass(cls.__name__, cls.__bases__, namespace)
+
+
+def field_values(obj: Any) -> Dict[str, Any]:
+    """Get a shallow mapping of field names to values from a dataclass object.
+
+    Unlike `dataclasses.asdict`, values are not recursively converted, and
+    unlike `vars`, this also works for objects without a `__dict__`.
+    """
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
@@ -0,0 +1,585 @@
+"""A fake Bot API server, for testing and load testing bots offline.
+
+This module needs `trio` (install roboto with the `trio` extra).
+"""
+import random
+import time
+from contextlib import asynccontextmanager
+from email.parser import BytesParser
+from email.policy import HTTP
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Counter,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import parse_qsl, unquote, urlsplit
+from uuid import uuid4
+
+import h11
+import trio
+
+from .h11_util import CONNECTION_ERRORS, next_event, respond
+from .json_codec import STDLIB_JSON, JSONCodec
+from .url import URL
+
+BOT_USER = {
+    'id': 1,
+    'is_bot': True,
+    'first_name': 'Fake Bot',
+    'username': 'fake_bot',
+    'can_join_groups': True,
+    'can_read_all_group_messages': False,
+    'supports_inline_queries': False,
+}
+"""The user of the bot, as answered by `getMe`."""
+
+
+class _APIError(Exception):
+    """Signal that a method call must be answered with a Bot API error."""
+
+    def __init__(
+        self, error_code: int, description: str, retry_after: Optional[int] = None
+    ):
+        super().__init__(error_code, description)
+        self.error_code = error_code
+        self.description = description
+        self.retry_after = retry_after
+
+    def json(self) -> Dict[str, Any]:
+        error: Dict[str, Any] = {
+            'ok': False,
+            'error_code': self.error_code,
+            'description': self.description,
+        }
+
+        if self.retry_after is not None:
+            error['parameters'] = {'retry_after': self.retry_after}
+
+        return error
+
+
+def _flood_control(retry_after: int) -> _APIError:
+    return _APIError(429, f'Too Many Requests: retry after {retry_after}', retry_after)
+
+
+class _Upload:
+    """A file sent in a multipart/form-data body."""
+
+    def __init__(self, contents: bytes, filename: Optional[str]):
+        self.contents = contents
+        self.filename = filename
+
+
+def _parse_form(content_type: bytes, body: bytes) -> Dict[str, Any]:
+    message = BytesParser(policy=HTTP).parsebytes(
+        b'Content-Type: ' + content_type + b'\r\n\r\n' + body
+    )
+    form: Dict[str, Any] = {}
+
+    parts: Any = message.iter_parts()  # type: ignore
+
+    for part in parts:
+        name = part.get_param('name', header='content-disposition')
+        contents = part.get_payload(decode=True)
+
+        if part.get_filename() is None and part.get_content_type() == 'text/plain':
+            form[name] = contents.decode()
+        else:
+            form[name] = _Upload(contents, part.get_filename())
+
+    return form
+
+
+def _parse_range(header: bytes, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a `Range: bytes=start-[end]` header into a slice of the file."""
+    unit, _, byte_range = header.decode('ascii').partition('=')
+    start, _, last = byte_range.partition('-')
+
+    if unit.strip() != 'bytes' or not start.isdigit():
+        return None
+
+    end = size if not last else min(int(last) + 1, size)
+
+    return int(start), end
+
+
+class FakeBotAPI:
+    """A local server answering requests as the Bot API would.
+
+    It implements `getMe`, `getUpdates` (with long polling), `sendMessage`,
+    `sendPhoto`, `sendDocument`, `sendMediaGroup`, `getFile` and file
+    downloads (with ranges), keeping everything in memory. Every other method
+    is answered with a 404 error, as Telegram does for unknown methods. Each
+    response can be delayed to stand in for the round trip to Telegram, and
+    flood control errors (429) can be injected, so that bots can be load
+    tested end to end.
+
+    Point a bot to it with `BotAPI.make(token, api_url=fake.api_url)`.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`, which runs the server.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        host: str,
+        json_codec: JSONCodec,
+        latency: float,
+        flood_rate: float,
+        retry_after: int,
+        seed: Optional[int],
+    ):
+        self.token = token
+        self.host = host
+        self.json_codec = json_codec
+        self.latency = latency
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.requests: Counter[str] = Counter()
+        self.sent_messages: List[Dict[str, Any]] = []
+        self.files: Dict[str, bytes] = {}
+        self.port: Optional[int] = None
+        self._random = random.Random(seed)
+        self._injected_errors: List[Tuple[Optional[str], _APIError]] = []
+        self._updates: List[Dict[str, Any]] = []
+        self._new_updates = trio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._file_ids: Dict[str, str] = {}
+        self._methods: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            '/getMe': self._get_me,
+            '/getUpdates': self._get_updates,
+            '/sendMessage': self._send_message,
+            '/sendPhoto': partial(self._send_media, 'photo'),
+            '/sendDocument': partial(self._send_media, 'document'),
+            '/sendMediaGroup': self._send_media_group,
+            '/getFile': self._get_file,
+        }
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        token: str = 'token',
+        *,
+        port: int = 0,
+        host: str = '127.0.0.1',
+        json_codec: JSONCodec = STDLIB_JSON,
+        latency: float = 0.0,
+        flood_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ) -> AsyncIterator['FakeBotAPI']:
+        """Context manager for running a FakeBotAPI.
+
+        Args:
+            token: The token that bots must use.
+            port: The port to listen on. 0 picks a free port.
+            host: The host to listen on.
+            json_codec: The JSON implementation for request and response
+                        bodies.
+            latency: How long each response is delayed, in seconds (long
+                     polling waits on top of that).
+            flood_rate: The probability of answering any request with a flood
+                        control error (429).
+            retry_after: The `retry_after` of random flood control errors.
+            seed: The seed of the random flood control errors.
+
+        Yields:
+            A FakeBotAPI object.
+        """
+        fake = FakeBotAPI(
+            token, host, json_codec, latency, flood_rate, retry_after, seed
+        )
+
+        async with trio.open_nursery() as nursery:
+            listeners = await nursery.start(
+                partial(trio.serve_tcp, fake.handle_connection, port, host=host)
+            )
+            fake.port = listeners[0].socket.getsockname()[1]
+            yield fake
+            nursery.cancel_scope.cancel()
+
+    @property
+    def api_url(self) -> URL:
+        """The URL to give to `BotAPI.make` as `api_url`."""
+        return URL.make(f'http://{self.host}:{self.port}')
+
+    def add_update(self, update: Dict[str, Any]) -> int:
+        """Make an update available to `getUpdates`.
+
+        Args:
+            update: The update, as JSON. Its `update_id` is filled in.
+
+        Returns:
+            The id of the update.
+        """
+        update_id = self._next_update_id
+        self._next_update_id += 1
+        self._updates.append({**update, 'update_id': update_id})
+        self._new_updates.set()
+        self._new_updates = trio.Event()
+
+        return update_id
+
+    def add_text_message(
+        self, chat_id: int, text: str, from_user: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Make an update for a text message sent to the bot.
+
+        Args:
+            chat_id: The chat the message is sent in.
+            text: The text of the message.
+            from_user: Who sent the message, as JSON. A user with the id of
+                       the chat by default.
+
+        Returns:
+            The id of the update.
+        """
+        message = self._message(chat_id, text=text)
+        message['from'] = from_user or {
+            'id': abs(chat_id),
+            'is_bot': False,
+            'first_name': 'User',
+        }
+
+        return self.add_update({'message': message})
+
+    def add_file(self, contents: bytes) -> str:
+        """Store a file, as if it was sent to Telegram.
+
+        Returns:
+            The file id of the file.
+        """
+        file_id = f'file-{uuid4().hex}'
+        self.files[file_id] = contents
+
+        return file_id
+
+    def inject_error(
+        self,
+        error_code: int = 429,
+        description: Optional[str] = None,
+        count: int = 1,
+        api_method: Optional[str] = None,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        """Answer the next requests with an error.
+
+        Args:
+            error_code: The error code. 429 (flood control) by default.
+            description: The description of the error.
+            count: How many requests are answered with the error.
+            api_method: The API method (e.g. '/sendMessage') whose requests
+                        are answered with the error. If None, any request is.
+            retry_after: For flood control errors, how long to wait before
+                         retrying, in seconds. 1 by default.
+        """
+        if error_code == 429:
+            error = _flood_control(1 if retry_after is None else retry_after)
+        else:
+            error = _APIError(error_code, description or f'Error {error_code}')
+
+        self._injected_errors.extend([(api_method, error)] * count)
+
+    async def handle_connection(self, stream: trio.abc.Stream) -> None:
+        """Serve HTTP requests from a connection until it is closed.
+
+        Args:
+            stream: A stream connected to a client.
+        """
+        connection = h11.Connection(h11.SERVER)
+
+        async with stream:
+            try:
+                while True:
+                    event = await next_event(connection, stream)
+
+                    if not isinstance(event, h11.Request):
+                        return
+
+                    body = await _read_body(connection, stream)
+                    await self._handle_request(connection, stream, event, body)
+
+                    if connection.our_state is not h11.DONE:
+                        return
+
+                    connection.start_next_cycle()
+            except (h11.ProtocolError, *CONNECTION_ERRORS):
+                return
+
+    async def _handle_request(
+        self,
+        connection: h11.Connection,
+        stream: trio.abc.Stream,
+        request: h11.Request,
+        body: bytes,
+    ) -> None:
+        target = urlsplit(request.target.decode('ascii'))
+        file_prefix = f'/file/bot{self.token}/'
+        api_prefix = f'/bot{self.token}/'
+
+        await trio.sleep(self.latency)
+
+        if target.path.startswith(file_prefix):
+            file_path = unquote(target.path[len(file_prefix) :])
+            await self._download(connection, stream, request, file_path)
+            return
+
+        if not target.path.startswith(api_prefix):
+            error = _APIError(404, 'Not Found')
+            await _respond_json(connection, stream, 404, self._dumps(error.json()))
+            return
+
+        api_method = '/' + target.path[len(api_prefix) :]
+        self.requests[api_method] += 1
+
+        try:
+            arguments = self._arguments(request, target.query, body)
+            result = await self._call(api_method, arguments)
+        except _APIError as e:
+            await _respond_json(connection, stream, e.error_code, self._dumps(e.json()))
+            return
+
+        await _respond_json(
+            connection, stream, 200, self._dumps({'ok': True, 'result': result})
+        )
+
+    def _dumps(self, value: Any) -> bytes:
+        return self.json_codec.dumpb(value)
+
+    def _arguments(
+        self, request: h11.Request, query: str, body: bytes
+    ) -> Dict[str, Any]:
+        arguments: Dict[str, Any] = dict(parse_qsl(query))
+
+        if not body:
+            return arguments
+
+        content_type = dict(request.headers).get(b'content-type', b'')
+
+        if content_type.startswith(b'application/json'):
+            try:
+                arguments.update(self.json_codec.loads(body))
+            except ValueError:
+                raise _APIError(400, 'Bad Request: can\'t parse JSON') from None
+        elif content_type.startswith(b'multipart/form-data'):
+            arguments.update(_parse_form(content_type, body))
+
+        return arguments
+
+    async def _call(self, api_method: str, arguments: Dict[str, Any]) -> Any:
+        for i, (method, error) in enumerate(self._injected_errors):
+            if method is None or method == api_method:
+                del self._injected_errors[i]
+                raise error
+
+        if self.flood_rate and self._random.random() < self.flood_rate:
+            raise _flood_control(self.retry_after)
+
+        method_handler = self._methods.get(api_method)
+
+        if method_handler is None:
+            raise _APIError(404, 'Not Found: method not found')
+
+        return await method_handler(arguments)
+
+    async def _get_me(self, arguments: Dict[str, Any]) -> Any:
+        return BOT_USER
+
+    async def _get_updates(self, arguments: Dict[str, Any]) -> Any:
+        offset = int(arguments.get('offset', 0))
+        limit = int(arguments.get('limit', 100))
+        timeout = float(arguments.get('timeout', 0))
+
+        # As with Telegram, asking for an offset confirms the updates before it.
+        self._updates = [u for u in self._updates if u['update_id'] >= offset]
+
+        if not self._updates and timeout > 0:
+            with trio.move_on_after(timeout):
+                await self._new_updates.wait()
+
+        return self._updates[:limit]
+
+    def _message(self, chat_id: int, **fields: Any) -> Dict[str, Any]:
+        message_id = self._next_message_id
+        self._next_message_id += 1
+
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+            **fields,
+        }
+
+    def _sent_message(self, arguments: Dict[str, Any], **fields: Any) -> Any:
+        try:
+            chat_id = int(arguments['chat_id'])
+        except (KeyError, ValueError):
+            raise _APIError(400, 'Bad Request: chat not found') from None
+
+        message = self._message(chat_id, **fields)
+        message['from'] = BOT_USER
+        self.sent_messages.append(message)
+
+        return message
+
+    async def _send_message(self, arguments: Dict[str, Any]) -> Any:
+        text = arguments.get('text')
+
+        if not text:
+            raise _APIError(400, 'Bad Request: message text is empty')
+
+        return self._sent_message(arguments, text=text)
+
+    def _input_file(self, arguments: Dict[str, Any], value: Any) -> str:
+        """Get the file id of a file given as an upload, an attachment of the
+        request or a file id.
+        """
+        if isinstance(value, str) and value.startswith('attach://'):
+            value = arguments.get(value[len('attach://') :])
+
+        if isinstance(value, _Upload):
+            return self.add_file(value.contents)
+
+        if isinstance(value, str) and value in self.files:
+            return value
+
+        raise _APIError(400, 'Bad Request: wrong file identifier/HTTP URL specified')
+
+    def _file_json(self, file_id: str) -> Dict[str, Any]:
+        return {
+            'file_id': file_id,
+            'file_unique_id': file_id[len('file-') :],
+            'file_size': len(self.files[file_id]),
+        }
+
+    def _media_fields(self, media_type: str, file_id: str) -> Dict[str, Any]:
+        # Images and videos are not decoded, so their dimensions are unknown.
+        file_json = self._file_json(file_id)
+
+        if media_type == 'photo':
+            return {'photo': [{**file_json, 'width': 0, 'height': 0}]}
+
+        if media_type == 'video':
+            return {'video': {**file_json, 'width': 0, 'height': 0, 'duration': 0}}
+
+        if media_type == 'audio':
+            return {'audio': {**file_json, 'duration': 0}}
+
+        if media_type == 'document':
+            return {'document': file_json}
+
+        raise _APIError(400, f'Bad Request: unsupported media type "{media_type}"')
+
+    async def _send_media(self, media_type: str, arguments: Dict[str, Any]) -> Any:
+        fields = self._media_fields(
+            media_type, self._input_file(arguments, arguments.get(media_type))
+        )
+
+        if arguments.get('caption'):
+            fields['caption'] = arguments['caption']
+
+        return self._sent_message(arguments, **fields)
+
+    async def _send_media_group(self, arguments: Dict[str, Any]) -> Any:
+        try:
+            media = self.json_codec.loads(arguments['media'])
+        except (KeyError, ValueError):
+            raise _APIError(400, 'Bad Request: can\'t parse media JSON') from None
+
+        if not 2 <= len(media) <= 10:
+            raise _APIError(400, 'Bad Request: wrong number of media specified')
+
+        media_group_id = uuid4().hex
+        messages = []
+
+        for input_media in media:
+            file_id = self._input_file(arguments, input_media.get('media'))
+            fields = self._media_fields(input_media.get('type'), file_id)
+
+            if input_media.get('caption'):
+                fields['caption'] = input_media['caption']
+
+            messages.append(
+                self._sent_message(arguments, media_group_id=media_group_id, **fields)
+            )
+
+        return messages
+
+    async def _get_file(self, arguments: Dict[str, Any]) -> Any:
+        file_id = arguments.get('file_id')
+
+        if file_id not in self.files:
+            raise _APIError(400, 'Bad Request: invalid file_id')
+
+        file_path = f'documents/{file_id}'
+        self._file_ids[file_path] = file_id
+
+        return {**self._file_json(file_id), 'file_path': file_path}
+
+    async def _download(
+        self,
+        connection: h11.Connection,
+        stream: trio.abc.Stream,
+        request: h11.Request,
+        file_path: str,
+    ) -> None:
+        file_id = self._file_ids.get(file_path)
+
+        if file_id is None:
+            await respond(connection, stream, 404)
+            return
+
+        contents = self.files[file_id]
+        range_header = dict(request.headers).get(b'range')
+        byte_range = (
+            None if range_header is None else _parse_range(range_header, len(contents))
+        )
+
+        if byte_range is None:
+            await respond(connection, stream, 200, contents)
+            return
+
+        start, end = byte_range
+
+        if start >= len(contents):
+            await respond(connection, stream, 416)
+            return
+
+        content_range = ('content-range', f'bytes {start}-{end - 1}/{len(contents)}')
+        await respond(connection, stream, 206, contents[start:end], [content_range])
+
+
+async def _read_body(connection: h11.Connection, stream: trio.abc.Stream) -> bytes:
+    chunks: List[bytes] = []
+
+    while True:
+        event = await next_event(connection, stream)
+
+        if isinstance(event, h11.EndOfMessage):
+            return b''.join(chunks)
+
+        if isinstance(event, h11.Data):
+            chunks.append(event.data)
+
+
+async def _respond_json(
+    connection: h11.Connection, stream: trio.abc.Stream, status_code: int, body: bytes
+) -> None:
+    await respond(
+        connection, stream, status_code, body, [('content-type', 'application/json')]
+    )
+
+
+__all__ = [
+    'BOT_USER',
+    'FakeBotAPI',
+]
@@ -0,0 +1,227 @@
+"""HTTP transports, through which requests are sent to the Bot API."""
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from asks import Session
+from typing_extensions import Protocol
+
+from .multipart import MultipartBody
+from .profiling import stage
+from .session import ConnectionOptions, PooledSession
+
+
+class HTTPResponse(Protocol):
+    """A response, with its whole body read."""
+
+    @property
+    def status_code(self) -> int:
+        """The HTTP status code."""
+
+    @property
+    def reason_phrase(self) -> str:
+        """The HTTP reason phrase."""
+
+    @property
+    def content(self) -> bytes:
+        """The body."""
+
+
+@dataclass(frozen=True)
+class Download:
+    """A response whose body is read as it is downloaded.
+
+    Args:
+        status_code: The HTTP status code.
+        reason_phrase: The HTTP reason phrase.
+        chunks: The body, a chunk at a time.
+    """
+
+    status_code: int
+    reason_phrase: str
+    chunks: AsyncIterator[bytes]
+
+
+class Transport(Protocol):
+    """How requests are sent to the Bot API.
+
+    Network errors must be raised as one of `roboto.retry.NETWORK_ERRORS`.
+    """
+
+    async def json_request(
+        self,
+        method: str,
+        api_method: str,
+        body: Optional[bytes] = None,
+        long_poll: Optional[float] = None,
+    ) -> HTTPResponse:
+        """Call an API method with a JSON body.
+
+        Args:
+            method: The HTTP method.
+            api_method: The API method (e.g. '/sendMessage').
+            body: The encoded JSON body, if any.
+            long_poll: If not None, the request long polls (`getUpdates`) for
+                       that many seconds, so it may take as much longer.
+        """
+
+    async def multipart_request(
+        self, method: str, api_method: str, body: MultipartBody
+    ) -> HTTPResponse:
+        """Call an API method with a multipart/form-data body.
+
+        Args:
+            method: The HTTP method.
+            api_method: The API method (e.g. '/sendPhoto').
+            body: The body.
+        """
+
+    def download(
+        self, file_path: str, headers: Mapping[str, str]
+    ) -> AsyncContextManager[Download]:
+        """Context manager for downloading a file, a chunk at a time.
+
+        Args:
+            file_path: The path of the file, from `getFile`.
+            headers: Additional request headers (e.g. `Range`).
+        """
+
+
+TransportFactory = Callable[
+    [str, str, ConnectionOptions], AsyncContextManager[Transport]
+]
+"""What makes a transport, from the Bot API URL, the bot token and the
+connection options (e.g. `AsksTransport.make`)."""
+
+
+@dataclass(frozen=True)
+class AsksTransport:
+    """Send requests through `asks` sessions.
+
+    Args:
+        session: An `asks.Session` object with the correct `base_location` and
+                 `endpoint` set up.
+        long_poll_session: The session for long polling, so that it doesn't
+                           hold up the connections of other requests. If None,
+                           `session` is used.
+    """
+
+    session: Session
+    long_poll_session: Optional[Session] = None
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        api_url: str, token: str, options: ConnectionOptions = ConnectionOptions()
+    ) -> AsyncIterator['AsksTransport']:
+        """Context manager for creating an AsksTransport object.
+
+        Args:
+            api_url: The Telegram Bot API URL.
+            token: The Telegram Bot API token for the bot.
+            options: How connections are made and kept.
+
+        Yields:
+            An AsksTransport object.
+        """
+        endpoint = f'/bot{token}'
+
+        async with AsyncExitStack() as stack:
+            session = await stack.enter_async_context(
+                PooledSession(api_url, endpoint, options)
+            )
+            long_poll_session = None
+
+            if options.long_poll_connections > 0:
+                long_poll_session = await stack.enter_async_context(
+                    PooledSession(
+                        api_url, endpoint, options, options.long_poll_connections
+                    )
+                )
+
+            yield AsksTransport(session, long_poll_session)
+
+    def _long_poll(self, long_poll: Optional[float]) -> Tuple[Session, Dict[str, Any]]:
+        if long_poll is None:
+            return self.session, {}
+
+        session = self.long_poll_session or self.session
+        long_poll_timeout = getattr(session, 'long_poll_timeout', None)
+
+        if not long_poll or long_poll_timeout is None:
+            return session, {}
+
+        # The read timeout of the session would cut long polling short.
+        return session, {'timeout': long_poll_timeout(long_poll)}
+
+    async def json_request(
+        self,
+        method: str,
+        api_method: str,
+        body: Optional[bytes] = None,
+        long_poll: Optional[float] = None,
+    ) -> HTTPResponse:
+        session, kwargs = self._long_poll(long_poll)
+
+        if body is None:
+            return await session.request(method, path=api_method, **kwargs)
+
+        return await session.request(
+            method,
+            path=api_method,
+            data=body,
+            headers={'Content-Type': 'application/json'},
+            **kwargs,
+        )
+
+    async def multipart_request(
+        self, method: str, api_method: str, body: MultipartBody
+    ) -> HTTPResponse:
+        # asks can't stream request bodies: the whole body is held in memory
+        # while it's sent.
+        with stage('multipart'):
+            data = await body.read()
+
+        return await self.session.request(
+            method,
+            path=api_method,
+            data=data,
+            headers={'Content-Type': body.content_type},
+        )
+
+    @asynccontextmanager
+    async def download(
+        self, file_path: str, headers: Mapping[str, str]
+    ) -> AsyncIterator[Download]:
+        session = self.session
+        response = await session.request(
+            'get',
+            url=f'{session.base_location}/file{session.endpoint}/{file_path}',
+            headers=dict(headers),
+            stream=True,
+        )
+
+        async with response.body:
+            yield Download(
+                response.status_code,
+                response.reason_phrase,
+                response.body.__aiter__(),
+            )
+
+
+__all__ = [
+    'AsksTransport',
+    'Download',
+    'HTTPResponse',
+    'Transport',
+    'TransportFactory',
+]
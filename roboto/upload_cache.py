@@ -0,0 +1,305 @@
+"""Reuse the file ids of uploaded files instead of uploading them again."""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
+
+import anyio
+from typing_extensions import Protocol
+
+from .api_types import FileDescription, FileID, InputFile, Message
+from .error import BotAPIError
+from .multipart import InMemorySource
+
+_CHUNK_SIZE = 1 << 16
+
+
+class UploadCacheStore(Protocol):
+    """Storage for the file ids of uploaded files, by cache key.
+
+    Stores are used from worker threads, one thread at a time.
+    """
+
+    def get(self, key: str) -> Optional[FileID]:
+        """Get the file id for a key, if known."""
+
+    def set(self, key: str, file_id: FileID) -> None:
+        """Remember the file id for a key."""
+
+    def delete(self, key: str) -> None:
+        """Forget the file id for a key, if known."""
+
+
+class MemoryUploadCacheStore:
+    """Keep file ids in memory, evicting the least recently used ones.
+
+    Args:
+        max_size: How many file ids are kept at most.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._file_ids: 'OrderedDict[str, FileID]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[FileID]:
+        file_id = self._file_ids.get(key)
+
+        if file_id is not None:
+            self._file_ids.move_to_end(key)
+
+        return file_id
+
+    def set(self, key: str, file_id: FileID) -> None:
+        self._file_ids[key] = file_id
+        self._file_ids.move_to_end(key)
+
+        while len(self._file_ids) > self.max_size:
+            self._file_ids.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._file_ids.pop(key, None)
+
+
+class SQLiteUploadCacheStore:
+    """Keep file ids in an SQLite database, evicting the least recently used.
+
+    Args:
+        path: The database file. It is created if needed.
+        max_size: How many file ids are kept at most.
+    """
+
+    def __init__(self, path: Union[str, Path], max_size: int = 100_000):
+        self.max_size = max_size
+        self._connection = sqlite3.connect(
+            str(path), isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS upload_cache ('
+            'key TEXT PRIMARY KEY, file_id TEXT NOT NULL, used REAL NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS upload_cache_used ON upload_cache (used)'
+        )
+
+    def get(self, key: str) -> Optional[FileID]:
+        row = self._connection.execute(
+            'SELECT file_id FROM upload_cache WHERE key = ?', (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self._connection.execute(
+            'UPDATE upload_cache SET used = ? WHERE key = ?', (time.time(), key)
+        )
+
+        return FileID(row[0])
+
+    def set(self, key: str, file_id: FileID) -> None:
+        self._connection.execute(
+            'INSERT OR REPLACE INTO upload_cache VALUES (?, ?, ?)',
+            (key, file_id, time.time()),
+        )
+        self._connection.execute(
+            'DELETE FROM upload_cache WHERE key IN ('
+            'SELECT key FROM upload_cache ORDER BY used DESC LIMIT -1 OFFSET ?)',
+            (self.max_size,),
+        )
+
+    def delete(self, key: str) -> None:
+        self._connection.execute('DELETE FROM upload_cache WHERE key = ?', (key,))
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+
+def _hash_stream(stream: BinaryIO) -> Optional[str]:
+    if not stream.seekable():
+        return None
+
+    start = stream.tell()
+    digest = hashlib.sha256()
+
+    for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b''):
+        digest.update(chunk)
+
+    stream.seek(start)
+
+    return digest.hexdigest()
+
+
+def _hash_path(path: Path) -> str:
+    with path.open('rb') as f:
+        digest = _hash_stream(f)
+
+    assert digest is not None
+
+    return digest
+
+
+def _content_hash(source: Union[Path, BinaryIO, InMemorySource]) -> Optional[str]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+
+    if isinstance(source, Path):
+        return _hash_path(source)
+
+    return _hash_stream(source)
+
+
+_FILE_ID_ERRORS = ('file identifier', 'file reference', 'file_reference')
+
+
+def is_file_id_error(error: BotAPIError) -> bool:
+    """Check whether Telegram refused a request because of its file id.
+
+    That happens when the file id is wrong or expired (e.g. "Bad Request:
+    wrong file identifier/HTTP URL specified" or "Bad Request: file reference
+    expired"), but not for errors unrelated to the file, such as "Bad
+    Request: chat not found".
+    """
+    description = error.description.lower()
+
+    return error.error_code == 400 and any(e in description for e in _FILE_ID_ERRORS)
+
+
+def uploaded_file_id(message: Message, kind: str) -> Optional[FileID]:
+    """Get the file id of the file sent in a message.
+
+    Args:
+        message: A message sent by the bot.
+        kind: The kind of file that was sent (the name of its `Message` field,
+              e.g. 'photo' or 'document').
+
+    Returns:
+        The file id, or None if the message has no such file.
+    """
+    sent = getattr(message, kind, None)
+
+    if isinstance(sent, list):
+        # Photos come in several sizes, the largest one last.
+        sent = sent[-1] if sent else None
+
+    return getattr(sent, 'file_id', None)
+
+
+class UploadCache:
+    """Remember the file ids Telegram gives to uploaded files.
+
+    Files are identified by the SHA-256 hash of their contents. Paths are
+    also identified by their size and modification time, so unchanged files
+    are not hashed again. Streams that can't seek are never cached.
+
+    Hashing and the store are run in worker threads, so that neither blocks
+    the event loop.
+
+    Args:
+        store: Where file ids are kept (e.g. `MemoryUploadCacheStore` or
+               `SQLiteUploadCacheStore`).
+    """
+
+    def __init__(self, store: Optional[UploadCacheStore] = None):
+        self.store: UploadCacheStore = (
+            store if store is not None else MemoryUploadCacheStore()
+        )
+        self._store_lock = threading.Lock()
+
+    async def lookup(
+        self, input_file: InputFile, kind: str
+    ) -> Tuple[Optional[FileID], Tuple[str, ...]]:
+        """Look for the file id of a file that was already uploaded.
+
+        Args:
+            input_file: The file to send.
+            kind: The kind of file (see `uploaded_file_id`).
+
+        Returns:
+            The file id (None if not known) and the keys to `remember` the
+            file id under once it is uploaded (empty if the file can't be
+            cached).
+        """
+        if isinstance(input_file, str):
+            return None, ()
+
+        source = (
+            input_file.binary_source
+            if isinstance(input_file, FileDescription)
+            else input_file
+        )
+
+        return await anyio.to_thread.run_sync(self._lookup, source, kind)
+
+    def _lookup(
+        self, source: Union[Path, BinaryIO, InMemorySource], kind: str
+    ) -> Tuple[Optional[FileID], Tuple[str, ...]]:
+        keys: Tuple[str, ...] = ()
+
+        if isinstance(source, Path):
+            stat = source.stat()
+            keys = (
+                f'{kind}:path:{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}',
+            )
+            file_id = self._get(keys[0])
+
+            if file_id is not None:
+                return file_id, keys
+
+        content_hash = _content_hash(source)
+
+        if content_hash is None:
+            return None, ()
+
+        keys = (f'{kind}:sha256:{content_hash}', *keys)
+        file_id = self._get(keys[0])
+
+        if file_id is not None:
+            self._remember(keys[1:], file_id)
+
+        return file_id, keys
+
+    def _get(self, key: str) -> Optional[FileID]:
+        with self._store_lock:
+            return self.store.get(key)
+
+    def _remember(self, keys: Tuple[str, ...], file_id: FileID) -> None:
+        with self._store_lock:
+            for key in keys:
+                self.store.set(key, file_id)
+
+    def _forget(self, keys: Tuple[str, ...]) -> None:
+        with self._store_lock:
+            for key in keys:
+                self.store.delete(key)
+
+    async def remember(self, keys: Tuple[str, ...], file_id: FileID) -> None:
+        """Remember the file id of an uploaded file.
+
+        Args:
+            keys: The keys returned by `lookup`.
+            file_id: The file id Telegram gave to the file.
+        """
+        if keys:
+            await anyio.to_thread.run_sync(self._remember, keys, file_id)
+
+    async def forget(self, keys: Tuple[str, ...]) -> None:
+        """Forget a file id, e.g. because Telegram no longer accepts it.
+
+        Args:
+            keys: The keys returned by `lookup`.
+        """
+        if keys:
+            await anyio.to_thread.run_sync(self._forget, keys)
+
+
+__all__ = [
+    'MemoryUploadCacheStore',
+    'SQLiteUploadCacheStore',
+    'UploadCache',
+    'UploadCacheStore',
+    'is_file_id_error',
+    'uploaded_file_id',
+]
@@ -0,0 +1,236 @@
+"""A server that receives updates sent by Telegram to a webhook.
+
+This module needs `trio` (install roboto with the `trio` extra).
+"""
+import hmac
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, List, Optional
+
+import h11
+import trio
+
+from .api_types import Update
+from .datautil import JSONConversionError, from_json_like
+from .h11_util import CONNECTION_ERRORS, next_event, respond
+from .json_codec import STDLIB_JSON, JSONCodec
+
+SECRET_TOKEN_HEADER = b'x-telegram-bot-api-secret-token'
+"""The header in which Telegram sends the `secret_token` given to setWebhook."""
+
+
+class _RequestError(Exception):
+    """Signal that a request must be answered with an error status."""
+
+    def __init__(self, status_code: int):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+class WebhookReceiver:
+    """Receive updates sent by Telegram and yield them as an async iterator.
+
+    Telegram considers an update delivered once its request is answered, which
+    only happens after the update is taken by the receiver's buffer. Requests
+    are refused unless they are POSTs to the secret `path` carrying the
+    expected secret token.
+
+    Avoid creating objects from this class directly through its constructor.
+    Use the static method `make`, which runs the server.
+    """
+
+    def __init__(
+        self,
+        send_channel: trio.MemorySendChannel,
+        receive_channel: trio.MemoryReceiveChannel,
+        path: str,
+        secret_token: Optional[str],
+        json_codec: JSONCodec,
+        lazy: bool,
+        max_body_size: int,
+    ):
+        self._send_channel = send_channel
+        self._receive_channel = receive_channel
+        self._path = path.encode('ascii')
+        self._secret_token = (
+            secret_token.encode('ascii') if secret_token is not None else None
+        )
+        self._json_codec = json_codec
+        self._lazy = lazy
+        self._max_body_size = max_body_size
+        self.port: Optional[int] = None
+
+    @staticmethod
+    @asynccontextmanager
+    async def make(
+        path: str,
+        secret_token: Optional[str],
+        *,
+        port: int = 8443,
+        host: Optional[str] = None,
+        json_codec: JSONCodec = STDLIB_JSON,
+        lazy: bool = False,
+        max_buffered: int = 100,
+        max_body_size: int = 1 << 20,
+    ) -> AsyncIterator['WebhookReceiver']:
+        """Context manager for running a WebhookReceiver.
+
+        The server speaks plain HTTP: put it behind a reverse proxy that
+        terminates TLS, since Telegram only sends updates through HTTPS.
+
+        Args:
+            path: The secret path that Telegram sends updates to (the path of
+                  the URL given to `BotAPI.set_webhook`).
+            secret_token: The `secret_token` given to `BotAPI.set_webhook`. If
+                          None, requests are not checked for it.
+            port: The port to listen on. 0 picks a free port, which is then
+                  available as the receiver's `port`.
+            host: The host to listen on. None listens on all interfaces.
+            json_codec: The JSON implementation to parse updates with.
+            lazy: Whether updates are decoded lazily (see
+                  `roboto.datautil.from_json_like`).
+            max_buffered: How many received updates can wait to be consumed
+                          before Telegram's requests are made to wait.
+            max_body_size: The largest request body accepted, in bytes.
+
+        Yields:
+            A WebhookReceiver object.
+        """
+        send_channel, receive_channel = trio.open_memory_channel(max_buffered)
+        receiver = WebhookReceiver(
+            send_channel,
+            receive_channel,
+            path,
+            secret_token,
+            json_codec,
+            lazy,
+            max_body_size,
+        )
+
+        async with trio.open_nursery() as nursery:
+            listeners = await nursery.start(
+                partial(trio.serve_tcp, receiver.handle_connection, port, host=host)
+            )
+            receiver.port = listeners[0].socket.getsockname()[1]
+            yield receiver
+            nursery.cancel_scope.cancel()
+
+    def __aiter__(self) -> AsyncIterator[Update]:
+        return self._receive_channel.__aiter__()
+
+    async def handle_connection(self, stream: trio.abc.Stream) -> None:
+        """Serve HTTP requests from a connection until it is closed.
+
+        Args:
+            stream: A stream connected to a client (usually Telegram).
+        """
+        connection = h11.Connection(h11.SERVER)
+
+        async with stream:
+            try:
+                await self._serve(connection, stream)
+            except CONNECTION_ERRORS:
+                # The client went away: only its connection is dropped.
+                return
+
+    async def _serve(self, connection: h11.Connection, stream: trio.abc.Stream) -> None:
+        while True:
+            try:
+                event = await next_event(connection, stream)
+            except h11.RemoteProtocolError:
+                await _try_respond(connection, stream, 400)
+                return
+
+            if not isinstance(event, h11.Request):
+                return
+
+            try:
+                update = await self._read_update(connection, stream, event)
+            except _RequestError as e:
+                await _try_respond(connection, stream, e.status_code)
+                return
+            except h11.RemoteProtocolError:
+                await _try_respond(connection, stream, 400)
+                return
+
+            await self._send_channel.send(update)
+            await _respond(connection, stream, 200)
+
+            if connection.our_state is not h11.DONE:
+                return
+
+            connection.start_next_cycle()
+
+    async def _read_update(
+        self, connection: h11.Connection, stream: trio.abc.Stream, request: h11.Request
+    ) -> Update:
+        if request.target.split(b'?', 1)[0] != self._path:
+            raise _RequestError(404)
+
+        if request.method != b'POST':
+            raise _RequestError(405)
+
+        headers = dict(request.headers)
+
+        if self._secret_token is not None and not hmac.compare_digest(
+            headers.get(SECRET_TOKEN_HEADER, b''), self._secret_token
+        ):
+            raise _RequestError(403)
+
+        if int(headers.get(b'content-length', 0)) > self._max_body_size:
+            raise _RequestError(413)
+
+        body = await self._read_body(connection, stream)
+
+        try:
+            return from_json_like(Update, self._json_codec.loads(body), lazy=self._lazy)
+        except (JSONConversionError, TypeError, ValueError):
+            # TypeError is raised for objects missing required fields.
+            raise _RequestError(400) from None
+
+    async def _read_body(
+        self, connection: h11.Connection, stream: trio.abc.Stream
+    ) -> bytes:
+        chunks: List[bytes] = []
+        size = 0
+
+        while True:
+            event = await next_event(connection, stream)
+
+            if isinstance(event, h11.EndOfMessage):
+                return b''.join(chunks)
+
+            if not isinstance(event, h11.Data):
+                raise _RequestError(400)
+
+            size += len(event.data)
+
+            if size > self._max_body_size:
+                raise _RequestError(413)
+
+            chunks.append(event.data)
+
+
+async def _respond(
+    connection: h11.Connection, stream: trio.abc.Stream, status_code: int
+) -> None:
+    headers = [] if status_code == 200 else [('connection', 'close')]
+    await respond(connection, stream, status_code, headers=headers)
+
+
+async def _try_respond(
+    connection: h11.Connection, stream: trio.abc.Stream, status_code: int
+) -> None:
+    if connection.our_state not in (h11.IDLE, h11.SEND_RESPONSE):
+        return
+
+    try:
+        await _respond(connection, stream, status_code)
+    except (h11.LocalProtocolError, *CONNECTION_ERRORS):
+        pass
+
+
+__all__ = [
+    'SECRET_TOKEN_HEADER',
+    'WebhookReceiver',
+]
@@ -3,6 +3,7 @@ import shlex
 import subprocess
 from dataclasses import dataclass
 from functools import wraps
+from pathlib import Path
 from typing import Callable, List, Optional, Union, overload
 
 import typer
@@ -101,6 +102,7 @@ def execute(command: Union[str, List[str]], *, raise_error: bool = True) -> Resu
 EVERYTHING = [
     'roboto',
     'tests',
+    'benchmarks',
     'bot_tester',
     'develop.py',
     'tasks.py',
@@ -167,6 +169,29 @@ def test(
 APP.command()(check_commands(test))
 
 
+def benchmark(
+    output: Path = typer.Option(  # noqa: B008
+        default=Path('benchmark.json'), help='Where to write the results, as JSON.'
+    ),
+    baseline: Optional[Path] = typer.Option(  # noqa: B008
+        default=None, help='The results of an earlier run to compare against.'
+    ),
+) -> List[Result]:
+    """Run the end-to-end benchmarks against a local fake Bot API server."""
+    baseline_flag = ['--baseline', str(baseline)] if baseline is not None else []
+
+    return [
+        execute(
+            ['python', '-m', 'benchmarks.end_to_end', '--output', str(output)]
+            + baseline_flag,
+            raise_error=False,
+        ),
+    ]
+
+
+APP.command()(check_commands(benchmark))
+
+
 def lint(
     files: Optional[List[str]] = typer.Argument(default=None,),  # noqa: B008
     *,
@@ -1,7 +1,14 @@
 """Common utilities for tests."""
+import json as json_module
+import mimetypes
+import re
 import sys
 from dataclasses import dataclass
-from unittest.mock import MagicMock
+from pathlib import Path
+from typing import Any, Dict, Mapping
+from unittest.mock import ANY, MagicMock
+
+from asks.multipart import MultipartData
 
 from roboto.bot import BotAPI
 
@@ -13,6 +20,59 @@ else:
     from unittest.mock import AsyncMock  # pylint: disable=import-error
 
 
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, Any]:
+    """Parse a multipart/form-data body.
+
+    Returns:
+        The form fields, with files as MultipartData objects (holding their
+        contents as bytes) and other fields as str.
+    """
+    boundary = content_type.split('boundary=', 1)[1].encode()
+    parts = body.split(b'--' + boundary)
+
+    assert parts[0] == b''
+    assert parts[-1] == b'--\r\n'
+
+    fields: Dict[str, Any] = {}
+
+    for part in parts[1:-1]:
+        assert part.startswith(b'\r\n') and part.endswith(b'\r\n')
+        head, content = part[2:-2].split(b'\r\n\r\n', 1)
+        headers = dict(line.split(': ', 1) for line in head.decode().split('\r\n'))
+        disposition = headers['Content-Disposition']
+        name = re.search(r'; name="([^"]*)"', disposition)
+        filename = re.search(r'; filename="([^"]*)"', disposition)
+
+        assert name is not None
+
+        if 'Content-Type' in headers:
+            fields[name[1]] = MultipartData(
+                content, headers['Content-Type'], filename and filename[1]
+            )
+        else:
+            fields[name[1]] = content.decode()
+
+    return fields
+
+
+def _expected_field(value: Any) -> Any:
+    if isinstance(value, Path):
+        mime_type, _ = mimetypes.guess_type(value.name)
+        return MultipartData(value.read_bytes(), mime_type, value.name)
+
+    if isinstance(value, MultipartData):
+        source = value.binary_source
+
+        if isinstance(source, Path):
+            source = source.read_bytes()
+        elif not isinstance(source, bytes):
+            source = source.getvalue()
+
+        return value._replace(binary_source=source)
+
+    return str(value)
+
+
 @dataclass
 class MockedBotAPI:
     """Aggregate for a mocked request/response pair and a bot API."""
@@ -20,3 +80,36 @@ class MockedBotAPI:
     request: AsyncMock
     response: MagicMock
     api: BotAPI
+
+    def assert_json_request(self, method: str, *, path: str, json: Any) -> None:
+        """Assert that the last request was made with `json` as its JSON body."""
+        if json is None:
+            self.request.assert_called_with(method, path=path)
+            return
+
+        self.request.assert_called_with(
+            method,
+            path=path,
+            data=ANY,
+            headers={'Content-Type': 'application/json'},
+        )
+
+        assert json_module.loads(self.request.call_args[1]['data']) == json
+
+    def assert_multipart_request(
+        self, method: str, *, path: str, fields: Mapping[str, Any]
+    ) -> None:
+        """Assert that the last request was made with `fields` as its
+        multipart/form-data body.
+
+        Paths and MultipartData objects in `fields` stand for the contents of
+        the files they describe.
+        """
+        self.request.assert_called_with(
+            method, path=path, data=ANY, headers={'Content-Type': ANY}
+        )
+        kwargs = self.request.call_args[1]
+
+        assert parse_multipart(kwargs['headers']['Content-Type'], kwargs['data']) == {
+            name: _expected_field(value) for name, value in fields.items()
+        }
@@ -3,3 +3,4 @@
 
 from .async_mocker import *
 from .bot_api import *
+from .files import *
@@ -1,6 +1,8 @@
 """Fixture for mocking the HTTP session of a BotAPI."""
+import json
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Generator, Tuple
+from unittest.mock import PropertyMock
 
 import pytest
 
@@ -16,11 +18,17 @@ def request_response(
 ) -> Generator[Tuple[AsyncMock, MagicMock], None, None]:
     """Mock the request method of a Session.
 
+    The body of the response is the JSON encoding of
+    `response.json.return_value`.
+
     Returns:
         The mocked request method and the mock returned as its response.
     """
     response = MagicMock()
     response.json = MagicMock()
+    type(response).content = PropertyMock(
+        side_effect=lambda: json.dumps(response.json.return_value).encode()
+    )
     request = AsyncMock(return_value=response)
 
     @asynccontextmanager
@@ -29,7 +37,7 @@ def request_response(
         mock_session.request = request
         yield mock_session
 
-    async_mocker.patch('roboto.bot.Session', make_mock_session)
+    async_mocker.patch('roboto.transport.PooledSession', make_mock_session)
 
     yield request, response
 
@@ -0,0 +1,22 @@
+"""Fixture for files sent by tests."""
+import pytest
+
+DUMMY_FILE_NAMES = [
+    'dummy.jpg',
+    'dummy.mp4',
+    'dummy.ogg',
+    'dummy.pdf',
+    'dummy.wav',
+]
+
+
+@pytest.fixture
+def dummy_files(tmp_path, monkeypatch) -> None:
+    """Run a test in a directory with files named `DUMMY_FILE_NAMES`.
+
+    Each file contains b'dummy'.
+    """
+    for name in DUMMY_FILE_NAMES:
+        (tmp_path / name).write_bytes(b'dummy')
+
+    monkeypatch.chdir(tmp_path)
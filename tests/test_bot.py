@@ -1,13 +1,17 @@
 """Tests for the roboto.bot module."""
+import json
+from dataclasses import replace
 from io import BytesIO
 from pathlib import Path
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
+from asks.multipart import MultipartData
 from pytest_mock import MockFixture
 
 from roboto import (
+    URL,
     BotCommand,
     BotUser,
     CallbackQueryID,
@@ -43,9 +47,11 @@ from roboto import (
     User,
     UserID,
     UserProfilePhotos,
+    WebhookInfo,
 )
 from roboto.bot import BotAPI
-from roboto.http_api import MultipartData
+from roboto.json_codec import STDLIB_JSON, JSONCodec
+from roboto.upload_cache import UploadCache
 
 from .common import MockedBotAPI
 
@@ -61,6 +67,56 @@ async def test_bot_api_make(request_response: Tuple[MagicMock, MagicMock]):
     request.assert_not_awaited()
 
 
+@pytest.mark.trio
+async def test_bot_api_session_is_deprecated(
+    request_response: Tuple[MagicMock, MagicMock]
+):
+    """Test the session of BotAPI is a deprecated alias of its client."""
+    async with BotAPI.make(Token('dummy')) as api:
+        with pytest.deprecated_call():
+            assert api.session is api.client
+
+
+@pytest.mark.trio
+async def test_bot_api_uses_json_codec(request_response: Tuple[MagicMock, MagicMock]):
+    """Test BotAPI uses the given JSON codec for bodies and nested fields."""
+    request, response = request_response
+    response.json.return_value = {
+        'ok': True,
+        'result': {
+            'message_id': 1,
+            'date': 0,
+            'chat': {'id': 1, 'type': 'private'},
+            'from': {'id': 1, 'is_bot': True, 'first_name': 'Test'},
+        },
+    }
+
+    dumped = []
+
+    def _dumps(value):
+        dumped.append(value)
+        return STDLIB_JSON.dumps(value)
+
+    codec = JSONCodec(
+        'recording', _dumps, lambda v: _dumps(v).encode(), STDLIB_JSON.loads
+    )
+
+    async with BotAPI.make(Token('dummy'), json_codec=codec) as api:
+        await api.send_message(
+            ChatID(1),
+            'Hey.',
+            reply_markup=ReplyKeyboardMarkup(keyboard=[[KeyboardButton('Bla.')]]),
+        )
+
+    reply_markup = {'keyboard': [[{'text': 'Bla.'}]]}
+
+    assert dumped == [
+        reply_markup,
+        {'chat_id': 1, 'text': 'Hey.', 'reply_markup': json.dumps(reply_markup)},
+    ]
+    assert request.call_args[1]['data'] == json.dumps(dumped[1]).encode()
+
+
 @pytest.mark.trio
 async def test_get_me(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.get_me produces a BotUser given the correct input."""
@@ -78,7 +134,7 @@ async def test_get_me(mocked_bot_api: MockedBotAPI):
 
     bot_user = await mocked_bot_api.api.get_me()
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'get', path='/getMe', json=None,
     )
 
@@ -102,7 +158,7 @@ async def test_get_updates_empty(mocked_bot_api: MockedBotAPI):
 
     updates = await mocked_bot_api.api.get_updates(0)
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'get', path='/getUpdates', json={'offset': 0}
     )
 
@@ -129,7 +185,7 @@ async def test_get_updates(mocked_bot_api: MockedBotAPI):
 
     updates = await mocked_bot_api.api.get_updates(0)
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'get', path='/getUpdates', json={'offset': 0}
     )
 
@@ -146,6 +202,109 @@ async def test_get_updates(mocked_bot_api: MockedBotAPI):
     ]
 
 
+@pytest.mark.trio
+async def test_get_updates_lazy(mocked_bot_api: MockedBotAPI):
+    """Test that BotAPI.get_updates decodes nested objects lazily when asked to."""
+    mocked_bot_api.response.json.return_value = {
+        'ok': True,
+        'result': [
+            {
+                'update_id': 1,
+                'message': {
+                    'message_id': 1,
+                    'date': 0,
+                    'chat': {'id': 1, 'type': 'private'},
+                    'from': {'id': 1, 'is_bot': False, 'first_name': 'Test'},
+                },
+            }
+        ],
+    }
+
+    api = replace(mocked_bot_api.api, lazy_updates=True)
+    [update] = await api.get_updates(0)
+
+    assert 'message' not in vars(update)
+    assert update.message is not None
+    assert update.message.chat.id == ChatID(1)
+    assert update == Update(
+        update_id=1,
+        message=Message(
+            message_id=MessageID(1),
+            date=0,
+            chat=Chat(id=ChatID(1), type='private'),
+            from_=User(id=UserID(1), is_bot=False, first_name='Test'),
+        ),
+    )
+
+
+@pytest.mark.trio
+async def test_set_webhook(mocked_bot_api: MockedBotAPI):
+    """Test that BotAPI.set_webhook creates the correct payload and
+    properly reads back the returned bool.
+    """
+
+    mocked_bot_api.response.json.return_value = {'ok': True, 'result': True}
+
+    result = await mocked_bot_api.api.set_webhook(
+        URL.make('https://example.com/secret'),
+        allowed_updates=['message'],
+        secret_token='token',
+    )
+
+    mocked_bot_api.assert_multipart_request(
+        'post',
+        path='/setWebhook',
+        fields={
+            'url': 'https://example.com/secret',
+            'allowed_updates': '["message"]',
+            'secret_token': 'token',
+        },
+    )
+
+    assert result
+
+
+@pytest.mark.trio
+async def test_delete_webhook(mocked_bot_api: MockedBotAPI):
+    """Test that BotAPI.delete_webhook creates the correct payload and
+    properly reads back the returned bool.
+    """
+
+    mocked_bot_api.response.json.return_value = {'ok': True, 'result': True}
+
+    result = await mocked_bot_api.api.delete_webhook(drop_pending_updates=True)
+
+    mocked_bot_api.assert_json_request(
+        'post', path='/deleteWebhook', json={'drop_pending_updates': True},
+    )
+
+    assert result
+
+
+@pytest.mark.trio
+async def test_get_webhook_info(mocked_bot_api: MockedBotAPI):
+    """Test that BotAPI.get_webhook_info creates the correct payload and
+    properly reads back the returned webhook info.
+    """
+
+    mocked_bot_api.response.json.return_value = {
+        'ok': True,
+        'result': {
+            'url': 'https://example.com/secret',
+            'has_custom_certificate': False,
+            'pending_update_count': 2,
+        },
+    }
+
+    result = await mocked_bot_api.api.get_webhook_info()
+
+    mocked_bot_api.assert_json_request(
+        'post', path='/getWebhookInfo', json=None,
+    )
+
+    assert result == WebhookInfo('https://example.com/secret', False, 2)
+
+
 @pytest.mark.trio
 async def test_send_message(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_message creates the correct payload and properly reads back
@@ -163,7 +322,7 @@ async def test_send_message(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_message(chat_id=ChatID(1), text='Hey.')
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/sendMessage', json={'chat_id': 1, 'text': 'Hey.'}
     )
 
@@ -196,7 +355,7 @@ async def test_send_message_with_reply_keyboard(mocked_bot_api: MockedBotAPI):
         reply_markup=ReplyKeyboardMarkup(keyboard=[[KeyboardButton('Bla.')]]),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/sendMessage',
         json={
@@ -254,7 +413,7 @@ async def test_forward_message(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), from_chat_id=ChatID(1), message_id=MessageID(1)
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/forwardMessage',
         json={'chat_id': 1, 'from_chat_id': 1, 'message_id': 1},
@@ -290,6 +449,7 @@ async def test_forward_message(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_photo_with_path(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_photo creates the correct payload and properly reads
     back the returned message when using a Path object as input.
@@ -308,8 +468,8 @@ async def test_send_photo_with_path(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_photo(chat_id=ChatID(1), photo=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendPhoto', multipart={'chat_id': 1, 'photo': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendPhoto', fields={'chat_id': 1, 'photo': path}
     )
 
     assert message == Message(
@@ -320,6 +480,43 @@ async def test_send_photo_with_path(mocked_bot_api: MockedBotAPI):
     )
 
 
+@pytest.mark.trio
+async def test_send_photo_with_upload_cache(mocked_bot_api: MockedBotAPI, tmp_path):
+    """Test that BotAPI.send_photo sends photos that were already uploaded
+    through their file id when the bot has an upload cache.
+    """
+    mocked_bot_api.response.json.return_value = {
+        'ok': True,
+        'result': {
+            'message_id': 1,
+            'date': 0,
+            'chat': {'id': 1, 'type': 'private'},
+            'from': {'id': 1, 'is_bot': True, 'first_name': 'Test'},
+            'photo': [
+                {'file_id': 'small', 'file_unique_id': 's', 'width': 1, 'height': 1},
+                {'file_id': 'large', 'file_unique_id': 'l', 'width': 2, 'height': 2},
+            ],
+        },
+    }
+    api = replace(mocked_bot_api.api, upload_cache=UploadCache())
+    path = tmp_path / 'image.jpg'
+    path.write_bytes(b'dummy')
+
+    await api.send_photo(chat_id=ChatID(1), photo=path)
+
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendPhoto', fields={'chat_id': 1, 'photo': path}
+    )
+
+    await api.send_photo(
+        chat_id=ChatID(1), photo=FileDescription(b'dummy', basename='image.jpg'),
+    )
+
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendPhoto', fields={'chat_id': 1, 'photo': 'large'}
+    )
+
+
 @pytest.mark.trio
 async def test_send_photo_with_bytes(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_photo creates the correct payload and properly reads
@@ -340,10 +537,10 @@ async def test_send_photo_with_bytes(mocked_bot_api: MockedBotAPI):
         photo=FileDescription(b'dummy', mime_type='image/jpeg', basename='image.jpg'),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_multipart_request(
         'post',
         path='/sendPhoto',
-        multipart={
+        fields={
             'chat_id': 1,
             'photo': MultipartData(
                 b'dummy', mime_type='image/jpeg', basename='image.jpg'
@@ -381,10 +578,10 @@ async def test_send_photo_with_buffered_io(mocked_bot_api: MockedBotAPI):
         photo=FileDescription(bytes_io, mime_type='image/jpeg', basename='image.jpg'),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_multipart_request(
         'post',
         path='/sendPhoto',
-        multipart={
+        fields={
             'chat_id': 1,
             'photo': MultipartData(
                 bytes_io, mime_type='image/jpeg', basename='image.jpg'
@@ -401,6 +598,7 @@ async def test_send_photo_with_buffered_io(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_audio(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_audio creates the correct payload and properly reads
     back the returned message.
@@ -419,8 +617,8 @@ async def test_send_audio(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_audio(chat_id=ChatID(1), audio=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendAudio', multipart={'chat_id': 1, 'audio': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendAudio', fields={'chat_id': 1, 'audio': path}
     )
 
     assert message == Message(
@@ -432,6 +630,7 @@ async def test_send_audio(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_document(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_document creates the correct payload and properly reads
     back the returned message.
@@ -450,8 +649,8 @@ async def test_send_document(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_document(chat_id=ChatID(1), document=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendDocument', multipart={'chat_id': 1, 'document': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendDocument', fields={'chat_id': 1, 'document': path}
     )
 
     assert message == Message(
@@ -463,6 +662,7 @@ async def test_send_document(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_video(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_video creates the correct payload and properly reads back
     the returned message.
@@ -482,8 +682,8 @@ async def test_send_video(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_video(chat_id=ChatID(1), video=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendVideo', multipart={'chat_id': 1, 'video': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendVideo', fields={'chat_id': 1, 'video': path}
     )
 
     assert message == Message(
@@ -495,6 +695,7 @@ async def test_send_video(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_animation(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_animation creates the correct payload and properly reads
     back the returned message.
@@ -514,8 +715,8 @@ async def test_send_animation(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_animation(chat_id=ChatID(1), animation=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendAnimation', multipart={'chat_id': 1, 'animation': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendAnimation', fields={'chat_id': 1, 'animation': path}
     )
 
     assert message == Message(
@@ -527,6 +728,7 @@ async def test_send_animation(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_voice(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_voice creates the correct payload and properly reads back
     the returned message.
@@ -546,8 +748,8 @@ async def test_send_voice(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.send_voice(chat_id=ChatID(1), voice=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendVoice', multipart={'chat_id': 1, 'voice': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendVoice', fields={'chat_id': 1, 'voice': path}
     )
 
     assert message == Message(
@@ -559,6 +761,7 @@ async def test_send_voice(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_video_note(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.send_video_note creates the correct payload and properly reads
     back the returned message.
@@ -580,8 +783,8 @@ async def test_send_video_note(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), video_note=path
     )
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendVideoNote', multipart={'chat_id': 1, 'video_note': path}
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendVideoNote', fields={'chat_id': 1, 'video_note': path}
     )
 
     assert message == Message(
@@ -602,6 +805,7 @@ async def mock_uuid(mocker: MockFixture):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_send_media_group(
     mock_uuid, mocked_bot_api: MockedBotAPI,  # pylint: disable=redefined-outer-name
 ):
@@ -631,10 +835,10 @@ async def test_send_media_group(
         media=[InputMediaPhoto(photo_path), InputMediaVideo(video_path)],
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_multipart_request(
         'post',
         path='/sendMediaGroup',
-        multipart={
+        fields={
             'attachedDUMMY-UUID-1': MultipartData(
                 photo_path, mime_type='image/jpeg', basename='attachedDUMMY-UUID-1',
             ),
@@ -679,7 +883,7 @@ async def test_send_location(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), latitude=35.716692, longitude=139.785962,
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/sendLocation',
         json={'chat_id': 1, 'latitude': 35.716692, 'longitude': 139.785962},
@@ -716,7 +920,7 @@ async def test_edit_message_live_location(mocked_bot_api: MockedBotAPI):
         longitude=139.785962,
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageLiveLocation',
         json={
@@ -757,7 +961,7 @@ async def test_edit_inline_message_live_location(mocked_bot_api: MockedBotAPI):
         longitude=139.785962,
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageLiveLocation',
         json={
@@ -795,7 +999,7 @@ async def test_stop_message_live_location(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), message_id=MessageID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/stopMessageLiveLocation', json={'chat_id': 1, 'message_id': 1},
     )
 
@@ -827,7 +1031,7 @@ async def test_stop_inline_message_live_location(mocked_bot_api: MockedBotAPI):
         inline_message_id=InlineMessageID('abc'),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/stopMessageLiveLocation', json={'inline_message_id': 'abc'}
     )
 
@@ -863,7 +1067,7 @@ async def test_send_venue(mocked_bot_api: MockedBotAPI):
         address='3 Chome-10-7 Matsugaya',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/sendVenue',
         json={
@@ -906,7 +1110,7 @@ async def test_send_contact(mocked_bot_api: MockedBotAPI):
         last_name='Services',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/sendContact',
         json={
@@ -950,7 +1154,7 @@ async def test_send_poll(mocked_bot_api: MockedBotAPI):
         is_anonymous=False,
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/sendPoll',
         json={
@@ -1002,7 +1206,7 @@ async def test_stop_poll(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), message_id=MessageID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/stopPoll', json={'chat_id': 1, 'message_id': 1},
     )
 
@@ -1048,7 +1252,7 @@ async def test_send_dice(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), emoji=DiceEmoji.DART
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/sendDice', json={'chat_id': 1, 'emoji': '🎯'}
     )
 
@@ -1073,7 +1277,7 @@ async def test_send_chat_action(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), action=ChatAction.UPLOAD_AUDIO,
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/sendChatAction', json={'chat_id': 1, 'action': 'upload_audio'},
     )
 
@@ -1093,7 +1297,7 @@ async def test_get_user_profile_photos(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.get_user_profile_photos(user_id=UserID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getUserProfilePhotos', json={'user_id': 1},
     )
 
@@ -1126,7 +1330,7 @@ async def test_get_file(mocked_bot_api: MockedBotAPI):
         ),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/getFile',
         json={
@@ -1160,7 +1364,7 @@ async def test_kick_chat_member(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), user_id=UserID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/kickChatMember', json={'chat_id': 1, 'user_id': 1},
     )
 
@@ -1179,7 +1383,7 @@ async def test_unban_chat_member(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), user_id=UserID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/unbanChatMember', json={'chat_id': 1, 'user_id': 1},
     )
 
@@ -1200,7 +1404,7 @@ async def test_restrict_chat_member(mocked_bot_api: MockedBotAPI):
         permissions=ChatPermissions(can_change_info=False),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/restrictChatMember',
         json={'chat_id': 1, 'user_id': 1, 'permissions': '{"can_change_info": false}'},
@@ -1221,7 +1425,7 @@ async def test_promote_chat_member(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), user_id=UserID(1), can_pin_messages=True,
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/promoteChatMember',
         json={'chat_id': 1, 'user_id': 1, 'can_pin_messages': True},
@@ -1242,7 +1446,7 @@ async def test_set_chat_administrator_custom_title(mocked_bot_api: MockedBotAPI)
         chat_id=ChatID(1), user_id=UserID(1), custom_title='ademir',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/setChatAdministratorCustomTitle',
         json={'chat_id': 1, 'user_id': 1, 'custom_title': 'ademir'},
@@ -1263,7 +1467,7 @@ async def test_set_chat_permissions(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), permissions=ChatPermissions(can_change_info=False),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/setChatPermissions',
         json={'chat_id': 1, 'permissions': '{"can_change_info": false}'},
@@ -1285,7 +1489,7 @@ async def test_export_chat_invite_link(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.export_chat_invite_link(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/exportChatInviteLink', json={'chat_id': 1},
     )
 
@@ -1293,6 +1497,7 @@ async def test_export_chat_invite_link(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_set_chat_photo(mocked_bot_api: MockedBotAPI):
     """Test that BotAPI.set_chat_photo creates the correct payload and
     properly reads back the returned bool.
@@ -1304,8 +1509,8 @@ async def test_set_chat_photo(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.set_chat_photo(chat_id=ChatID(1), photo=path)
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/setChatPhoto', multipart={'chat_id': 1, 'photo': path},
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/setChatPhoto', fields={'chat_id': 1, 'photo': path},
     )
 
     assert result
@@ -1321,7 +1526,7 @@ async def test_delete_chat_photo(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.delete_chat_photo(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/deleteChatPhoto', json={'chat_id': 1},
     )
 
@@ -1338,7 +1543,7 @@ async def test_set_chat_title(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.set_chat_title(chat_id=ChatID(1), title='A Chat!')
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/setChatTitle', json={'chat_id': 1, 'title': 'A Chat!'},
     )
 
@@ -1357,7 +1562,7 @@ async def test_set_chat_description(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), description='A nice chat.',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/setChatDescription',
         json={'chat_id': 1, 'description': 'A nice chat.'},
@@ -1378,7 +1583,7 @@ async def test_pin_chat_message(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), message_id=MessageID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/pinChatMessage', json={'chat_id': 1, 'message_id': 1},
     )
 
@@ -1395,7 +1600,7 @@ async def test_unpin_chat_message(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.unpin_chat_message(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/unpinChatMessage', json={'chat_id': 1},
     )
 
@@ -1412,7 +1617,7 @@ async def test_leave_chat(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.leave_chat(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/leaveChat', json={'chat_id': 1},
     )
 
@@ -1432,7 +1637,7 @@ async def test_get_chat(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.get_chat(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getChat', json={'chat_id': 1},
     )
 
@@ -1457,7 +1662,7 @@ async def test_get_chat_administrators(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.get_chat_administrators(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getChatAdministrators', json={'chat_id': 1},
     )
 
@@ -1478,7 +1683,7 @@ async def test_get_chat_members_count(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.get_chat_members_count(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getChatMembersCount', json={'chat_id': 1},
     )
 
@@ -1503,7 +1708,7 @@ async def test_get_chat_member(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), user_id=UserID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getChatMember', json={'chat_id': 1, 'user_id': 1},
     )
 
@@ -1524,7 +1729,7 @@ async def test_set_chat_sticker_set(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), sticker_set_name='not_a_real_sticker_set',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/setChatStickerSet',
         json={'chat_id': 1, 'sticker_set_name': 'not_a_real_sticker_set'},
@@ -1543,7 +1748,7 @@ async def test_delete_chat_sticker_set(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.delete_chat_sticker_set(chat_id=ChatID(1))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/deleteChatStickerSet', json={'chat_id': 1},
     )
 
@@ -1562,7 +1767,7 @@ async def test_answer_callback_query(mocked_bot_api: MockedBotAPI):
         callback_query_id=CallbackQueryID('abc'), text='Yay!',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/answerCallbackQuery',
         json={'callback_query_id': 'abc', 'text': 'Yay!'},
@@ -1583,7 +1788,7 @@ async def test_set_my_commands(mocked_bot_api: MockedBotAPI):
         commands=[BotCommand(command='test', description='Test.')],
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/setMyCommands',
         json={'commands': '[{"command": "test", "description": "Test."}]'},
@@ -1605,7 +1810,7 @@ async def test_get_my_commands(mocked_bot_api: MockedBotAPI):
 
     result = await mocked_bot_api.api.get_my_commands()
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getMyCommands', json=None,
     )
 
@@ -1632,7 +1837,7 @@ async def test_edit_message_text(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), message_id=MessageID(1), text='Edited.',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageText',
         json={'chat_id': 1, 'message_id': 1, 'text': 'Edited.'},
@@ -1666,7 +1871,7 @@ async def test_edit_inline_message_text(mocked_bot_api: MockedBotAPI):
         inline_message_id=InlineMessageID('abc'), text='Edited.',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageText',
         json={'inline_message_id': 'abc', 'text': 'Edited.'},
@@ -1700,7 +1905,7 @@ async def test_edit_message_caption(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), message_id=MessageID(1), caption='Edited.',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageCaption',
         json={'chat_id': 1, 'message_id': 1, 'caption': 'Edited.'},
@@ -1734,7 +1939,7 @@ async def test_edit_inline_message_caption(mocked_bot_api: MockedBotAPI):
         inline_message_id=InlineMessageID('abc'), caption='Edited.',
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageCaption',
         json={'inline_message_id': 'abc', 'caption': 'Edited.'},
@@ -1749,6 +1954,7 @@ async def test_edit_inline_message_caption(mocked_bot_api: MockedBotAPI):
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_edit_message_media(
     mock_uuid: MagicMock,  # pylint: disable=redefined-outer-name
     mocked_bot_api: MockedBotAPI,
@@ -1775,10 +1981,10 @@ async def test_edit_message_media(
         chat_id=ChatID(1), message_id=MessageID(1), media=InputMediaPhoto(photo_path),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_multipart_request(
         'post',
         path='/editMessageMedia',
-        multipart={
+        fields={
             'chat_id': 1,
             'attachedDUMMY-UUID': MultipartData(
                 photo_path, mime_type='image/jpeg', basename='attachedDUMMY-UUID',
@@ -1797,6 +2003,7 @@ async def test_edit_message_media(
 
 
 @pytest.mark.trio
+@pytest.mark.usefixtures('dummy_files')
 async def test_edit_inline_message_media(
     mock_uuid: MagicMock,  # pylint: disable=redefined-outer-name
     mocked_bot_api: MockedBotAPI,
@@ -1823,10 +2030,10 @@ async def test_edit_inline_message_media(
         inline_message_id=InlineMessageID('abc'), media=InputMediaPhoto(photo_path),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_multipart_request(
         'post',
         path='/editMessageMedia',
-        multipart={
+        fields={
             'attachedDUMMY-UUID': MultipartData(
                 photo_path, mime_type='image/jpeg', basename='attachedDUMMY-UUID',
             ),
@@ -1867,7 +2074,7 @@ async def test_edit_message_reply_markup(mocked_bot_api: MockedBotAPI):
         ),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageReplyMarkup',
         json={
@@ -1910,7 +2117,7 @@ async def test_edit_inline_message_reply_markup(mocked_bot_api: MockedBotAPI):
         ),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post',
         path='/editMessageReplyMarkup',
         json={
@@ -1939,7 +2146,7 @@ async def test_delete_message(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), message_id=MessageID(1),
     )
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/deleteMessage', json={'chat_id': 1, 'message_id': 1},
     )
 
@@ -1966,8 +2173,8 @@ async def test_send_sticker(mocked_bot_api: MockedBotAPI):
         chat_id=ChatID(1), sticker=FileID('abc'),
     )
 
-    mocked_bot_api.request.assert_called_with(
-        'post', path='/sendSticker', multipart={'chat_id': 1, 'sticker': 'abc'},
+    mocked_bot_api.assert_multipart_request(
+        'post', path='/sendSticker', fields={'chat_id': 1, 'sticker': 'abc'},
     )
 
     assert message == Message(
@@ -2006,7 +2213,7 @@ async def test_get_sticker_set(mocked_bot_api: MockedBotAPI):
 
     message = await mocked_bot_api.api.get_sticker_set(name=StickerSetName('abc'))
 
-    mocked_bot_api.request.assert_called_with(
+    mocked_bot_api.assert_json_request(
         'post', path='/getStickerSet', json={'name': 'abc'},
     )
 
@@ -0,0 +1,150 @@
+"""Tests for the roboto.broadcast module."""
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List, cast
+
+import pytest
+import trio
+from asks import Session
+
+from roboto import BotAPI, ChatID, InlineKeyboardButton, InlineKeyboardMarkup
+from roboto.broadcast import Broadcast, BroadcastStatus, PhotoBroadcast, TextBroadcast
+from roboto.http_api import APIClient
+from roboto.retry import RetryPolicy
+from roboto.transport import AsksTransport
+
+_ERRORS = {
+    2: {'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'},
+    3: {
+        'error_code': 400,
+        'description': 'Bad Request: group chat was upgraded to a supergroup chat',
+        'parameters': {'migrate_to_chat_id': -1003},
+    },
+    4: {
+        'error_code': 429,
+        'description': 'Too Many Requests: retry after 5',
+        'parameters': {'retry_after': 5},
+    },
+    5: {'error_code': 400, 'description': 'Bad Request: chat not found'},
+}
+
+
+class _FakeTelegram:
+    """A session that sends messages, except to the chats in `_ERRORS`."""
+
+    def __init__(self) -> None:
+        self.requests: List[Dict[str, Any]] = []
+
+    async def request(self, method: str, **kwargs: Any) -> Any:
+        await trio.sleep(0.1)
+        body = json.loads(kwargs['data'])
+        self.requests.append({'path': kwargs['path'], **body})
+        error = _ERRORS.get(body['chat_id'])
+
+        if error is not None:
+            response = {'ok': False, **error}
+        else:
+            response = {
+                'ok': True,
+                'result': {
+                    'message_id': 1,
+                    'date': 0,
+                    'chat': {'id': body['chat_id'], 'type': 'private'},
+                    'from': {'id': 1, 'is_bot': True, 'first_name': 'Bot'},
+                },
+            }
+
+        return SimpleNamespace(
+            status_code=200 if error is None else error['error_code'],
+            reason_phrase='Reason',
+            content=json.dumps(response).encode(),
+        )
+
+
+def _bot(telegram: _FakeTelegram, **kwargs: Any) -> BotAPI:
+    return BotAPI(APIClient(AsksTransport(cast(Session, telegram)), **kwargs))
+
+
+@pytest.mark.trio
+async def test_broadcast(autojump_clock):
+    """Test that every chat is sent the message, and outcomes are reported."""
+    telegram = _FakeTelegram()
+    markup = InlineKeyboardMarkup([[InlineKeyboardButton('Hi', callback_data='hi')]])
+
+    async with Broadcast.make(
+        _bot(telegram), range(1, 7), TextBroadcast('Hello', reply_markup=markup)
+    ) as broadcast:
+        results = {r.chat_id: r async for r in broadcast}
+
+    assert {chat_id: r.status for chat_id, r in results.items()} == {
+        1: BroadcastStatus.SENT,
+        2: BroadcastStatus.BLOCKED,
+        3: BroadcastStatus.MIGRATED,
+        4: BroadcastStatus.RATE_LIMITED,
+        5: BroadcastStatus.FAILED,
+        6: BroadcastStatus.SENT,
+    }
+    assert results[3].migrated_to == -1003
+    assert results[3].message is not None
+    assert results[6].index == 5
+    requested = sorted(r['chat_id'] for r in telegram.requests)
+    assert requested == [-1003, 1, 2, 3, 4, 5, 6]
+    assert {r['reply_markup'] for r in telegram.requests} == {
+        json.dumps({'inline_keyboard': [[{'text': 'Hi', 'callback_data': 'hi'}]]})
+    }
+
+    assert broadcast.progress == 6
+    assert broadcast.stats.total == 6
+    assert (broadcast.stats.sent, broadcast.stats.migrated) == (2, 1)
+    assert broadcast.stats.elapsed == pytest.approx(0.2)
+    assert broadcast.stats.throughput == pytest.approx(30)
+
+
+@pytest.mark.trio
+async def test_broadcast_follows_migrations_of_retry_policy(autojump_clock):
+    """Ensure migrations followed by the bot's retry policy are reported."""
+    telegram = _FakeTelegram()
+    bot = _bot(telegram, retry_policy=RetryPolicy())
+
+    async with Broadcast.make(bot, [ChatID(3)], PhotoBroadcast('photo')) as broadcast:
+        results = [r async for r in broadcast]
+
+    assert [(r.status, r.migrated_to) for r in results] == [
+        (BroadcastStatus.MIGRATED, -1003)
+    ]
+    assert [(r['path'], r['photo']) for r in telegram.requests] == [
+        ('/sendPhoto', 'photo'),
+        ('/sendPhoto', 'photo'),
+    ]
+
+
+@pytest.mark.trio
+async def test_broadcast_resumes(autojump_clock):
+    """Ensure a stopped broadcast can be resumed from its progress."""
+    telegram = _FakeTelegram()
+
+    def chat_ids() -> trio.MemoryReceiveChannel:
+        send_channel, receive_channel = trio.open_memory_channel(4)
+
+        with send_channel:
+            for chat_id in (1, 6, 7, 8):
+                send_channel.send_nowait(chat_id)
+
+        return receive_channel
+
+    async with Broadcast.make(
+        _bot(telegram), chat_ids(), TextBroadcast('Hello'), max_concurrency=1
+    ) as broadcast:
+        async for result in broadcast:
+            if result.chat_id == 6:
+                break
+
+    assert broadcast.progress == 2
+
+    async with Broadcast.make(
+        _bot(telegram), chat_ids(), TextBroadcast('Hello'), start=broadcast.progress
+    ) as broadcast:
+        results = [r async for r in broadcast]
+
+    assert sorted((r.index, r.chat_id) for r in results) == [(2, 7), (3, 8)]
+    assert broadcast.progress == 4
@@ -0,0 +1,87 @@
+"""Tests for the roboto.cache module."""
+from typing import Awaitable, Callable, List
+
+import pytest
+import trio
+
+from roboto import ChatID
+from roboto.cache import DEFAULT_TTLS, ResponseCache, ResponseCacheStats, TTLCache
+from roboto.error import BotAPIError
+from roboto.request_types import GetChatRequest, SetChatTitleRequest
+
+
+def test_ttl_cache() -> None:
+    """Ensure values expire and the least recently used ones are evicted."""
+    now = 0.0
+    cache: TTLCache[str, int] = TTLCache(max_size=2, clock=lambda: now)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2, ttl=5)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3, ttl=10)
+
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+    now = 10
+
+    assert (cache.get('a'), cache.get('c')) == (None, None)
+    assert len(cache) == 0
+
+
+@pytest.mark.trio
+async def test_response_cache(autojump_clock) -> None:
+    """Test that results are cached for their method's TTL, and dropped by
+    mutating methods about the same chat.
+    """
+    cache = ResponseCache()
+    requests: List[str] = []
+
+    def request(result: str) -> Callable[[], Awaitable[str]]:
+        async def _request() -> str:
+            requests.append(result)
+            return result
+
+        return _request
+
+    chat_1, chat_2 = GetChatRequest(ChatID(1)), GetChatRequest(ChatID(2))
+
+    assert await cache.fetch('/getChat', chat_1, request('1')) == '1'
+    assert await cache.fetch('/getChat', chat_2, request('2')) == '2'
+    assert await cache.fetch('/getChat', chat_1, request('x')) == '1'
+
+    await cache.fetch(
+        '/setChatTitle', SetChatTitleRequest(ChatID(1), 'title'), request('ok')
+    )
+
+    assert await cache.fetch('/getChat', chat_1, request('3')) == '3'
+    assert await cache.fetch('/getChat', chat_2, request('x')) == '2'
+
+    await trio.sleep(DEFAULT_TTLS['/getChat'])
+
+    assert await cache.fetch('/getChat', chat_2, request('4')) == '4'
+    assert requests == ['1', '2', 'ok', '3', '4']
+    assert cache.stats == ResponseCacheStats(hits=2, misses=4, coalesced=0)
+
+
+@pytest.mark.trio
+async def test_response_cache_single_flight(autojump_clock) -> None:
+    """Ensure identical requests in flight are made once, sharing errors too."""
+    cache = ResponseCache()
+    calls = 0
+
+    async def request() -> str:
+        nonlocal calls
+        calls += 1
+        await trio.sleep(1)
+        raise BotAPIError(400, 'Bad Request: chat not found')
+
+    async def get_chat() -> None:
+        with pytest.raises(BotAPIError):
+            await cache.fetch('/getChat', GetChatRequest(ChatID(1)), request)
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(3):
+            nursery.start_soon(get_chat)
+
+    assert calls == 1
+    assert cache.stats == ResponseCacheStats(hits=0, misses=1, coalesced=2)
@@ -0,0 +1,69 @@
+"""Tests for the roboto.coalesce module."""
+from typing import List
+
+import pytest
+import trio
+
+from roboto import ChatID
+from roboto.coalesce import Coalescer, CoalescerStats, SingleFlight
+from roboto.request_types import GetChatRequest, SendMessageRequest
+
+
+@pytest.mark.trio
+async def test_coalescer(autojump_clock) -> None:
+    """Test that only identical requests to coalesced methods are coalesced."""
+    coalescer = Coalescer()
+    made: List[str] = []
+
+    async def call(api_method: str, body: object) -> None:
+        async def request() -> str:
+            made.append(api_method)
+            await trio.sleep(1)
+            return api_method
+
+        assert await coalescer.run(api_method, body, request) == api_method
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(3):
+            nursery.start_soon(call, '/getChat', GetChatRequest(ChatID(1)))
+            nursery.start_soon(call, '/sendMessage', SendMessageRequest(ChatID(1), 'x'))
+
+        nursery.start_soon(call, '/getChat', GetChatRequest(ChatID(2)))
+
+    assert sorted(made) == ['/getChat'] * 2 + ['/sendMessage'] * 3
+    assert coalescer.stats == CoalescerStats(
+        requests=4, coalesced=2, coalesced_by_method={'/getChat': 2}
+    )
+
+
+@pytest.mark.trio
+async def test_single_flight_cancelled(autojump_clock) -> None:
+    """Ensure a waiting request is made if the one in flight is cancelled."""
+    flights: SingleFlight[str] = SingleFlight()
+    made = 0
+
+    async def request() -> int:
+        nonlocal made
+        made += 1
+        await trio.sleep(1)
+        return made
+
+    cancelled = trio.CancelScope()
+    results: List[int] = []
+
+    async def cancelled_request() -> None:
+        with cancelled:
+            await flights.run('key', request)
+
+    async def waiting_request() -> None:
+        results.append(await flights.run('key', request))
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(cancelled_request)
+        await trio.sleep(0)
+        nursery.start_soon(waiting_request)
+        await trio.sleep(0.5)
+        cancelled.cancel()
+
+    assert results == [2]
+    assert len(flights) == 0
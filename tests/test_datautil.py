@@ -1,12 +1,16 @@
 """Tests for the roboto.datautil module."""
+import pickle
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, List, NewType, Optional
 
 from pytest import raises
 
+from roboto import Message
 from roboto.datautil import (
     JSONConversionError,
+    decoder_for,
+    encoder_for,
     from_dict,
     from_json_like,
     from_list,
@@ -48,6 +52,21 @@ def test_from_dict() -> None:
     assert from_dict(_Renamed, {'a': 1, 'from': 'test'}) == _Renamed(1, 'test')
 
 
+def test_from_dict_does_not_modify_input() -> None:
+    """Ensure `from_dict` applies renames without touching the input."""
+
+    @dataclass
+    class _Renamed:
+        a: int
+        from_: str = field(metadata={'rename': 'from'})
+
+    value = {'a': 1, 'from': 'test'}
+
+    assert from_dict(_Renamed, value) == _Renamed(1, 'test')
+    assert value == {'a': 1, 'from': 'test'}
+    assert from_dict(_Renamed, value) == _Renamed(1, 'test')
+
+
 def test_from_list() -> None:
     """Test `from_list` with different types."""
     assert from_list(List[int], [1, 2, 3]) == [1, 2, 3]
@@ -223,6 +242,122 @@ def test_from_json_like_incompatible_type() -> None:
         )
 
 
+def test_decoder_for_is_cached() -> None:
+    """Ensure decoders are compiled only once per type."""
+
+    @dataclass
+    class _SmallDummyType:
+        a: int
+        b: Optional[List[str]] = None
+
+    decoder = decoder_for(_SmallDummyType)
+
+    assert decoder_for(_SmallDummyType) is decoder
+    assert decoder({'a': 1, 'b': ['x']}) == _SmallDummyType(1, ['x'])
+    assert decoder_for(List[_SmallDummyType]) is decoder_for(List[_SmallDummyType])
+
+
+def test_from_json_like_with_recursive_types() -> None:
+    """Ensure `from_json_like` can read self-referencing dataclasses."""
+
+    @dataclass
+    class _Node:
+        value: int
+        children: Optional[List['_Node']] = None
+        parent: Optional['_Node'] = None
+
+    _Node.__annotations__.update(
+        children=Optional[List[_Node]], parent=Optional[_Node],
+    )
+
+    value = {'value': 1, 'children': [{'value': 2, 'parent': {'value': 3}}]}
+
+    assert from_json_like(_Node, value) == _Node(
+        1, [_Node(2, parent=_Node(3))],
+    )
+
+    with raises(JSONConversionError):
+        from_json_like(_Node, {'value': 1, 'children': [{'value': 'text'}]})
+
+
+@dataclass(frozen=True)
+class _LazyLeaf:
+    value: int
+
+
+@dataclass(frozen=True)
+class _LazyRoot:
+    name: str
+    leaf: _LazyLeaf = field(metadata={'rename': 'the_leaf'})
+    leaves: List[_LazyLeaf] = field(default_factory=list)
+    extra: Optional[_LazyLeaf] = None
+
+
+def test_from_json_like_lazy() -> None:
+    """Test that lazy decoding produces values equal to eager decoding."""
+    value = {'name': 'a', 'the_leaf': {'value': 1}, 'leaves': [{'value': 2}]}
+
+    lazy = from_json_like(_LazyRoot, value, lazy=True)
+    eager = from_json_like(_LazyRoot, value)
+
+    assert isinstance(lazy, _LazyRoot)
+    assert lazy == eager
+    assert eager == lazy
+    assert lazy.leaf == _LazyLeaf(1)
+    assert lazy.leaves == [_LazyLeaf(2)]
+    assert lazy.extra is None
+
+
+def test_from_json_like_lazy_defers_nested_fields() -> None:
+    """Ensure nested objects are only decoded when first accessed."""
+    lazy = from_json_like(
+        _LazyRoot, {'name': 'a', 'the_leaf': {'value': 1}}, lazy=True
+    )
+
+    assert vars(lazy).keys() >= {'name'}
+    assert 'leaf' not in vars(lazy)
+
+    leaf = lazy.leaf
+
+    assert vars(lazy)['leaf'] is leaf
+    assert lazy.leaf is leaf
+
+
+def test_from_json_like_lazy_pickle() -> None:
+    """Ensure lazily decoded objects are unpickled as eagerly decoded ones."""
+    value = {'name': 'a', 'the_leaf': {'value': 1}, 'leaves': [{'value': 2}]}
+    message_value = {
+        'message_id': 1,
+        'date': 0,
+        'chat': {'id': 1, 'type': 'private'},
+        'from': {'id': 1, 'is_bot': False, 'first_name': 'Test'},
+        'reply_to_message': {
+            'message_id': 0,
+            'date': 0,
+            'chat': {'id': 1, 'type': 'private'},
+            'from': {'id': 2, 'is_bot': False, 'first_name': 'Other'},
+        },
+    }
+
+    for tp, raw in ((_LazyRoot, value), (Message, message_value)):
+        lazy = from_json_like(tp, raw, lazy=True)
+        unpickled = pickle.loads(pickle.dumps(lazy))
+
+        assert type(unpickled) is tp
+        assert unpickled == from_json_like(tp, raw)
+
+
+def test_from_json_like_lazy_errors() -> None:
+    """Ensure missing fields fail eagerly and bad nested values fail on access."""
+    with raises(JSONConversionError):
+        from_json_like(_LazyRoot, {'name': 'a'}, lazy=True)
+
+    lazy = from_json_like(_LazyRoot, {'name': 'a', 'the_leaf': 1}, lazy=True)
+
+    with raises(JSONConversionError):
+        _ = lazy.leaf
+
+
 def test_to_json_like_primitive_types() -> None:
     """Ensure to_json_like doesn't change primitive types."""
     assert to_json_like(1) == 1
@@ -291,6 +426,27 @@ def test_to_json_like_enum_type() -> None:
     }
 
 
+def test_to_json_like_drops_nested_none_fields() -> None:
+    """Ensure None fields are dropped at every level, including inside lists."""
+
+    @dataclass
+    class _Button:
+        text: str
+        data: Optional[str] = None
+
+    @dataclass
+    class _Keyboard:
+        rows: List[List[_Button]]
+        selective: Optional[bool] = None
+
+    keyboard = _Keyboard([[_Button('a'), _Button('b', 'x')]])
+
+    assert to_json_like(keyboard) == {
+        'rows': [[{'text': 'a'}, {'text': 'b', 'data': 'x'}]],
+    }
+    assert encoder_for(_Keyboard) is encoder_for(_Keyboard)
+
+
 def test_to_json_like_unsupported_type() -> None:
     """Ensure to_json_like raises with unsupported object."""
 
@@ -0,0 +1,153 @@
+"""Tests for the roboto.dispatch module."""
+from typing import List, Optional
+
+import pytest
+import trio
+
+from roboto import (
+    CallbackQuery,
+    CallbackQueryID,
+    Chat,
+    ChatID,
+    InlineQuery,
+    Message,
+    MessageID,
+    Update,
+    User,
+    UserID,
+)
+from roboto.dispatch import Dispatcher, chat_key
+
+
+def _user(user_id: int) -> User:
+    return User(UserID(user_id), False, 'Test')
+
+
+def _message(chat_id: int) -> Message:
+    return Message(
+        message_id=MessageID(1),
+        date=0,
+        chat=Chat(id=ChatID(chat_id), type='private'),
+        from_=_user(chat_id),
+    )
+
+
+def _update(update_id: int, chat_id: Optional[int]) -> Update:
+    if chat_id is None:
+        return Update(update_id)
+
+    return Update(update_id, message=_message(chat_id))
+
+
+def test_chat_key() -> None:
+    """Test that chat_key keys updates by chat, falling back to the sender."""
+    query_on_message = CallbackQuery(CallbackQueryID('q'), _user(5), _message(13))
+    query_on_inline_message = CallbackQuery(CallbackQueryID('q'), _user(5))
+    inline_query = InlineQuery('q', 'query', '', _user(6))
+
+    assert chat_key(_update(1, 10)) == 10
+    assert chat_key(Update(1, edited_message=_message(11))) == 11
+    assert chat_key(Update(1, channel_post=_message(12))) == 12
+    assert chat_key(Update(1, callback_query=query_on_message)) == 13
+    assert chat_key(Update(1, callback_query=query_on_inline_message)) == 5
+    assert chat_key(Update(1, inline_query=inline_query)) == 6
+    assert chat_key(Update(1)) is None
+
+
+@pytest.mark.trio
+async def test_dispatcher_keeps_order_within_a_chat(autojump_clock):
+    """Ensure updates from a chat are handled in order, and chats concurrently."""
+    handled: List[Update] = []
+
+    async def handler(update: Update) -> None:
+        await trio.sleep(1 if update.update_id % 2 else 2)
+        handled.append(update)
+
+    start = trio.current_time()
+
+    async with Dispatcher.make(handler) as dispatcher:
+        for update_id, chat_id in enumerate([1, 2, 1, 2, 1, 2]):
+            await dispatcher.dispatch(_update(update_id, chat_id))
+
+    by_chat = {
+        chat_id: [u.update_id for u in handled if chat_key(u) == chat_id]
+        for chat_id in (1, 2)
+    }
+
+    assert by_chat == {1: [0, 2, 4], 2: [1, 3, 5]}
+    assert trio.current_time() - start == 6
+
+
+@pytest.mark.trio
+async def test_dispatcher_max_concurrency(autojump_clock):
+    """Ensure no more than max_concurrency handlers run at once."""
+    running = 0
+    max_running = 0
+
+    async def handler(update: Update) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await trio.sleep(1)
+        running -= 1
+
+    async with Dispatcher.make(handler, max_concurrency=3) as dispatcher:
+        for update_id in range(10):
+            await dispatcher.dispatch(_update(update_id, update_id))
+
+    assert max_running == 3
+
+
+@pytest.mark.trio
+async def test_dispatcher_backpressure(autojump_clock):
+    """Ensure dispatch waits once max_pending updates are not handled yet."""
+    release = trio.Event()
+
+    async def handler(update: Update) -> None:
+        await release.wait()
+
+    async with Dispatcher.make(handler, max_pending=2) as dispatcher:
+        await dispatcher.dispatch(_update(1, 1))
+        await dispatcher.dispatch(_update(2, 2))
+
+        assert dispatcher.unfinished == 2
+
+        with trio.move_on_after(1) as cancel_scope:
+            await dispatcher.dispatch(_update(3, 3))
+
+        assert cancel_scope.cancelled_caught
+
+        release.set()
+        await dispatcher.dispatch(_update(3, 3))
+        await dispatcher.wait_idle()
+
+        assert dispatcher.unfinished == 0
+
+
+@pytest.mark.trio
+async def test_dispatcher_unkeyed_updates(autojump_clock):
+    """Ensure updates with no key are handled concurrently."""
+
+    async def handler(update: Update) -> None:
+        await trio.sleep(1)
+
+    start = trio.current_time()
+
+    async with Dispatcher.make(handler) as dispatcher:
+        for update_id in range(5):
+            await dispatcher.dispatch(_update(update_id, None))
+
+    assert trio.current_time() - start == 1
+
+
+@pytest.mark.trio
+async def test_dispatcher_propagates_handler_errors():
+    """Ensure an exception in a handler propagates out of the dispatcher."""
+
+    async def handler(update: Update) -> None:
+        raise ValueError(update.update_id)
+
+    with pytest.raises(ValueError):
+        async with Dispatcher.make(handler) as dispatcher:
+            await dispatcher.dispatch(_update(1, 1))
+            await trio.sleep_forever()
@@ -0,0 +1,168 @@
+"""Tests for the roboto.downloads module and BotAPI's download methods."""
+import json
+import re
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+import trio
+
+from roboto import BotAPI, File, FileID, FileUniqueID
+from roboto.error import BotAPIError
+from roboto.http_api import APIClient
+from roboto.transport import AsksTransport
+
+CONTENTS = b'0123456789' * 3
+
+
+class _FakeBody:
+    def __init__(self, data: bytes):
+        self._chunks = iter([data[i : i + 7] for i in range(0, len(data), 7)])
+        self.closed = False
+
+    def __aiter__(self) -> '_FakeBody':
+        return self
+
+    async def __anext__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    async def __aenter__(self) -> '_FakeBody':
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.closed = True
+
+
+class _FakeSession:
+    """A session serving `CONTENTS` as the file 'a', at 'docs/a'."""
+
+    base_location = 'https://api.telegram.org'
+    endpoint = '/botTOKEN'
+
+    def __init__(self, supports_ranges: bool = True):
+        self.supports_ranges = supports_ranges
+        self.requests: List[Dict[str, Any]] = []
+        self.bodies: List[_FakeBody] = []
+
+    async def request(self, method: str, **kwargs: Any) -> Any:
+        self.requests.append(kwargs)
+
+        if kwargs.get('path') == '/getFile':
+            result = {
+                'file_id': 'a',
+                'file_unique_id': 'b',
+                'file_size': len(CONTENTS),
+                'file_path': 'docs/a',
+            }
+            content = json.dumps({'ok': True, 'result': result}).encode()
+            return SimpleNamespace(status_code=200, content=content)
+
+        assert method == 'get'
+        assert kwargs['stream']
+
+        if kwargs['url'] != 'https://api.telegram.org/file/botTOKEN/docs/a':
+            return self._response(404, b'')
+
+        range_header = kwargs['headers'].get('Range')
+
+        if range_header is None or not self.supports_ranges:
+            return self._response(200, CONTENTS)
+
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header)
+        assert match is not None
+        start = int(match[1])
+        end = int(match[2]) + 1 if match[2] else len(CONTENTS)
+
+        if start >= len(CONTENTS):
+            return self._response(416, b'')
+
+        return self._response(206, CONTENTS[start:end])
+
+    def _response(self, status_code: int, data: bytes) -> Any:
+        body = _FakeBody(data)
+        self.bodies.append(body)
+
+        return SimpleNamespace(
+            status_code=status_code, reason_phrase='Reason', body=body
+        )
+
+
+def _bot(session: _FakeSession) -> BotAPI:
+    return BotAPI(APIClient(AsksTransport(session)))  # type: ignore
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize('supports_ranges', [True, False])
+async def test_stream_file(supports_ranges) -> None:
+    """Test that byte ranges are streamed, whether the server supports them."""
+    session = _FakeSession(supports_ranges)
+    bot = _bot(session)
+
+    async with bot.stream_file(FileID('a'), 5, 23) as chunks:
+        data = b''.join([chunk async for chunk in chunks])
+
+    assert data == CONTENTS[5:23]
+    assert session.requests[-1]['headers'] == {'Range': 'bytes=5-22'}
+    assert all(body.closed for body in session.bodies)
+
+
+@pytest.mark.trio
+async def test_download_file_caches_file_paths(autojump_clock) -> None:
+    """Ensure getFile is only called again once the file path may be stale."""
+    session = _FakeSession()
+    bot = _bot(session)
+    stream = BytesIO()
+
+    assert await bot.download_file(FileID('a'), stream) == len(CONTENTS)
+    assert await bot.download_file(FileID('a'), BytesIO()) == len(CONTENTS)
+    assert stream.getvalue() == CONTENTS
+    assert [r.get('path') for r in session.requests].count('/getFile') == 1
+
+    # File objects may be old, so they don't keep the file path any longer.
+    await trio.sleep(3000)
+    file = File(FileID('a'), FileUniqueID('b'), None, 'docs/a')
+    await bot.download_file(file, BytesIO())
+
+    await trio.sleep(600)
+    await bot.download_file(FileID('a'), BytesIO())
+
+    assert [r.get('path') for r in session.requests].count('/getFile') == 2
+
+
+@pytest.mark.trio
+async def test_download_file_resume(tmp_path) -> None:
+    """Ensure resumed downloads only fetch what is missing."""
+    session = _FakeSession()
+    bot = _bot(session)
+    file = File(FileID('a'), FileUniqueID('b'), None, 'docs/a')
+    path = tmp_path / 'file.pdf'
+    path.write_bytes(CONTENTS[:12])
+
+    assert await bot.download_file(file, path, resume=True) == len(CONTENTS) - 12
+    assert path.read_bytes() == CONTENTS
+    assert await bot.download_file(file, path, resume=True) == 0
+    assert await bot.download_file(file, path) == len(CONTENTS)
+    assert path.read_bytes() == CONTENTS
+
+    new_path = tmp_path / 'new.pdf'
+    assert await bot.download_file(file, new_path, resume=True) == len(CONTENTS)
+    assert new_path.read_bytes() == CONTENTS
+    assert all(r.get('path') != '/getFile' for r in session.requests)
+
+
+@pytest.mark.trio
+async def test_download_file_error() -> None:
+    """Ensure failed downloads raise BotAPIError."""
+    session = _FakeSession()
+    bot = _bot(session)
+    file = File(FileID('a'), FileUniqueID('b'), None, 'docs/missing')
+
+    with pytest.raises(BotAPIError) as e:
+        await bot.download_file(file, BytesIO())
+
+    assert e.value.error_code == 404
+    assert session.bodies[-1].closed
@@ -1,10 +1,34 @@
 """Tests for the `http_api` module."""
-from typing import Any
+import io
+import json
+import time
+from dataclasses import replace
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Dict, List, cast
 
 import pytest
+import trio
+from asks import Session
+from asks.errors import RequestTimeout
 
+from roboto import ChatAction, ChatID, FileDescription, Message
+from roboto.cache import ResponseCache
+from roboto.datautil import JSONConversionError, from_json_like
 from roboto.error import BotAPIError
-from roboto.http_api import AnyAPIResponse, validate_response
+from roboto.http_api import (
+    AnyAPIResponse,
+    APIClient,
+    HTTPMethod,
+    make_multipart_request,
+    make_request,
+    validate_response,
+)
+from roboto.metrics import Metrics
+from roboto.rate_limit import Rate, RateLimiter
+from roboto.request_types import SendChatActionRequest, SendDocumentRequest
+from roboto.retry import RetryPolicy
+from roboto.transport import AsksTransport
 
 
 def test_validate_good_response() -> None:
@@ -27,3 +51,257 @@ def test_validate_bad_response() -> None:
         assert e.description == 'There was error.'
     else:
         pytest.fail('No exception thrown.')
+
+
+def test_validate_response_with_parameters() -> None:
+    """Ensure validate_response exposes the response parameters in the error."""
+    response: Any = from_json_like(
+        AnyAPIResponse,
+        {
+            'ok': False,
+            'error_code': 429,
+            'description': 'Too Many Requests: retry after 3',
+            'parameters': {'retry_after': 3},
+        },
+    )
+
+    with pytest.raises(BotAPIError) as exc_info:
+        validate_response(response)
+
+    assert exc_info.value.retry_after == 3
+    assert exc_info.value.migrate_to_chat_id is None
+
+
+class _FakeSession:
+    """Answer requests with a list of canned responses (or errors)."""
+
+    def __init__(self, *responses: Any):
+        self.responses = list(responses)
+        self.requests: List[Dict[str, Any]] = []
+
+    async def request(self, method: str, **kwargs: Any) -> Any:
+        self.requests.append(kwargs)
+        response = self.responses.pop(0)
+
+        if isinstance(response, Exception):
+            raise response
+
+        status_code, body = response
+
+        return SimpleNamespace(
+            status_code=status_code,
+            reason_phrase='Reason',
+            content=body if isinstance(body, bytes) else json.dumps(body).encode(),
+        )
+
+
+def _client(session: _FakeSession, **kwargs: Any) -> APIClient:
+    return APIClient(
+        AsksTransport(cast(Session, session)),
+        retry_policy=RetryPolicy(**kwargs, base_delay=1),
+    )
+
+
+@pytest.mark.trio
+async def test_make_request_retries(autojump_clock):
+    """Ensure flood control, server and network errors are retried."""
+    session = _FakeSession(
+        (
+            429,
+            {
+                'ok': False,
+                'error_code': 429,
+                'description': 'Too Many Requests: retry after 7',
+                'parameters': {'retry_after': 7},
+            },
+        ),
+        (502, b'<html>Bad Gateway</html>'),
+        RequestTimeout(),
+        (200, {'ok': True, 'result': True}),
+    )
+    start = trio.current_time()
+
+    result = await make_request(_client(session), HTTPMethod.POST, '/getMe')
+
+    assert result is True
+    assert len(session.requests) == 4
+    assert 7 <= trio.current_time() - start <= 7 + 2 + 4
+
+
+class _UnseekableStream(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        return self._data.readinto(buffer)
+
+
+@pytest.mark.trio
+async def test_multipart_retries_resend_unseekable_files(autojump_clock):
+    """Ensure retries send files from streams that can't seek again."""
+    session = _FakeSession(
+        (502, b'<html>Bad Gateway</html>'),
+        (200, {'ok': True, 'result': True}),
+    )
+    stream = cast(BinaryIO, _UnseekableStream(b'file contents'))
+    request = SendDocumentRequest(ChatID(1), FileDescription(stream, 'a.txt'))
+
+    assert await make_multipart_request(_client(session), '/sendDocument', request)
+
+    first, retry = (r['data'] for r in session.requests)
+    assert b'file contents' in first
+    assert retry == first
+
+
+@pytest.mark.trio
+async def test_make_request_gives_up(autojump_clock):
+    """Ensure errors are raised once retries are exhausted or not allowed."""
+    session = _FakeSession(
+        (500, {'ok': False, 'error_code': 500, 'description': 'Oops'}),
+        (500, {'ok': False, 'error_code': 500, 'description': 'Oops'}),
+        (400, {'ok': False, 'error_code': 400, 'description': 'Bad Request'}),
+    )
+
+    with pytest.raises(BotAPIError) as exc_info:
+        await make_request(_client(session, max_attempts=2), HTTPMethod.POST, '/getMe')
+
+    assert exc_info.value.error_code == 500
+
+    with pytest.raises(BotAPIError) as exc_info:
+        await make_request(_client(session), HTTPMethod.POST, '/getMe')
+
+    assert exc_info.value.error_code == 400
+    assert len(session.requests) == 3
+
+
+@pytest.mark.trio
+async def test_make_request_follows_migrations(autojump_clock):
+    """Ensure requests about migrated groups are repeated for the supergroup."""
+    session = _FakeSession(
+        (
+            400,
+            {
+                'ok': False,
+                'error_code': 400,
+                'description': 'Bad Request: group chat was upgraded to a supergroup',
+                'parameters': {'migrate_to_chat_id': -1001},
+            },
+        ),
+        (200, {'ok': True, 'result': True}),
+    )
+
+    result = await make_request(
+        _client(session),
+        HTTPMethod.POST,
+        '/sendChatAction',
+        SendChatActionRequest(ChatID(-1), ChatAction.TYPING),
+    )
+
+    assert result is True
+    assert [json.loads(r['data'])['chat_id'] for r in session.requests] == [-1, -1001]
+
+
+@pytest.mark.trio
+async def test_make_request_is_throttled(autojump_clock):
+    """Ensure requests wait for the client's rate limiter."""
+    session = _FakeSession(*[(200, {'ok': True, 'result': True})] * 3)
+    limiter = RateLimiter(global_rate=Rate(2, 1, burst=1))
+    client = APIClient(AsksTransport(cast(Session, session)), rate_limiter=limiter)
+    start = trio.current_time()
+
+    for _ in range(3):
+        await make_request(client, HTTPMethod.POST, '/getMe')
+
+    assert trio.current_time() - start == pytest.approx(1)
+    assert limiter.stats.delayed_requests == 2
+
+
+@pytest.mark.trio
+async def test_make_request_is_cached():
+    """Ensure read-only methods are answered from the client's cache."""
+    session = _FakeSession(*[(200, {'ok': True, 'result': {'id': 1}})] * 2)
+    client = APIClient(
+        AsksTransport(cast(Session, session)), response_cache=ResponseCache()
+    )
+
+    for _ in range(2):
+        assert await make_request(client, HTTPMethod.GET, '/getMe') == {'id': 1}
+
+    assert len(session.requests) == 1
+
+
+@pytest.mark.trio
+async def test_make_request_is_measured(autojump_clock):
+    """Ensure every try of a request is recorded in the client's metrics."""
+    error = {'ok': False, 'error_code': 500, 'description': 'Oops'}
+    ok = {'ok': True, 'result': True}
+    session = _FakeSession((500, error), RequestTimeout(), (200, ok))
+    metrics = Metrics()
+    client = replace(_client(session), metrics=metrics)
+    body = SendChatActionRequest(ChatID(1), ChatAction.TYPING)
+
+    assert await make_request(client, HTTPMethod.POST, '/sendChatAction', body)
+
+    snapshot = metrics.snapshot()['/sendChatAction']
+    request_size = len(session.requests[-1]['data'])
+    assert snapshot.requests == 3
+    assert snapshot.errors == {'500': 1, 'network': 1}
+    assert snapshot.bytes_sent == 2 * request_size
+    assert snapshot.bytes_received == len(json.dumps(error)) + len(json.dumps(ok))
+    assert snapshot.network_time.count == 3
+    assert snapshot.parse_time.count == snapshot.decode_time.count == 2
+
+
+@pytest.mark.trio
+async def test_unreadable_results_are_measured(autojump_clock):
+    """Ensure requests whose result can't be read are recorded as errors."""
+    session = _FakeSession((200, {'ok': True, 'result': 'not a message'}))
+    metrics = Metrics()
+    client = replace(_client(session), metrics=metrics)
+
+    with pytest.raises(JSONConversionError):
+        await make_request(
+            client,
+            HTTPMethod.POST,
+            '/sendMessage',
+            read_result=partial(from_json_like, Message),
+        )
+
+    snapshot = metrics.snapshot()['/sendMessage']
+    assert snapshot.requests == 1
+    assert snapshot.errors == {'JSONConversionError': 1}
+    assert snapshot.decode_time.count == 1
+
+
+@pytest.mark.trio
+async def test_measured_decode_reads_result(autojump_clock):
+    """Ensure reading the result into objects counts towards the decode time."""
+    message = {
+        'message_id': 1,
+        'date': 0,
+        'chat': {'id': 1, 'type': 'private'},
+        'from': {'id': 1, 'is_bot': False, 'first_name': 'Test'},
+        'text': 'Hello',
+    }
+    session = _FakeSession((200, {'ok': True, 'result': message}))
+    metrics = Metrics()
+    client = replace(_client(session), metrics=metrics)
+
+    def read_message(value: Any) -> Message:
+        start = time.perf_counter()
+
+        while time.perf_counter() - start < 0.01:
+            pass
+
+        return from_json_like(Message, value)
+
+    result = await make_request(
+        client, HTTPMethod.POST, '/sendMessage', read_result=read_message
+    )
+
+    assert isinstance(result, Message)
+    assert result.text == 'Hello'
+    assert metrics.snapshot()['/sendMessage'].decode_time.total >= 0.01
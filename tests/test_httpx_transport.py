@@ -0,0 +1,125 @@
+"""Tests for the roboto.httpx_transport module, on asyncio and trio."""
+import json
+from typing import Any, List
+
+import pytest
+from asks.multipart import MultipartData
+
+from roboto import BotAPI, ChatID, File, FileID, FileUniqueID
+from roboto.error import TransportError
+from roboto.http_api import APIClient
+from roboto.session import ConnectionOptions
+
+from .common import parse_multipart
+
+httpx = pytest.importorskip('httpx')
+
+from roboto.httpx_transport import HTTPXTransport  # noqa: E402 isort:skip
+
+_MESSAGE = {
+    'message_id': 1,
+    'from': {'id': 1, 'is_bot': True, 'first_name': 'Bot'},
+    'date': 0,
+    'chat': {'id': 1, 'type': 'private'},
+}
+_CONTENTS = b'0123456789'
+
+
+@pytest.fixture(params=['asyncio', 'trio'])
+def anyio_backend(request) -> str:
+    """Run the tests of this module on both asyncio and trio."""
+    return request.param
+
+
+class _FakeTelegram:
+    """Answer requests as the Bot API would, remembering them."""
+
+    def __init__(self) -> None:
+        self.requests: List[Any] = []
+        self.bodies: List[bytes] = []
+
+    async def handle(self, request: Any) -> Any:
+        self.requests.append(request)
+        self.bodies.append(await request.aread())
+        path = request.url.path
+
+        if path == '/file/bottoken/docs/a':
+            return httpx.Response(206, content=_CONTENTS[2:])
+
+        if not path.startswith('/bottoken/'):
+            return httpx.Response(404)
+
+        result: Any = {
+            '/bottoken/getUpdates': [],
+            '/bottoken/sendPhoto': {**_MESSAGE, 'caption': 'photo'},
+        }[path]
+
+        return httpx.Response(200, json={'ok': True, 'result': result})
+
+
+def _bot(telegram: _FakeTelegram, **kwargs: Any) -> BotAPI:
+    client = httpx.AsyncClient(
+        base_url='https://api.telegram.org',
+        transport=httpx.MockTransport(telegram.handle),
+    )
+    transport = HTTPXTransport(client, None, 'token', ConnectionOptions(**kwargs))
+
+    return BotAPI(APIClient(transport))
+
+
+@pytest.mark.anyio
+async def test_multipart_request(tmp_path) -> None:
+    """Ensure multipart bodies are streamed with their length known ahead."""
+    telegram = _FakeTelegram()
+    path = tmp_path / 'photo.jpg'
+    path.write_bytes(_CONTENTS)
+
+    message = await _bot(telegram).send_photo(ChatID(1), path, caption='photo')
+
+    assert message.caption == 'photo'
+    request = telegram.requests[-1]
+    assert request.headers['Content-Length'] == str(len(telegram.bodies[-1]))
+    assert 'Transfer-Encoding' not in request.headers
+    assert parse_multipart(request.headers['Content-Type'], telegram.bodies[-1]) == {
+        'chat_id': '1',
+        'photo': MultipartData(_CONTENTS, 'image/jpeg', 'photo.jpg'),
+        'caption': 'photo',
+    }
+
+
+@pytest.mark.anyio
+async def test_long_poll_timeout() -> None:
+    """Ensure the read timeout of getUpdates is extended by its long polling."""
+    telegram = _FakeTelegram()
+
+    assert await _bot(telegram, read_timeout=10).get_updates(timeout=30) == []
+
+    request = telegram.requests[-1]
+    assert json.loads(telegram.bodies[-1]) == {'timeout': 30}
+    assert request.extensions['timeout']['read'] == 40
+
+
+@pytest.mark.anyio
+async def test_download() -> None:
+    """Test that files are streamed through the transport."""
+    bot = _bot(_FakeTelegram())
+    file = File(FileID('a'), FileUniqueID('b'), None, 'docs/a')
+
+    async with bot.stream_file(file, 2) as chunks:
+        assert b''.join([chunk async for chunk in chunks]) == _CONTENTS[2:]
+
+
+@pytest.mark.anyio
+async def test_network_errors() -> None:
+    """Ensure httpx's network errors are raised as TransportError."""
+
+    async def refuse(request: Any) -> Any:
+        raise httpx.ConnectError('Connection refused', request=request)
+
+    client = httpx.AsyncClient(
+        base_url='https://api.telegram.org', transport=httpx.MockTransport(refuse)
+    )
+    bot = BotAPI(APIClient(HTTPXTransport(client, None, 'token', ConnectionOptions())))
+
+    with pytest.raises(TransportError):
+        await bot.get_me()
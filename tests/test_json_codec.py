@@ -0,0 +1,35 @@
+"""Tests for the roboto.json_codec module."""
+from pytest import raises
+
+from roboto.json_codec import (
+    STDLIB_JSON,
+    JSONCodecUnavailable,
+    fastest_json_codec,
+    get_json_codec,
+)
+
+
+def test_stdlib_codec_round_trip() -> None:
+    """Ensure the standard library codec encodes and decodes consistently."""
+    value = {'a': [1, 2.5, 'text', None, True]}
+
+    assert STDLIB_JSON.loads(STDLIB_JSON.dumps(value)) == value
+    assert STDLIB_JSON.loads(STDLIB_JSON.dumpb(value)) == value
+    assert STDLIB_JSON.dumpb(value) == STDLIB_JSON.dumps(value).encode()
+
+
+def test_get_json_codec() -> None:
+    """Ensure codecs can be fetched by name."""
+    assert get_json_codec('json') is STDLIB_JSON
+
+    with raises(JSONCodecUnavailable):
+        get_json_codec('not-a-json-library')
+
+
+def test_fastest_json_codec() -> None:
+    """Ensure the fastest codec found works the same as the stdlib one."""
+    codec = fastest_json_codec()
+    value = {'text': 'ação/🎲', 'numbers': [1, 2, 3]}
+
+    assert codec.loads(codec.dumpb(value)) == value
+    assert codec.loads(codec.dumps(value)) == value
@@ -0,0 +1,104 @@
+"""Tests for the roboto.metrics module."""
+from typing import List
+
+from roboto.metrics import Histogram, Metrics, RequestSample, StatsdSink
+
+
+def test_histogram() -> None:
+    """Ensure values are counted into the first bucket that holds them."""
+    histogram = Histogram((1, 2))
+
+    for value in (0.5, 1, 1.5, 3):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.total == 6
+    assert histogram.count == 4
+
+
+def test_snapshot() -> None:
+    """Ensure samples add up by API method, and snapshots are copies."""
+    metrics = Metrics()
+    metrics.record(RequestSample('/getMe', None, 0, 10, 0.1, 0.001, 0.002))
+    snapshot = metrics.snapshot()
+    metrics.record(RequestSample('/getMe', '429', 0, 20, 0.2, 0.001, 0.002))
+    metrics.record(RequestSample('/sendMessage', 'network', 30, 0, 5))
+
+    assert snapshot['/getMe'].requests == 1
+
+    snapshot = metrics.snapshot()
+    get_me = snapshot['/getMe']
+    send_message = snapshot['/sendMessage']
+    assert get_me.requests == 2
+    assert get_me.errors == {'429': 1}
+    assert get_me.bytes_received == 30
+    assert get_me.network_time.total == 0.1 + 0.2
+    assert send_message.errors == {'network': 1}
+    assert send_message.bytes_sent == 30
+    assert send_message.parse_time.count == 0
+
+
+def test_prometheus() -> None:
+    """Test the Prometheus text exposition format."""
+    metrics = Metrics(bounds=(0.1, 1))
+    metrics.record(RequestSample('/getMe', '500', 0, 10, 0.5, 0.01, 0.01))
+
+    assert metrics.prometheus().splitlines() == [
+        '# HELP roboto_requests_total Requests made to the Bot API.',
+        '# TYPE roboto_requests_total counter',
+        'roboto_requests_total{method="getMe"} 1',
+        '# HELP roboto_request_errors_total Requests to the Bot API that failed.',
+        '# TYPE roboto_request_errors_total counter',
+        'roboto_request_errors_total{method="getMe",error="500"} 1',
+        '# HELP roboto_request_bytes_total Bytes sent in request bodies.',
+        '# TYPE roboto_request_bytes_total counter',
+        'roboto_request_bytes_total{method="getMe"} 0',
+        '# HELP roboto_response_bytes_total Bytes received in response bodies.',
+        '# TYPE roboto_response_bytes_total counter',
+        'roboto_response_bytes_total{method="getMe"} 10',
+        '# HELP roboto_request_duration_seconds Time spent on requests, by phase'
+        ' (network, parse, decode).',
+        '# TYPE roboto_request_duration_seconds histogram',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="network",le="0.1"} 0',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="network",le="1.0"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="network",le="+Inf"} 1',
+        'roboto_request_duration_seconds_sum{method="getMe",phase="network"} 0.5',
+        'roboto_request_duration_seconds_count{method="getMe",phase="network"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="parse",le="0.1"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="parse",le="1.0"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="parse",le="+Inf"} 1',
+        'roboto_request_duration_seconds_sum{method="getMe",phase="parse"} 0.01',
+        'roboto_request_duration_seconds_count{method="getMe",phase="parse"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="decode",le="0.1"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="decode",le="1.0"} 1',
+        'roboto_request_duration_seconds_bucket'
+        '{method="getMe",phase="decode",le="+Inf"} 1',
+        'roboto_request_duration_seconds_sum{method="getMe",phase="decode"} 0.01',
+        'roboto_request_duration_seconds_count{method="getMe",phase="decode"} 1',
+    ]
+
+
+def test_statsd() -> None:
+    """Ensure samples are sent as statsd lines."""
+    lines: List[str] = []
+    sink = StatsdSink(lines.append, prefix='bot')
+
+    sink.record(RequestSample('/sendMessage', '400', 30, 10, 0.25, 0.001))
+
+    assert lines == [
+        'bot.sendMessage.requests:1|c',
+        'bot.sendMessage.request_bytes:30|c',
+        'bot.sendMessage.response_bytes:10|c',
+        'bot.sendMessage.network_time:250|ms',
+        'bot.sendMessage.errors.400:1|c',
+        'bot.sendMessage.parse_time:1|ms',
+    ]
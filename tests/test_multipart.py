@@ -0,0 +1,71 @@
+"""Tests for the roboto.multipart module."""
+from io import BytesIO
+
+import pytest
+from asks.multipart import MultipartData
+
+from roboto import FileDescription
+from roboto.error import RobotoError
+from roboto.multipart import MultipartBody
+
+from .common import parse_multipart
+
+
+@pytest.mark.trio
+async def test_multipart_body(tmp_path) -> None:
+    """Test that every kind of field is encoded, with the length known ahead."""
+    path = tmp_path / 'photo.jpg'
+    path.write_bytes(b'\r\n--photo--\r\n')
+    stream = BytesIO(b'skipped stream')
+    stream.seek(8)
+    body = MultipartBody.make(
+        {
+            'chat_id': 1,
+            'photo': path,
+            'stream': stream,
+            'bytes': memoryview(b'in memory')[3:],
+            'described': FileDescription(bytearray(b'raw'), 'a"b.txt', 'text/plain'),
+        }
+    )
+
+    data = await body.read(chunk_size=4)
+
+    assert len(data) == body.content_length
+    assert b''.join([chunk async for chunk in body.chunks(chunk_size=4)]) == data
+    assert parse_multipart(body.content_type, data) == {
+        'chat_id': '1',
+        'photo': MultipartData(b'\r\n--photo--\r\n', 'image/jpeg', 'photo.jpg'),
+        'stream': MultipartData(b'stream', 'application/octet-stream', None),
+        'bytes': MultipartData(b'memory', 'application/octet-stream', None),
+        'described': MultipartData(b'raw', 'text/plain', 'a%22b.txt'),
+    }
+    assert stream.tell() == 8
+
+
+@pytest.mark.trio
+async def test_multipart_body_unseekable_stream() -> None:
+    """Ensure streams that can't seek are read when the body is made."""
+    stream = BytesIO(b'data')
+    stream.seekable = lambda: False  # type: ignore
+    body = MultipartBody.make({'file': stream}, boundary='boundary')
+
+    assert stream.tell() == 4
+    assert await body.read() == (
+        b'--boundary\r\n'
+        b'Content-Disposition: form-data; name="file"\r\n'
+        b'Content-Type: application/octet-stream\r\n\r\n'
+        b'data\r\n'
+        b'--boundary--\r\n'
+    )
+
+
+@pytest.mark.trio
+async def test_multipart_body_file_shrinks(tmp_path) -> None:
+    """Ensure files that shrink after the body is made are not sent cut."""
+    path = tmp_path / 'file.bin'
+    path.write_bytes(b'data')
+    body = MultipartBody.make({'file': path})
+    path.write_bytes(b'da')
+
+    with pytest.raises(RobotoError):
+        await body.read()
@@ -0,0 +1,189 @@
+"""Tests for the roboto.polling module."""
+from typing import Any, List, Optional, Tuple, cast
+
+import pytest
+import trio
+
+from roboto import BotAPI, Update
+from roboto.dispatch import Dispatcher
+from roboto.polling import UpdatePoller
+
+
+class _FakeBot:
+    """Serve getUpdates the way Telegram does, from a list of pending updates."""
+
+    def __init__(self) -> None:
+        self.updates: List[Update] = []
+        self.calls: List[Tuple[Optional[int], Optional[int], Optional[int]]] = []
+        self._new_updates = trio.Event()
+
+    def push(self, *update_ids: int) -> None:
+        self.updates.extend(Update(update_id) for update_id in update_ids)
+        self._new_updates.set()
+        self._new_updates = trio.Event()
+
+    async def get_updates(
+        self,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+        timeout: Optional[int] = None,
+        allowed_updates: Any = None,
+    ) -> List[Update]:
+        self.calls.append((offset, limit, timeout))
+
+        if offset is not None:
+            self.updates = [u for u in self.updates if u.update_id >= offset]
+
+        if not self.updates and timeout:
+            with trio.move_on_after(timeout):
+                await self._new_updates.wait()
+
+        return self.updates[:limit]
+
+
+def _poller(bot: _FakeBot, **kwargs):
+    return UpdatePoller.make(cast(BotAPI, bot), **kwargs)
+
+
+@pytest.mark.trio
+async def test_poller_yields_updates(autojump_clock):
+    """Test that the poller yields updates in order, skipping duplicates."""
+    bot = _FakeBot()
+    bot.push(1, 2, 3)
+    received: List[int] = []
+
+    async with _poller(bot) as poller:
+        async for update in poller:
+            received.append(update.update_id)
+
+            if update.update_id == 3:
+                bot.push(4)
+
+            if update.update_id == 4:
+                break
+
+    assert received == [1, 2, 3, 4]
+
+
+@pytest.mark.trio
+async def test_poller_commits_acked_offsets(autojump_clock):
+    """Ensure offsets only advance past updates that were acknowledged."""
+    bot = _FakeBot()
+    bot.push(1, 2, 3)
+
+    async with _poller(bot, timeout=10) as poller:
+        updates = [await poller.__aiter__().__anext__() for _ in range(3)]
+
+        assert poller.committed_offset == 1
+
+        poller.ack(updates[1])
+        assert poller.committed_offset == 1
+
+        poller.ack(updates[0])
+        assert poller.committed_offset == 3
+
+        # Wait for the poller to poll again with the new offset.
+        await trio.sleep(1)
+
+        assert bot.calls[-1][0] == 3
+
+    assert [u.update_id for u in bot.updates] == [3]
+
+
+@pytest.mark.trio
+async def test_poller_waits_for_acks_when_only_duplicates(autojump_clock):
+    """Ensure the poller doesn't busy loop while fetched updates are unhandled."""
+    bot = _FakeBot()
+    bot.push(1)
+
+    async with _poller(bot, timeout=10) as poller:
+        update = await poller.__aiter__().__anext__()
+
+        await trio.sleep(0.5)
+        calls_before_ack = len(bot.calls)
+        poller.ack(update)
+        await trio.sleep(1)
+
+    assert calls_before_ack == 2
+    assert bot.calls[1] == (1, 100, 10)
+    assert bot.calls[2][0] == 2
+
+
+@pytest.mark.trio
+async def test_poller_limit_adapts_to_backlog(autojump_clock):
+    """Ensure fewer updates are requested while fetched ones pile up."""
+    bot = _FakeBot()
+    bot.push(1, 2, 3)
+
+    async with _poller(bot, timeout=10, batch_size=5, max_buffered=10):
+        await trio.sleep(1)
+
+    assert bot.calls[0] == (None, 5, 10)
+    # Three fetched updates are unconsumed: they are fetched again (3) and
+    # only 5 - 3 new ones are wanted.
+    assert bot.calls[1] == (1, 5, 10)
+
+
+@pytest.mark.trio
+async def test_poller_commits_on_exit(autojump_clock):
+    """Ensure acknowledged updates are confirmed when the poller is closed."""
+    bot = _FakeBot()
+    bot.push(1, 2)
+
+    async with _poller(bot, timeout=10) as poller:
+        async for update in poller:
+            poller.ack(update)
+
+            if update.update_id == 2:
+                break
+
+    assert bot.calls[-1] == (3, 1, 0)
+    assert bot.updates == []
+
+
+@pytest.mark.trio
+async def test_poller_with_dispatcher(autojump_clock):
+    """Test the poller and dispatcher together, acknowledging handled updates."""
+    bot = _FakeBot()
+    bot.push(*range(1, 11))
+    handled: List[int] = []
+
+    async def handler(update: Update) -> None:
+        await trio.sleep(1)
+        handled.append(update.update_id)
+
+    async with _poller(bot, timeout=10) as poller:
+        async with Dispatcher.make(handler, on_handled=poller.ack) as dispatcher:
+            async for update in poller:
+                await dispatcher.dispatch(update)
+
+                if update.update_id == 10:
+                    break
+
+    assert sorted(handled) == list(range(1, 11))
+    assert poller.committed_offset == 11
+    assert bot.updates == []
+
+
+@pytest.mark.trio
+async def test_poller_not_stalled_by_unacked_update(autojump_clock):
+    """Ensure an update that is never acknowledged doesn't stall polling."""
+    bot = _FakeBot()
+    bot.push(*range(1, 301))
+    received: List[int] = []
+
+    async with _poller(bot, timeout=10, max_unacked=50) as poller:
+        async for update in poller:
+            received.append(update.update_id)
+
+            if update.update_id != 1:
+                poller.ack(update)
+
+            if update.update_id == 300:
+                break
+
+        # Update 1 was confirmed anyway, to make room for new updates.
+        assert poller.committed_offset == 301
+
+    assert received == list(range(1, 301))
+    assert all(limit is not None and limit <= 100 for _, limit, _ in bot.calls)
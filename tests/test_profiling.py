@@ -0,0 +1,94 @@
+"""Tests for the roboto.profiling module."""
+import pytest
+import trio
+
+from roboto import BotAPI, ChatID, InputMediaPhoto, Token
+from roboto.profiling import StageCollector, profile, stage
+from roboto.testing import FakeBotAPI
+
+
+@pytest.mark.trio
+async def test_bot_api_stages(tmp_path) -> None:
+    """Ensure the stages of BotAPI calls are collected under the calls."""
+    photo = tmp_path / 'photo.jpg'
+    photo.write_bytes(b'photo')
+
+    async with FakeBotAPI.make() as fake:
+        async with BotAPI.make(Token(fake.token), fake.api_url) as bot:
+            await bot.get_me()
+
+            with profile(StageCollector()) as collector:
+                await bot.send_message(ChatID(1), 'Hello')
+                await bot.send_media_group(
+                    ChatID(1), [InputMediaPhoto(photo), InputMediaPhoto(photo)]
+                )
+
+            await bot.get_me()
+
+    stacks = dict(collector.stacks)
+
+    assert not any(stack[0] == 'get_me' for stack in stacks)
+
+    for expected in (
+        ('send_message',),
+        ('send_message', 'encode'),
+        ('send_message', 'transport'),
+        ('send_message', 'parse'),
+        ('send_message', 'decode'),
+        ('send_media_group', 'extract_medias'),
+        ('send_media_group', 'json_serialize'),
+        ('send_media_group', 'transport', 'multipart'),
+    ):
+        assert stacks[expected].count == 1, expected
+
+    # Both the response and the message it holds are read.
+    assert stacks[('send_message', 'decode', 'from_json_like')].count == 2
+    assert ('send_message', 'from_json_like') not in stacks
+
+    for stack, stats in stacks.items():
+        assert stats.wall_time >= 0
+        assert stats.wall_time <= stacks[stack[:1]].wall_time
+
+    by_stage = collector.by_stage()
+    assert by_stage['transport'].count == 2
+    assert by_stage['transport'].wall_time == pytest.approx(
+        stacks[('send_message', 'transport')].wall_time
+        + stacks[('send_media_group', 'transport')].wall_time
+    )
+
+
+@pytest.mark.trio
+async def test_tasks_are_profiled() -> None:
+    """Ensure stages of tasks started while profiling are collected."""
+
+    async def task() -> None:
+        with stage('task'):
+            await trio.sleep(0)
+
+    async with trio.open_nursery() as nursery:
+        with profile(StageCollector()) as collector:
+            nursery.start_soon(task)
+
+        nursery.start_soon(task)
+
+    assert collector.stacks[('task',)].count == 1
+
+
+def test_folded(tmp_path) -> None:
+    """Ensure stacks are folded with their exclusive time."""
+    collector = StageCollector()
+    collector.stage_ended(('a', 'b'), 0.25, 0.125)
+    collector.stage_ended(('a',), 1.0, 0.5)
+    collector.stage_ended(('a', 'b', 'a'), 0.05, 0.0)
+    collector.stage_ended(('a', 'b', 'a'), 0.05, 0.0)
+
+    assert collector.folded() == ['a 750000', 'a;b 150000', 'a;b;a 100000']
+    assert collector.folded('cpu') == ['a 375000', 'a;b 125000', 'a;b;a 0']
+    assert collector.by_stage()['a'].count == 1
+
+    path = tmp_path / 'stacks.folded'
+    collector.dump_folded(path, 'cpu')
+    assert path.read_text() == 'a 375000\na;b 125000\na;b;a 0\n'
+
+    collector.clear()
+    assert collector.folded() == []
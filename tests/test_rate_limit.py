@@ -0,0 +1,91 @@
+"""Tests for the roboto.rate_limit module."""
+from typing import List, Tuple
+
+import pytest
+import trio
+
+from roboto import ChatID
+from roboto.rate_limit import GLOBAL, GROUP, Rate, RateLimiter
+from roboto.request_types import SendMessageRequest
+
+
+def test_rate_limiter_keys() -> None:
+    """Ensure only messages take tokens from the buckets of their chat."""
+    limiter = RateLimiter()
+
+    assert limiter.keys_for('/getUpdates') == ()
+    assert limiter.keys_for('/getMe') == (GLOBAL,)
+    assert limiter.keys_for('/sendMessage', SendMessageRequest(ChatID(5), 'Hi')) == (
+        GLOBAL,
+        5,
+    )
+    assert limiter.keys_for('/sendMessage', SendMessageRequest(ChatID(-5), 'Hi')) == (
+        GLOBAL,
+        -5,
+        (GROUP, -5),
+    )
+    assert limiter.keys_for('/sendChatAction', SendMessageRequest(ChatID(5), 'Hi')) == (
+        GLOBAL,
+    )
+
+
+@pytest.mark.trio
+async def test_rate_limiter_global_rate(autojump_clock) -> None:
+    """Ensure requests over the global rate wait for tokens."""
+    limiter = RateLimiter(global_rate=Rate(10, 1, burst=2))
+    sent: List[float] = []
+
+    async def send() -> None:
+        await limiter.acquire('/getMe')
+        sent.append(trio.current_time())
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(5):
+            nursery.start_soon(send)
+
+    assert sent == pytest.approx([0, 0, 0.1, 0.2, 0.3])
+    assert limiter.stats.requests == 5
+    assert limiter.stats.delayed_requests == 3
+    assert limiter.stats.total_wait == pytest.approx(0.6)
+    assert limiter.stats.max_wait == pytest.approx(0.3)
+
+
+@pytest.mark.trio
+async def test_rate_limiter_chat_rates(autojump_clock) -> None:
+    """Ensure chats are throttled separately, and groups at their own rate."""
+    limiter = RateLimiter(group_rate=Rate(20, 60, burst=2))
+    sent: List[Tuple[int, float]] = []
+
+    async def send(chat_id: int) -> None:
+        await limiter.acquire('/sendMessage', SendMessageRequest(ChatID(chat_id), 'Hi'))
+        sent.append((chat_id, trio.current_time()))
+
+    async with trio.open_nursery() as nursery:
+        for chat_id in (1, 1, 2, -3, -3, -3):
+            nursery.start_soon(send, chat_id)
+            await trio.sleep(0)
+
+    # The burst of the group is spent at the rate of every chat.
+    assert sorted(sent) == pytest.approx(
+        [(-3, 0), (-3, 1), (-3, 3), (1, 0), (1, 1), (2, 0)]
+    )
+
+
+@pytest.mark.trio
+async def test_rate_limiter_priorities(autojump_clock) -> None:
+    """Ensure answers to callback queries skip ahead of waiting messages."""
+    limiter = RateLimiter(global_rate=Rate(1, 1))
+    sent: List[str] = []
+
+    async def send(api_method: str) -> None:
+        await limiter.acquire(api_method)
+        sent.append(api_method)
+
+    async with trio.open_nursery() as nursery:
+        for api_method in ('/getMe', '/sendMessage', '/sendMessage'):
+            nursery.start_soon(send, api_method)
+            await trio.sleep(0)
+
+        nursery.start_soon(send, '/answerCallbackQuery')
+
+    assert sent == ['/getMe', '/answerCallbackQuery', '/sendMessage', '/sendMessage']
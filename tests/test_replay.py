@@ -0,0 +1,114 @@
+"""Tests for the roboto.replay module."""
+import gzip
+import subprocess
+import sys
+from itertools import count
+from pathlib import Path
+from typing import List
+
+import pytest
+import trio
+
+import roboto
+from roboto import BotAPI, Token, Update
+from roboto.replay import UpdateRecorder, read_recording, replay_updates
+from roboto.testing import FakeBotAPI
+
+
+@pytest.mark.trio
+async def test_record_and_replay(tmp_path) -> None:
+    """Ensure updates fetched by get_updates are replayed as they were."""
+    path = tmp_path / 'updates.ndjson.gz'
+
+    with UpdateRecorder.make(path) as recorder:
+        async with FakeBotAPI.make() as fake:
+            async with BotAPI.make(
+                Token(fake.token), fake.api_url, update_recorder=recorder
+            ) as bot:
+                fake.add_text_message(1, 'Hello')
+                fake.add_text_message(2, 'Hi')
+                fetched = await bot.get_updates()
+                assert await bot.get_updates(fetched[-1].update_id + 1) == []
+                fake.add_text_message(1, 'Bye')
+                fetched += await bot.get_updates(fetched[-1].update_id + 1)
+
+    replayed: List[Update] = []
+
+    async def dispatch(update: Update) -> None:
+        replayed.append(update)
+
+    assert [len(updates) for _, updates in read_recording(path)] == [2, 1]
+    assert await replay_updates(path, dispatch, speed=None) == 3
+    assert replayed == fetched
+
+
+@pytest.mark.trio
+async def test_replay_speed(tmp_path, autojump_clock) -> None:
+    """Ensure updates are fed at the recorded pace, sped up."""
+    path = tmp_path / 'updates.ndjson.gz'
+    update = {'update_id': 1}
+    times = count(1000, 10)
+
+    with path.open('ab') as f:
+        recorder = UpdateRecorder(f, clock=lambda: next(times))  # type: ignore
+        await recorder.record([update])
+        await recorder.record([])
+        await recorder.record([{**update, 'update_id': 2}])
+
+    # Appending keeps what was recorded before.
+    with UpdateRecorder.make(path) as recorder:
+        await recorder.record([{**update, 'update_id': 3}])
+
+    fed_at: List[float] = []
+
+    async def dispatch(update: Update) -> None:
+        fed_at.append(trio.current_time())
+
+    start = trio.current_time()
+
+    assert await replay_updates(path, dispatch, speed=2) == 3
+    assert fed_at[1] - start == pytest.approx(5)
+    assert fed_at[2] > fed_at[1]
+
+
+_KILLED_RECORDER = """
+import os, sys, trio
+from roboto.replay import UpdateRecorder
+
+async def main():
+    with UpdateRecorder.make(sys.argv[1]) as recorder:
+        await recorder.record([{'update_id': 1}])
+        await recorder.record([{'update_id': 2}, {'update_id': 3}])
+        os._exit(1)
+
+trio.run(main)
+"""
+
+
+@pytest.mark.trio
+async def test_recording_survives_crashes(tmp_path) -> None:
+    """Ensure a killed recorder keeps what it recorded, and can be appended to."""
+    path = tmp_path / 'updates.ndjson.gz'
+    killed = subprocess.run(
+        [sys.executable, '-c', _KILLED_RECORDER, str(path)],
+        cwd=Path(roboto.__file__).parents[1],
+    )
+    assert killed.returncode == 1
+
+    # Stand in for a crash in the middle of writing a line.
+    torn = gzip.compress(b'{"time": 0, "updates": [{"update_id": 4}]}\n')
+    with path.open('ab') as f:
+        f.write(torn[: len(torn) // 2])
+
+    assert [len(updates) for _, updates in read_recording(path)] == [1, 2]
+
+    with UpdateRecorder.make(path) as recorder:
+        await recorder.record([{'update_id': 5}])
+
+    assert [
+        [update['update_id'] for update in updates]
+        for _, updates in read_recording(path)
+    ] == [[1], [2, 3], [5]]
+
+    with gzip.open(path) as f:
+        assert len(f.read().splitlines()) == 3
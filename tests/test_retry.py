@@ -0,0 +1,37 @@
+"""Tests for the roboto.retry module."""
+from asks.errors import RequestTimeout
+
+from roboto.error import BotAPIError
+from roboto.retry import RetryPolicy
+
+
+def test_retry_policy_honors_retry_after() -> None:
+    """Ensure flood control errors are retried after retry_after."""
+    policy = RetryPolicy(max_retry_after=10)
+
+    assert policy.delay(BotAPIError(429, 'Too Many Requests', retry_after=3), 1) == 3
+    assert (
+        policy.delay(BotAPIError(429, 'Too Many Requests', retry_after=11), 1) is None
+    )
+
+
+def test_retry_policy_backs_off() -> None:
+    """Ensure server and network errors are retried with jittered backoff."""
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+
+    for attempt, cap in [(1, 1), (2, 2), (3, 4), (4, 5)]:
+        for error in (BotAPIError(502, 'Bad Gateway'), RequestTimeout()):
+            delay = policy.delay(error, attempt)
+
+            assert delay is not None
+            assert 0 <= delay <= cap
+
+
+def test_retry_policy_gives_up() -> None:
+    """Ensure client errors and exhausted attempts are not retried."""
+    policy = RetryPolicy(max_attempts=3, retry_network_errors=False)
+
+    assert policy.delay(BotAPIError(400, 'Bad Request'), 1) is None
+    assert policy.delay(BotAPIError(500, 'Internal Server Error'), 3) is None
+    assert policy.delay(RequestTimeout(), 1) is None
+    assert policy.delay(ValueError(), 1) is None
@@ -0,0 +1,150 @@
+"""Tests for the roboto.session module, against a local HTTP server."""
+import json
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, List, cast
+
+import h11
+import pytest
+import trio
+from asks.errors import RequestTimeout
+
+from roboto import BotAPI, Token
+from roboto.session import ConnectionOptions
+from roboto.transport import AsksTransport
+from roboto.url import URL
+
+
+class _Server:
+    """Answer every request with `true`, long polling getUpdates for a while."""
+
+    def __init__(self, delay: float = 0, long_poll: float = 0.5):
+        self.delay = delay
+        self.long_poll = long_poll
+        self.connections = 0
+
+    async def handle(self, stream: trio.SocketStream) -> None:
+        self.connections += 1
+        connection = h11.Connection(h11.SERVER)
+        target = b''
+
+        try:
+            while True:
+                event = connection.next_event()
+
+                if event is h11.NEED_DATA:
+                    connection.receive_data(await stream.receive_some())
+                elif isinstance(event, h11.Request):
+                    target = event.target
+                elif isinstance(event, h11.EndOfMessage):
+                    await trio.sleep(
+                        self.long_poll
+                        if target.endswith(b'/getUpdates')
+                        else self.delay
+                    )
+                    await self._respond(stream, connection)
+
+                    if connection.our_state is not h11.DONE:
+                        return
+
+                    connection.start_next_cycle()
+                elif isinstance(event, h11.ConnectionClosed):
+                    return
+        except (trio.BrokenResourceError, h11.RemoteProtocolError):
+            pass
+        finally:
+            await stream.aclose()
+
+    @staticmethod
+    async def _respond(stream: trio.SocketStream, connection: h11.Connection) -> None:
+        body = json.dumps({'ok': True, 'result': []}).encode()
+        headers = [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+        ]
+        await stream.send_all(
+            connection.send(h11.Response(status_code=200, headers=headers))
+            + connection.send(h11.Data(data=body))
+            + connection.send(h11.EndOfMessage())
+        )
+
+
+@asynccontextmanager
+async def _bot(server: _Server, **options) -> AsyncIterator[BotAPI]:
+    async with trio.open_nursery() as nursery:
+        listeners = await nursery.start(
+            partial(trio.serve_tcp, server.handle, 0, host='127.0.0.1')
+        )
+        port = listeners[0].socket.getsockname()[1]
+        api_url = URL.make(f'http://127.0.0.1:{port}')
+
+        async with BotAPI.make(
+            Token('token'),
+            api_url,
+            connection_options=ConnectionOptions(**options),
+        ) as bot:
+            yield bot
+
+        nursery.cancel_scope.cancel()
+
+
+async def _get_me_times(bot: BotAPI, times: int) -> None:
+    transport = cast(AsksTransport, bot.client.transport)
+
+    for _ in range(times):
+        await transport.session.request('get', path='/getMe')
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize('keep_alive, connections', [(True, 1), (False, 3)])
+async def test_keep_alive(keep_alive, connections) -> None:
+    """Ensure connections are reused, unless keep-alive is disabled."""
+    server = _Server()
+
+    async with _bot(server, keep_alive=keep_alive) as bot:
+        await _get_me_times(bot, 3)
+
+    assert server.connections == connections
+
+
+@pytest.mark.trio
+async def test_idle_connections_are_reaped() -> None:
+    """Ensure connections unused for longer than the idle timeout are closed."""
+    server = _Server()
+
+    async with _bot(server, idle_timeout=0.05) as bot:
+        await _get_me_times(bot, 2)
+        await trio.sleep(0.1)
+        await _get_me_times(bot, 1)
+
+    assert server.connections == 2
+
+
+@pytest.mark.trio
+async def test_read_timeout() -> None:
+    """Ensure stalled requests time out."""
+    async with _bot(_Server(delay=1), read_timeout=0.1) as bot:
+        with pytest.raises(RequestTimeout):
+            await bot.get_me()
+
+
+@pytest.mark.trio
+async def test_long_poll_connections() -> None:
+    """Test that long polling neither holds up other requests nor is cut short
+    by the read timeout.
+    """
+    finished: List[str] = []
+
+    async with _bot(_Server(), connections=1, read_timeout=0.2) as bot:
+
+        async def get_updates() -> None:
+            await bot.get_updates(timeout=1)
+            finished.append('getUpdates')
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(get_updates)
+            await trio.sleep(0.05)
+            await _get_me_times(bot, 1)
+            finished.append('getMe')
+
+    assert finished == ['getMe', 'getUpdates']
@@ -0,0 +1,124 @@
+"""Tests for the roboto.slots module."""
+import pickle
+from dataclasses import FrozenInstanceError, dataclass, field, replace
+from typing import List
+
+from pytest import raises
+
+from roboto import Chat, ChatID, Message, MessageID, User, UserID
+from roboto.slots import field_values, with_slots
+
+
+@with_slots
+@dataclass(frozen=True)
+class _Base:
+    a: int
+    b: str = 'b'
+
+
+@with_slots
+@dataclass(frozen=True)
+class _Derived(_Base):
+    c: List[int] = field(default_factory=list)
+    kind: str = field(default='derived', init=False)
+
+
+@dataclass(frozen=True)
+class _MixinA:
+    __slots__ = ()
+
+    x: int
+
+
+@dataclass(frozen=True)
+class _MixinB:
+    __slots__ = ()
+
+    y: int = 0
+
+
+@with_slots
+@dataclass(frozen=True)
+class _Mixed(_MixinB, _MixinA):
+    pass
+
+
+def test_with_slots() -> None:
+    """Test that with_slots produces equivalent dataclasses without __dict__."""
+    base = _Base(1)
+    derived = _Derived(1, 'x', [2])
+
+    assert not hasattr(base, '__dict__')
+    assert not hasattr(derived, '__dict__')
+    assert vars(_Base)['__slots__'] == ('a', 'b')
+    assert vars(_Derived)['__slots__'] == ('c',)
+
+    assert base == _Base(1, 'b')
+    assert derived.kind == 'derived'
+    assert repr(derived) == "_Derived(a=1, b='x', c=[2], kind='derived')"
+    assert hash(base) == hash(_Base(1))
+    assert replace(derived, a=5) == _Derived(5, 'x', [2])
+    assert _Derived(1).c == []
+
+
+def test_with_slots_mixins() -> None:
+    """Ensure mixins with empty slots have their fields slotted by the subclass."""
+    mixed = _Mixed(x=1)
+
+    assert not hasattr(mixed, '__dict__')
+    assert _Mixed.__slots__ == ('x', 'y')
+    assert (mixed.x, mixed.y) == (1, 0)
+
+
+def test_with_slots_is_frozen() -> None:
+    """Ensure slotted frozen dataclasses can't be modified."""
+    derived = _Derived(1)
+
+    with raises(FrozenInstanceError):
+        derived.a = 2  # type: ignore
+
+    with raises(FrozenInstanceError):
+        derived.d = 2  # type: ignore
+
+    with raises(FrozenInstanceError):
+        del derived.a  # type: ignore
+
+
+def test_with_slots_pickle() -> None:
+    """Test that slotted dataclasses can be pickled."""
+    derived = _Derived(1, 'x', [2])
+
+    assert pickle.loads(pickle.dumps(derived)) == derived
+
+
+def test_with_slots_not_a_dataclass() -> None:
+    """Ensure with_slots refuses classes that are not dataclasses."""
+
+    class _NotADataclass:
+        pass
+
+    with raises(TypeError):
+        with_slots(_NotADataclass)
+
+
+def test_field_values() -> None:
+    """Test that field_values produces a shallow mapping of fields."""
+    derived = _Derived(1, 'x', [2])
+
+    assert field_values(derived) == {'a': 1, 'b': 'x', 'c': [2], 'kind': 'derived'}
+    assert field_values(derived)['c'] is derived.c
+
+
+def test_api_types_use_slots() -> None:
+    """Ensure API types (including the Message hierarchy) have no __dict__."""
+    user = User(UserID(1), False, 'Test')
+    message = Message(
+        message_id=MessageID(1),
+        date=0,
+        chat=Chat(id=ChatID(1), type='private'),
+        from_=user,
+    )
+
+    assert not hasattr(user, '__dict__')
+    assert not hasattr(message, '__dict__')
+    assert pickle.loads(pickle.dumps(message)) == message
@@ -0,0 +1,103 @@
+"""Tests for the roboto.testing module, through real HTTP requests."""
+import os
+
+import pytest
+import trio
+
+from roboto import BotAPI, ChatID, InputMediaPhoto, Token
+from roboto.error import BotAPIError
+from roboto.retry import RetryPolicy
+from roboto.testing import FakeBotAPI
+
+
+@pytest.mark.trio
+async def test_messages() -> None:
+    """Ensure updates are long polled and messages are sent."""
+    async with FakeBotAPI.make() as fake:
+        async with BotAPI.make(Token(fake.token), fake.api_url) as bot:
+            me = await bot.get_me()
+
+            async with trio.open_nursery() as nursery:
+                # The update arrives while getUpdates waits for it.
+                nursery.start_soon(_add_message_later, fake)
+                updates = await bot.get_updates(timeout=5)
+
+            assert updates[0].message is not None
+            assert updates[0].message.text == 'Hello'
+
+            message = await bot.send_message(updates[0].message.chat.id, 'Hi')
+
+            assert await bot.get_updates(offset=updates[-1].update_id + 1) == []
+
+    assert me.username == 'fake_bot'
+    assert message.text == 'Hi'
+    assert fake.sent_messages[-1]['chat']['id'] == 42
+    assert fake.requests['/getUpdates'] == 2
+
+
+async def _add_message_later(fake: FakeBotAPI) -> None:
+    await trio.sleep(0.1)
+    fake.add_text_message(42, 'Hello')
+
+
+@pytest.mark.trio
+async def test_files(tmp_path) -> None:
+    """Ensure uploaded files can be downloaded back, whole or in part."""
+    contents = os.urandom(100_000)
+    photo = tmp_path / 'photo.jpg'
+    photo.write_bytes(contents)
+
+    async with FakeBotAPI.make() as fake:
+        async with BotAPI.make(Token(fake.token), fake.api_url) as bot:
+            message = await bot.send_photo(ChatID(1), photo, caption='A photo')
+            assert message.photo is not None
+            file_id = message.photo[0].file_id
+            downloaded = tmp_path / 'downloaded.jpg'
+
+            assert await bot.download_file(file_id, downloaded) == len(contents)
+
+            file = await bot.get_file(file_id)
+
+            async with bot.stream_file(file, 10, 20) as chunks:
+                part = b''.join([chunk async for chunk in chunks])
+
+            document = await bot.send_document(ChatID(1), photo)
+            messages = await bot.send_media_group(
+                ChatID(1), [InputMediaPhoto(photo), InputMediaPhoto(file_id)]
+            )
+
+    assert message.caption == 'A photo'
+    assert downloaded.read_bytes() == contents
+    assert part == contents[10:20]
+    assert document.document is not None
+    assert document.document.file_size == len(contents)
+    assert len(messages) == 2
+    assert messages[0].media_group_id == messages[1].media_group_id
+    assert fake.files[messages[0].photo[0].file_id] == contents  # type: ignore
+    assert messages[1].photo[0].file_id == file_id  # type: ignore
+
+
+@pytest.mark.trio
+async def test_injected_errors() -> None:
+    """Ensure injected errors are answered, and flood control is retried."""
+    async with FakeBotAPI.make() as fake:
+        async with BotAPI.make(Token(fake.token), fake.api_url) as bot:
+            fake.inject_error(400, 'Bad Request: chat not found', api_method='/getMe')
+
+            with pytest.raises(BotAPIError) as exc_info:
+                await bot.get_me()
+
+            with pytest.raises(BotAPIError) as not_found_info:
+                await bot.get_chat(ChatID(1))
+
+        retry_policy = RetryPolicy()
+
+        async with BotAPI.make(
+            Token(fake.token), fake.api_url, retry_policy=retry_policy
+        ) as bot:
+            fake.inject_error(429, count=2, retry_after=0)
+            await bot.get_me()
+
+    assert exc_info.value.description == 'Bad Request: chat not found'
+    assert not_found_info.value.error_code == 404
+    assert fake.requests['/getMe'] == 4
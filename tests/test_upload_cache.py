@@ -0,0 +1,139 @@
+"""Tests for the roboto.upload_cache module."""
+import os
+from io import BytesIO
+
+import pytest
+
+from roboto import BotAPI, ChatID, FileDescription, FileID, Token
+from roboto.error import BotAPIError
+from roboto.testing import FakeBotAPI
+from roboto.upload_cache import (
+    MemoryUploadCacheStore,
+    SQLiteUploadCacheStore,
+    UploadCache,
+    is_file_id_error,
+)
+
+
+def test_memory_store_evicts_least_recently_used() -> None:
+    """Ensure the memory store keeps only the most recently used file ids."""
+    store = MemoryUploadCacheStore(max_size=2)
+    store.set('a', FileID('1'))
+    store.set('b', FileID('2'))
+    assert store.get('a') == '1'
+
+    store.set('c', FileID('3'))
+
+    assert (store.get('a'), store.get('b'), store.get('c')) == ('1', None, '3')
+
+    store.delete('a')
+
+    assert store.get('a') is None
+
+
+def test_sqlite_store(tmp_path) -> None:
+    """Ensure the SQLite store persists file ids and evicts old ones."""
+    store = SQLiteUploadCacheStore(tmp_path / 'cache.db', max_size=2)
+    store.set('a', FileID('1'))
+    store.set('b', FileID('2'))
+    store.set('c', FileID('3'))
+    store.delete('c')
+    store.close()
+
+    store = SQLiteUploadCacheStore(tmp_path / 'cache.db', max_size=2)
+
+    assert (store.get('a'), store.get('b'), store.get('c')) == (None, '2', None)
+
+
+@pytest.mark.trio
+async def test_upload_cache_lookup(tmp_path) -> None:
+    """Test that files with the same contents share their file id."""
+    cache = UploadCache()
+    path = tmp_path / 'image.jpg'
+    path.write_bytes(b'dummy')
+
+    file_id, keys = await cache.lookup(path, 'photo')
+    assert file_id is None
+    await cache.remember(keys, FileID('photo'))
+
+    stream = BytesIO(b'dummy')
+    assert (await cache.lookup(stream, 'photo'))[0] == 'photo'
+    assert stream.tell() == 0
+    description = FileDescription(b'dummy', 'x.jpg')
+    assert (await cache.lookup(description, 'photo'))[0] == 'photo'
+    assert (await cache.lookup(description, 'document'))[0] is None
+    assert await cache.lookup(FileID('other'), 'photo') == (None, ())
+
+    await cache.forget(keys)
+
+    assert (await cache.lookup(path, 'photo'))[0] is None
+
+
+@pytest.mark.trio
+async def test_upload_cache_skips_hashing_unchanged_paths(tmp_path, mocker) -> None:
+    """Ensure paths are only hashed again after they change."""
+    cache = UploadCache()
+    path = tmp_path / 'image.jpg'
+    path.write_bytes(b'dummy')
+    await cache.remember((await cache.lookup(path, 'photo'))[1], FileID('photo'))
+    hash_path = mocker.patch('roboto.upload_cache._hash_path', return_value='x')
+
+    assert (await cache.lookup(path, 'photo'))[0] == 'photo'
+    hash_path.assert_not_called()
+
+    path.write_bytes(b'changed')
+    os.utime(path, ns=(0, 0))
+
+    assert (await cache.lookup(path, 'photo'))[0] is None
+    hash_path.assert_called_once_with(path)
+
+
+@pytest.mark.parametrize('seekable', [True, False])
+@pytest.mark.trio
+async def test_upload_cache_streams(seekable) -> None:
+    """Ensure only streams that can seek back are cached."""
+    stream = BytesIO(b'dummy')
+    stream.seekable = lambda: seekable  # type: ignore
+
+    assert bool((await UploadCache().lookup(stream, 'document'))[1]) == seekable
+
+
+def test_is_file_id_error() -> None:
+    """Ensure only errors about the file id are told apart."""
+    assert is_file_id_error(
+        BotAPIError(400, 'Bad Request: wrong file identifier/HTTP URL specified')
+    )
+    assert is_file_id_error(BotAPIError(400, 'Bad Request: FILE_REFERENCE_EXPIRED'))
+    assert not is_file_id_error(BotAPIError(400, 'Bad Request: chat not found'))
+    assert not is_file_id_error(BotAPIError(500, 'wrong file identifier'))
+
+
+@pytest.mark.trio
+async def test_refused_file_ids_are_uploaded_again(tmp_path) -> None:
+    """Ensure files are uploaded again only when their file id is refused."""
+    path = tmp_path / 'document.txt'
+    path.write_bytes(b'dummy')
+
+    async with FakeBotAPI.make() as fake:
+        async with BotAPI.make(
+            Token(fake.token), fake.api_url, upload_cache=UploadCache()
+        ) as bot:
+            await bot.send_document(ChatID(1), path)
+            assert len(fake.files) == 1
+
+            fake.inject_error(
+                400, 'Bad Request: chat not found', api_method='/sendDocument'
+            )
+
+            with pytest.raises(BotAPIError):
+                await bot.send_document(ChatID(1), path)
+
+            await bot.send_document(ChatID(1), path)
+            assert len(fake.files) == 1
+
+            # Telegram no longer knows the file id.
+            fake.files.clear()
+            message = await bot.send_document(ChatID(1), path)
+
+            assert message.document is not None
+            assert fake.files == {message.document.file_id: b'dummy'}
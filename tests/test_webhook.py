@@ -0,0 +1,216 @@
+"""Tests for the roboto.webhook module."""
+import json
+import socket
+import struct
+from typing import Any, List, Tuple
+
+import h11
+import pytest
+import trio
+import trio.testing
+
+from roboto import Update
+from roboto.webhook import SECRET_TOKEN_HEADER, WebhookReceiver
+
+_UPDATE = {
+    'update_id': 1,
+    'message': {
+        'message_id': 1,
+        'date': 0,
+        'chat': {'id': 1, 'type': 'private'},
+        'from': {'id': 1, 'is_bot': False, 'first_name': 'Test'},
+    },
+}
+
+
+class _FakeTelegram:
+    """An HTTP client that posts updates the way Telegram does."""
+
+    def __init__(self, stream: trio.abc.Stream):
+        self._stream = stream
+        self._connection = h11.Connection(h11.CLIENT)
+
+    async def post(
+        self,
+        body: Any,
+        *,
+        path: str = '/secret',
+        secret_token: str = 'token',
+        method: str = 'POST',
+    ) -> int:
+        data = json.dumps(body).encode()
+        headers: List[Tuple[bytes, bytes]] = [
+            (b'host', b'example.com'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(data)).encode()),
+            (SECRET_TOKEN_HEADER, secret_token.encode()),
+        ]
+
+        if self._connection.our_state is h11.DONE:
+            self._connection.start_next_cycle()
+
+        await self._stream.send_all(
+            self._connection.send(
+                h11.Request(method=method, target=path, headers=headers)
+            )
+            + self._connection.send(h11.Data(data=data))
+            + self._connection.send(h11.EndOfMessage())
+        )
+
+        status_code = None
+
+        while True:
+            event = self._connection.next_event()
+
+            if event is h11.NEED_DATA:
+                self._connection.receive_data(await self._stream.receive_some())
+            elif isinstance(event, h11.Response):
+                status_code = event.status_code
+            elif isinstance(event, h11.EndOfMessage):
+                assert status_code is not None
+                return status_code
+
+
+async def _receive_all(receiver: WebhookReceiver) -> List[Update]:
+    received = []
+
+    while True:
+        with trio.move_on_after(0.1) as cancel_scope:
+            received.append(await receiver.__aiter__().__anext__())
+
+        if cancel_scope.cancelled_caught:
+            return received
+
+
+@pytest.mark.trio
+async def test_webhook_receiver(autojump_clock):
+    """Test that updates posted through a connection are received in order."""
+    async with WebhookReceiver.make('/secret', 'token', port=0) as receiver:
+        client_stream, server_stream = trio.testing.memory_stream_pair()
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(receiver.handle_connection, server_stream)
+            telegram = _FakeTelegram(client_stream)
+
+            assert await telegram.post(_UPDATE) == 200
+            assert await telegram.post({**_UPDATE, 'update_id': 2}) == 200
+            await client_stream.aclose()
+
+        updates = await _receive_all(receiver)
+
+    assert [u.update_id for u in updates] == [1, 2]
+    assert updates[0].message is not None
+    assert updates[0].message.chat.id == 1
+
+
+@pytest.mark.parametrize(
+    'kwargs, status_code',
+    [
+        ({'path': '/other'}, 404),
+        ({'method': 'PUT'}, 405),
+        ({'secret_token': 'wrong'}, 403),
+    ],
+)
+@pytest.mark.trio
+async def test_webhook_receiver_refuses_requests(autojump_clock, kwargs, status_code):
+    """Ensure requests with the wrong path, method or token are refused."""
+    async with WebhookReceiver.make('/secret', 'token', port=0) as receiver:
+        client_stream, server_stream = trio.testing.memory_stream_pair()
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(receiver.handle_connection, server_stream)
+
+            assert await _FakeTelegram(client_stream).post(_UPDATE, **kwargs) == (
+                status_code
+            )
+
+        assert await _receive_all(receiver) == []
+
+
+@pytest.mark.trio
+async def test_webhook_receiver_bad_body(autojump_clock):
+    """Ensure bodies that are not updates are refused."""
+    async with WebhookReceiver.make(
+        '/secret', 'token', port=0, max_body_size=1000
+    ) as receiver:
+        for body, status_code in (
+            ({'message': 'no update_id'}, 400),
+            ({}, 400),
+            ({'text': 'x' * 1000}, 413),
+        ):
+            client_stream, server_stream = trio.testing.memory_stream_pair()
+
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(receiver.handle_connection, server_stream)
+
+                assert await _FakeTelegram(client_stream).post(body) == status_code
+
+        assert await _receive_all(receiver) == []
+
+
+@pytest.mark.trio
+async def test_webhook_receiver_over_tcp():
+    """Test the receiver's server through a real connection."""
+    async with WebhookReceiver.make(
+        '/secret', 'token', port=0, host='127.0.0.1'
+    ) as receiver:
+        assert receiver.port is not None
+
+        stream = await trio.open_tcp_stream('127.0.0.1', receiver.port)
+
+        async with stream:
+            assert await _FakeTelegram(stream).post(_UPDATE) == 200
+
+        async for update in receiver:
+            assert update.update_id == 1
+            break
+
+
+@pytest.mark.trio
+async def test_webhook_receiver_connection_reset():
+    """Ensure a client resetting its connection doesn't stop the receiver."""
+    async with WebhookReceiver.make(
+        '/secret', 'token', port=0, host='127.0.0.1'
+    ) as receiver:
+        assert receiver.port is not None
+
+        stream = await trio.open_tcp_stream('127.0.0.1', receiver.port)
+        await stream.send_all(b'POST /secret HTTP/1.1\r\nhost: example.com\r\n')
+        # Closing with a zero linger time resets the connection.
+        stream.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        await stream.aclose()
+
+        stream = await trio.open_tcp_stream('127.0.0.1', receiver.port)
+
+        async with stream:
+            assert await _FakeTelegram(stream).post(_UPDATE) == 200
+
+        async for update in receiver:
+            assert update.update_id == 1
+            break
+
+
+@pytest.mark.trio
+async def test_webhook_receiver_client_gone(autojump_clock):
+    """Ensure a client leaving before its response only drops its connection."""
+    async with WebhookReceiver.make('/secret', 'token', port=0) as receiver:
+        client_stream, server_stream = trio.testing.memory_stream_pair()
+        data = json.dumps(_UPDATE).encode()
+        connection = h11.Connection(h11.CLIENT)
+        headers = [
+            (b'host', b'example.com'),
+            (b'content-length', str(len(data)).encode()),
+            (SECRET_TOKEN_HEADER, b'token'),
+        ]
+        await client_stream.send_all(
+            connection.send(
+                h11.Request(method='POST', target='/secret', headers=headers)
+            )
+            + connection.send(h11.Data(data=data))
+            + connection.send(h11.EndOfMessage())
+        )
+        await client_stream.aclose()
+
+        await receiver.handle_connection(server_stream)
+
+        assert [u.update_id for u in await _receive_all(receiver)] == [1]